@@ -1,11 +1,16 @@
 """Análise do consumo energético da simulação."""
 
+import sys
 import pandas as pd
 import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from sensitivity.output_cache import read_output
 
 # Carregar dados
 data = pd.read_csv('results/sensitivity_analysis/20260119_205540/complete_data.csv')
-df_sim1 = pd.read_csv('results/sensitivity_analysis/20260119_205540/simulations/sim_0001/eplusout.csv')
+df_sim1 = read_output('results/sensitivity_analysis/20260119_205540/simulations/sim_0001')  # Prefere o cache colunar
 
 # Análise do consumo
 consumo = data['consumo_anual_resfriamento']
@@ -2,11 +2,15 @@
 Extrai dados temporais detalhados das simulações para análise subsequente.
 Gera CSV com: tempo, temperatura, umidade, temperatura radiante, velocidade do ar.
 """
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 
+sys.path.insert(0, str(Path(__file__).parent))
+from sensitivity.output_cache import is_cache_fresh, output_exists, read_output
+
 print("="*80)
 print("EXTRAÇÃO DE DADOS TEMPORAIS PARA EQUIPE DE ANÁLISE")
 print("="*80)
@@ -15,12 +19,13 @@ print("="*80)
 sim_path = Path('results/sensitivity_analysis/20260119_205540/simulations/sim_0001')
 output_csv = sim_path / 'eplusout.csv'
 
-if not output_csv.exists():
+if not output_exists(sim_path):
     print(f"❌ Arquivo não encontrado: {output_csv}")
     exit(1)
 
-print(f"\n📂 Carregando: {output_csv.name}")
-df = pd.read_csv(output_csv)
+# Prefere o cache colunar (python -m sensitivity.output_cache) quando disponível
+print(f"\n📂 Carregando: {'cache colunar' if is_cache_fresh(sim_path) else output_csv.name}")
+df = read_output(sim_path)
 print(f"✓ {len(df)} registros carregados")
 
 # Cria DataFrame com dados temporais
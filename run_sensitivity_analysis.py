@@ -3,9 +3,9 @@ Script principal para análise de sensibilidade do laboratório UFC Quixadá.
 
 Workflow de SIMULAÇÃO:
 1. Gerar amostras LHS
-2. Criar IDFs modificados
-3. Executar simulações EnergyPlus
-4. Extrair resultados
+2. Criar IDFs modificados          ┐
+3. Executar simulações EnergyPlus  ├ pipeline: etapas sobrepostas, ligadas
+4. Extrair resultados              ┘ por filas limitadas
 5. Análise de sensibilidade
 
 Para gerar TODOS os gráficos e relatórios, use:
@@ -13,12 +13,19 @@ Para gerar TODOS os gráficos e relatórios, use:
 
 Uso:
     python run_sensitivity_analysis.py --all --n-samples 200 --workers 4
+    python run_sensitivity_analysis.py --all --n-samples 500 --workers auto --pin-cpus
     python run_sensitivity_analysis.py --samples-only --n-samples 500
     python run_sensitivity_analysis.py --analyze results/sensitivity_analysis/complete_data.csv
+    python run_sensitivity_analysis.py --resume results/sensitivity_analysis/[timestamp]
+    python run_sensitivity_analysis.py --all --queue /mnt/nfs/fila      (coordenador)
+    python run_sensitivity_analysis.py --worker --queue /mnt/nfs/fila   (cada máquina)
 """
 
 import argparse
+import json
+import os
 import sys
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -28,7 +35,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from sensitivity import (
     generate_sample_matrix,
     run_sensitivity_simulations,
-    extract_all_results,
+    ExtractionStage,
     merge_inputs_outputs,
     run_sensitivity_analysis,
     ALL_PARAMETERS,
@@ -37,20 +44,183 @@ from sensitivity import (
     BASE_IDF_PATH,
     RESULTS_DIR,
     WEATHER_FILE,
+    LEDGER_NAME,
 )
+from sensitivity.resources import usable_cores
+from sensitivity.result_cache import ResultCache
+from sensitivity.job_queue import run_distributed_simulations, run_worker
+from sensitivity.screening import select_full_year, compare_with_full_year
+from sensitivity.config import SCREENING_PERIODS
+from sensitivity.simulation import DEFAULT_KEEP
 
+# Modo da execução, gravado no diretório dela: um --resume com outro modo
+# misturaria métricas extrapoladas e anuais (ou de backends diferentes)
+RUN_CONFIG_NAME = 'run_config.json'
 
-def run_full_workflow(n_samples: int = NUM_SIMULATIONS, max_workers: int = 4):
+
+def _workers_arg(value: str):
+    """Valor de --workers: inteiro ou 'auto' (modo adaptativo)."""
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"esperado inteiro ou 'auto': {value}")
+
+
+def _default_scratch() -> str:
+    """Diretório temporário padrão: /dev/shm (tmpfs) se existir."""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def _default_cache() -> str:
+    """Diretório padrão do cache de resultados (compartilhado entre execuções)."""
+    return str(Path(RESULTS_DIR).parent / 'simulation_cache')
+
+
+def _check_run_config(output_dir: Path, run_config: dict, resume: bool):
+    """
+    Grava o modo da execução (screening, backend) ou, ao retomar, confere-o.
+    
+    Raises:
+        ValueError: se a execução retomada foi iniciada com outro modo
+    """
+    config_path = output_dir / RUN_CONFIG_NAME
+    if resume and config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        changed = {k: (saved.get(k), v) for k, v in run_config.items() if saved.get(k) != v}
+        if changed:
+            details = ', '.join(f"{k}: {old!r} -> {new!r}" for k, (old, new) in changed.items())
+            raise ValueError(f"Execução iniciada com outro modo ({details}); "
+                             f"retome-a com as mesmas opções")
+        return
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(run_config, f, indent=1)
+
+
+def _simulate_and_extract(samples_df, run_dir: Path, run_id: str, resume: bool,
+                          max_workers: int, read_chunksize: int, backend: str,
+                          keep: list, screening: str, queue_dir: str, sim_options: dict,
+                          close_queue: bool = True):
+    """
+    Etapas 2-4 em pipeline (IDFs, simulações e extração) para um conjunto de amostras.
+    
+    Grava em run_dir: simulations/, o ledger, simulation_status.csv e
+    extracted_results.csv. Com queue_dir, close_queue=False mantém a fila
+    aberta para uma etapa seguinte (ex.: ano completo após a triagem).
+    
+    Returns:
+        (status das simulações, resultados extraídos)
+    """
+    results_path = run_dir / "extracted_results.csv"
+    extraction = ExtractionStage(
+        base_output_dir=str(run_dir / "simulations"),
+        output_path=str(results_path),
+        max_workers=max_workers,
+        read_chunksize=read_chunksize,
+        backend=backend,
+        screening=screening
+    )
+    on_result = lambda result: extraction.submit(result['sim_id'], result['success'])
+    try:
+        if queue_dir is not None:
+            sim_results_df = run_distributed_simulations(
+                samples_df=samples_df,
+                queue_dir=queue_dir,
+                run_id=run_id,
+                output_base_dir=str(run_dir / "simulations"),
+                backend=backend,
+                keep=keep or DEFAULT_KEEP,
+                ledger_path=str(run_dir / LEDGER_NAME),
+                resume=resume,
+                screening=screening,
+                on_result=on_result,
+                close=close_queue
+            )
+        else:
+            sim_results_df = run_sensitivity_simulations(
+                samples_df=samples_df,
+                base_idf=BASE_IDF_PATH,
+                output_base_dir=str(run_dir / "simulations"),
+                weather_file=WEATHER_FILE,
+                max_workers=max_workers,
+                backend=backend,
+                ledger_path=str(run_dir / LEDGER_NAME),
+                resume=resume,
+                keep=keep or DEFAULT_KEEP,
+                screening=screening,
+                on_result=on_result,
+                **sim_options
+            )
+    finally:
+        results_df = extraction.close()
+    
+    sim_status_path = run_dir / "simulation_status.csv"
+    sim_results_df.to_csv(sim_status_path, index=False)
+    print(f"✓ Status das simulações: {sim_status_path}")
+    print(f"✓ Resultados extraídos: {results_path}")
+    
+    return sim_results_df, results_df
+
+
+def run_full_workflow(n_samples: int = NUM_SIMULATIONS, max_workers: int = 4,
+                      read_chunksize: int = None, backend: str = 'csv',
+                      resume_dir: str = None, adaptive: bool = False,
+                      pin_cpus: bool = False, scratch_dir: str = None,
+                      keep: list = None, cache: ResultCache = None,
+                      queue_dir: str = None, timeout: float = 300,
+                      speculative: bool = False, screening: str = None,
+                      full_year: int = 0, full_year_method: str = 'extremes',
+                      engine: str = 'cli', energyplus_path: str = None,
+                      idf_workers: int = 1, parametric: bool = False):
     """
     Executa workflow completo de análise de sensibilidade.
     
     Args:
         n_samples: Número de simulações
-        max_workers: Processos paralelos
+        max_workers: Processos paralelos (simulações e threads de extração)
+        read_chunksize: Extração em streaming com blocos desse número de linhas
+        backend: Fonte dos resultados ('csv', 'sql' ou 'eso'; 'sql' e 'eso' dispensam
+            o eplusout.csv)
+        resume_dir: Diretório de uma execução interrompida a retomar (reusa as
+            amostras e pula as simulações concluídas no ledger)
+        adaptive: Concorrência das simulações ajustada pela carga da máquina
+            (max_workers vira o teto)
+        pin_cpus: Fixa cada EnergyPlus em um núcleo dedicado
+        scratch_dir: Simula em diretório temporário rápido (ex.: /dev/shm),
+            mantendo em simulations/ apenas os arquivos de keep
+        keep: Allow-list de arquivos mantidos (None = DEFAULT_KEEP)
+        cache: Cache de resultados; simulações de IDFs idênticos já simulados
+            são servidas do cache
+        queue_dir: Fila compartilhada (ex.: NFS); as simulações são executadas
+            por workers (--worker) em outras máquinas em vez de localmente
+        timeout: Teto (s) do timeout por simulação; com tempos suficientes
+            observados, o timeout é derivado da distribuição
+        speculative: Duplica simulações lentas (stragglers) em workers ociosos
+        screening: Modo de triagem (chave de SCREENING_PERIODS): simula períodos
+            reduzidos e extrapola as métricas extensivas para o ano
+        full_year: Com screening, número de amostras refeitas com o ano
+            completo para validar a extrapolação (full_year/)
+        full_year_method: Escolha dessas amostras: 'extremes' ou 'random'
+        engine: 'cli' (executável do EnergyPlus) ou 'api' (pyenergyplus em
+            processos worker, métricas calculadas em memória)
+        energyplus_path: Executável do EnergyPlus (None = locais comuns;
+            'synthetic' = EnergyPlus sintético para medir o pipeline)
+        idf_workers: Processos que criam os IDFs (1 = thread produtora do pipeline)
+        parametric: Um único IDF com objetos Parametric:*, expandido pelo
+            ParametricPreprocessor, em vez de um IDF por amostra
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir = Path(RESULTS_DIR) / timestamp
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if resume_dir is not None:
+        output_dir = Path(resume_dir)
+        timestamp = output_dir.name
+        samples_path = output_dir / "lhs_samples.csv"
+        if not samples_path.exists():
+            raise FileNotFoundError(f"Amostras não encontradas para retomar: {samples_path}")
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = Path(RESULTS_DIR) / timestamp
+        output_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"\n{'='*80}")
     print(f"ANÁLISE DE SENSIBILIDADE - LABORATÓRIO UFC QUIXADÁ")
@@ -61,37 +231,59 @@ def run_full_workflow(n_samples: int = NUM_SIMULATIONS, max_workers: int = 4):
     print(f"{'='*80}\n")
     
     # Etapa 1: Gerar amostras LHS
-    print("\n[1/6] Gerando amostras Latin Hypercube...")
-    samples_df = generate_sample_matrix(n_samples)
-    samples_path = output_dir / "lhs_samples.csv"
-    samples_df.to_csv(samples_path, index=False)
-    print(f"✓ Amostras salvas: {samples_path}")
+    if resume_dir is not None:
+        import pandas as pd
+        
+        print("\n[1/6] Retomando execução: carregando amostras LHS...")
+        samples_df = pd.read_csv(samples_path, float_precision='round_trip')
+        n_samples = len(samples_df)
+        print(f"✓ Amostras carregadas: {samples_path}")
+    else:
+        print("\n[1/6] Gerando amostras Latin Hypercube...")
+        samples_df = generate_sample_matrix(n_samples)
+        samples_path = output_dir / "lhs_samples.csv"
+        samples_df.to_csv(samples_path, index=False)
+        print(f"✓ Amostras salvas: {samples_path}")
     print(f"  Shape: {samples_df.shape}")
+    _check_run_config(output_dir, {'screening': screening, 'backend': backend},
+                      resume=resume_dir is not None)
     
-    # Etapa 2 & 3: Criar IDFs e executar simulações
-    print("\n[2-3/6] Criando IDFs e executando simulações...")
-    sim_results_df = run_sensitivity_simulations(
-        samples_df=samples_df,
-        base_idf=BASE_IDF_PATH,
-        output_base_dir=str(output_dir / "simulations"),
-        weather_file=WEATHER_FILE,
-        max_workers=max_workers
-    )
-    
-    sim_status_path = output_dir / "simulation_status.csv"
-    sim_results_df.to_csv(sim_status_path, index=False)
-    print(f"✓ Status das simulações: {sim_status_path}")
+    # Etapas 2-4 em pipeline: o IDF da simulação N+k é criado enquanto a N
+    # roda no EnergyPlus e a N-k é extraída
+    if screening is not None:
+        print(f"\n[2-4/6] Triagem ({screening}): criando IDFs, executando simulações e "
+              f"extraindo resultados...")
+    else:
+        print("\n[2-4/6] Criando IDFs, executando simulações e extraindo resultados...")
+    sim_options = dict(adaptive=adaptive, pin_cpus=pin_cpus, scratch_dir=scratch_dir,
+                       cache=cache, timeout=timeout, speculative=speculative,
+                       engine=engine, energyplus_path=energyplus_path,
+                       idf_workers=idf_workers, parametric=parametric)
+    validate = screening is not None and full_year > 0
+    sim_results_df, results_df = _simulate_and_extract(
+        samples_df, output_dir, run_id=timestamp, resume=resume_dir is not None,
+        max_workers=max_workers, read_chunksize=read_chunksize, backend=backend,
+        keep=keep, screening=screening, queue_dir=queue_dir, sim_options=sim_options,
+        close_queue=not validate)
     
-    # Etapa 4: Extrair resultados
-    print("\n[4/6] Extraindo resultados...")
-    results_df = extract_all_results(
-        sim_results_df=sim_results_df,
-        base_output_dir=str(output_dir / "simulations")
-    )
-    
-    results_path = output_dir / "extracted_results.csv"
-    results_df.to_csv(results_path, index=False)
-    print(f"✓ Resultados extraídos: {results_path}")
+    if validate:
+        # Ano completo só para o subconjunto escolhido; confere a extrapolação
+        full_ids = select_full_year(results_df, full_year, full_year_method)
+        print(f"\n[4/6] Simulações anuais completas: {len(full_ids)} amostras "
+              f"({full_year_method})...")
+        full_dir = output_dir / "full_year"
+        full_dir.mkdir(exist_ok=True)
+        _, full_results_df = _simulate_and_extract(
+            samples_df[samples_df['sim_id'].isin(full_ids)], full_dir,
+            run_id=f"{timestamp}_full_year", resume=resume_dir is not None,
+            max_workers=max_workers, read_chunksize=read_chunksize, backend=backend,
+            keep=keep, screening=None, queue_dir=queue_dir, sim_options=sim_options)
+        
+        validation = compare_with_full_year(results_df, full_results_df)
+        validation_path = output_dir / "screening_validation.csv"
+        validation.to_csv(validation_path, index=False)
+        print(f"✓ Validação da triagem: {validation_path}")
+        print(validation.to_string(index=False))
     
     # Etapa 5: Merge e preparar dataset completo
     print("\n[5/6] Preparando dataset completo...")
@@ -170,8 +362,12 @@ def main():
 Exemplos:
   python run_sensitivity_analysis.py --all
   python run_sensitivity_analysis.py --all --n-samples 100 --workers 8
+  python run_sensitivity_analysis.py --all --n-samples 500 --workers auto --pin-cpus
   python run_sensitivity_analysis.py --samples-only --n-samples 500
+  python run_sensitivity_analysis.py --resume results/sensitivity_analysis/20250119_143000
   python run_sensitivity_analysis.py --analyze results/sensitivity_analysis/20250119_143000/complete_data.csv
+  python run_sensitivity_analysis.py --all --n-samples 500 --queue /mnt/nfs/fila
+  python run_sensitivity_analysis.py --worker --queue /mnt/nfs/fila --workers 8
         """
     )
     
@@ -179,27 +375,125 @@ Exemplos:
                        help='Executa workflow completo (amostras + simulações + análise)')
     parser.add_argument('--samples-only', action='store_true',
                        help='Gera apenas amostras LHS (sem simulações)')
+    parser.add_argument('--resume', type=str, metavar='RUN_DIR',
+                       help='Retoma workflow interrompido (pula simulações já concluídas)')
     parser.add_argument('--analyze', type=str, metavar='CSV',
                        help='Analisa dataset existente (pula simulações)')
+    parser.add_argument('--worker', action='store_true',
+                       help='Executa simulações puxadas da fila de --queue até o '
+                            'coordenador fechá-la')
+    parser.add_argument('--queue', type=str, metavar='DIR',
+                       help='Diretório compartilhado da fila (ex.: NFS). Com --all/--resume, '
+                            'publica as simulações para workers de outras máquinas')
     
     parser.add_argument('--n-samples', type=int, default=NUM_SIMULATIONS,
                        help=f'Número de simulações (padrão: {NUM_SIMULATIONS})')
-    parser.add_argument('--workers', type=int, default=4,
-                       help='Processos paralelos para simulações (padrão: 4)')
+    parser.add_argument('--workers', type=_workers_arg, default=4,
+                       help="Processos paralelos para simulações e extração, ou 'auto' "
+                            "(concorrência adaptativa por núcleos ociosos, memória livre e "
+                            "RSS por simulação) (padrão: 4)")
+    parser.add_argument('--pin-cpus', action='store_true',
+                       help='Fixa cada EnergyPlus em um núcleo dedicado (Linux)')
+    parser.add_argument('--timeout', type=float, default=300, metavar='S',
+                       help='Tempo máximo por simulação; após 10 simulações, o timeout é '
+                            'derivado dos tempos observados, com este valor como teto '
+                            '(padrão: 300)')
+    parser.add_argument('--speculative', action='store_true',
+                       help='Duplica simulações lentas (acima de 1,5x o percentil 95 '
+                            'observado) em workers ociosos e usa a que terminar primeiro')
+    parser.add_argument('--energyplus', metavar='PATH',
+                       help="Executável do EnergyPlus, ou 'synthetic' para um EnergyPlus "
+                            'sintético que mede o desempenho do pipeline sem simular '
+                            '(padrão: procura nos locais comuns)')
+    parser.add_argument('--engine', choices=['cli', 'api'], default='cli',
+                       help='Execução do EnergyPlus: cli (executável) ou api (pyenergyplus '
+                            'em processos de longa duração, sem CSV intermediário; volta ao '
+                            'cli se a API não estiver disponível) (padrão: cli)')
+    parser.add_argument('--idf-workers', type=int, default=1, metavar='N',
+                       help='Processos que criam os IDFs em paralelo às simulações '
+                            '(padrão: 1, na própria thread do pipeline)')
+    parser.add_argument('--parametric', action='store_true',
+                       help='Gera um único IDF com objetos Parametric:* (simulations/'
+                            'parametric.idf) e o expande com o ParametricPreprocessor do '
+                            'EnergyPlus')
+    parser.add_argument('--screening', choices=sorted(SCREENING_PERIODS),
+                       help='Triagem: simula semanas ou meses representativos (ou apenas '
+                            'os dias de projeto) e extrapola as métricas anuais')
+    parser.add_argument('--full-year', type=int, default=0, metavar='N',
+                       help='Com --screening, refaz N amostras com o ano completo para '
+                            'validar a extrapolação (padrão: 0)')
+    parser.add_argument('--full-year-select', choices=['extremes', 'random'],
+                       default='extremes',
+                       help='Escolha das amostras de --full-year: extremos do consumo de '
+                            'resfriamento ou amostra aleatória (padrão: extremes)')
+    parser.add_argument('--read-chunksize', type=int, metavar='N',
+                       help='Extrai resultados lendo cada eplusout.csv em blocos de N linhas '
+                            '(memória constante para outputs grandes)')
+    parser.add_argument('--backend', choices=['csv', 'sql', 'eso'], default='csv',
+                       help='Fonte dos resultados: csv (eplusout.csv), sql (agregações no '
+                            'eplusout.sql) ou eso (parser direto do eplusout.eso); sql e eso '
+                            'não geram o CSV (padrão: csv)')
+    parser.add_argument('--scratch', nargs='?', const=_default_scratch(), metavar='DIR',
+                       help='Executa cada simulação em diretório temporário (padrão: '
+                            '/dev/shm) e mantém apenas os arquivos de --keep')
+    parser.add_argument('--keep', type=lambda v: [x.strip() for x in v.split(',') if x.strip()],
+                       metavar='ARQS',
+                       help='Arquivos mantidos com --scratch, separados por vírgula; '
+                            "'.gz' comprime (padrão: " + ','.join(DEFAULT_KEEP) + ')')
+    parser.add_argument('--cache', nargs='?', const=_default_cache(), metavar='DIR',
+                       help='Reaproveita simulações de IDFs idênticos (mesmo EPW e versão '
+                            'do EnergyPlus) de um cache local (padrão: '
+                            'results/simulation_cache)')
+    parser.add_argument('--cache-size', type=float, default=2.0, metavar='GB',
+                       help='Tamanho máximo do cache; remove as entradas usadas há mais '
+                            'tempo (padrão: 2)')
+    parser.add_argument('--cache-series', action='store_true',
+                       help='Guarda também o eplusout.csv.gz no cache (permite recalcular '
+                            'métricas cujas definições mudaram)')
     parser.add_argument('--output', type=str,
                        help='Caminho de saída customizado')
     
     args = parser.parse_args()
     
     # Validações
-    if not any([args.all, args.samples_only, args.analyze]):
+    if not any([args.all, args.samples_only, args.analyze, args.resume, args.worker]):
         parser.print_help()
-        print("\n❌ Erro: Especifique --all, --samples-only ou --analyze")
+        print("\n❌ Erro: Especifique --all, --samples-only, --analyze, --resume ou --worker")
+        sys.exit(1)
+    
+    if args.worker and not args.queue:
+        print("\n❌ Erro: --worker requer --queue")
         sys.exit(1)
     
     try:
-        if args.all:
-            run_full_workflow(n_samples=args.n_samples, max_workers=args.workers)
+        if args.worker:
+            adaptive = args.workers == 'auto'
+            run_worker(args.queue, base_idf=BASE_IDF_PATH, weather_file=WEATHER_FILE,
+                       max_workers=len(usable_cores()) if adaptive else args.workers,
+                       work_dir=args.scratch, adaptive=adaptive, pin_cpus=args.pin_cpus,
+                       timeout=args.timeout, speculative=args.speculative,
+                       engine=args.engine, energyplus_path=args.energyplus)
+        
+        elif args.all or args.resume:
+            if args.resume and not Path(args.resume).is_dir():
+                print(f"❌ Erro: Diretório não encontrado: {args.resume}")
+                sys.exit(1)
+            adaptive = args.workers == 'auto'
+            max_workers = len(usable_cores()) if adaptive else args.workers
+            cache = None
+            if args.cache:
+                cache = ResultCache(args.cache, max_bytes=int(args.cache_size * (1 << 30)),
+                                    keep_series=args.cache_series)
+            run_full_workflow(n_samples=args.n_samples, max_workers=max_workers,
+                              read_chunksize=args.read_chunksize, backend=args.backend,
+                              resume_dir=args.resume, adaptive=adaptive,
+                              pin_cpus=args.pin_cpus, scratch_dir=args.scratch,
+                              keep=args.keep, cache=cache, queue_dir=args.queue,
+                              timeout=args.timeout, speculative=args.speculative,
+                              screening=args.screening, full_year=args.full_year,
+                              full_year_method=args.full_year_select,
+                              engine=args.engine, energyplus_path=args.energyplus,
+                              idf_workers=args.idf_workers, parametric=args.parametric)
         
         elif args.samples_only:
             generate_samples_only(n_samples=args.n_samples, output_path=args.output)
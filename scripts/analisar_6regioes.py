@@ -12,31 +12,65 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from sensitivity.idf_index import IDFIndex
+from sensitivity.output_cache import output_exists, read_output
+
 # Configurações
 RESULTS_DIR = Path(__file__).parent.parent / "results" / "sim_6zonas_latest"
 CSV_FILE = RESULTS_DIR / "eplusout.csv"
+MODEL_FILE = Path(__file__).parent.parent / "models" / "laboratorio_6zonas.idf"
 
-# Mapeamento de variáveis para regiões
+# Mapeamento de superfícies do modelo para regiões
 REGION_MAPPING = {
-    "Região 1 (Frente-Esq)": ["Window_1_Left_Front", "Wall_Left_Windows", "Wall_Front_Blackboard"],
-    "Região 2 (Frente-Dir)": ["Wall_Right_Door", "Wall_Front_Blackboard"],
-    "Região 3 (Centro-Esq)": ["Window_2_Left_Center", "Wall_Left_Windows"],
-    "Região 4 (Centro-Dir)": ["Wall_Right_Door"],
-    "Região 5 (Fundo-Esq)": ["Window_3_Left_Back1", "Window_4_Left_Back2", "Wall_Left_Windows", "Wall_Back_AC"],
-    "Região 6 (Fundo-Dir)": ["Wall_Right_Door", "Wall_Back_AC"],
+    'Região 1 - Frente Esquerda\n(Próx. Janela 1 + Lousa)':
+        ["Wall_Left_Windows", "Wall_Front_Blackboard", "Window_1"],
+    'Região 2 - Frente Direita\n(Próx. Porta + Lousa)':
+        ["Wall_Right_Door", "Wall_Front_Blackboard"],
+    'Região 3 - Centro Esquerda\n(Próx. Janela 2)':
+        ["Wall_Left_Windows", "Window_2"],
+    'Região 4 - Centro Direita\n(Centro da sala)':
+        ["Wall_Right_Door"],
+    'Região 5 - Fundo Esquerda\n(Próx. Janelas 3,4 + ACs)':
+        ["Wall_Left_Windows", "Wall_Back_AC", "Window_3", "Window_4"],
+    'Região 6 - Fundo Direita\n(Próx. ACs)':
+        ["Wall_Right_Door", "Wall_Back_AC"],
 }
 
 
+def region_variables():
+    """
+    Variáveis de saída de cada região, a partir das superfícies do modelo.
+
+    Janelas (FenestrationSurface:Detailed) entram pelo ganho de calor solar;
+    as demais superfícies, pela temperatura da face interna.
+    """
+    idf = IDFIndex.load(MODEL_FILE)
+    region_surfaces = {}
+    for region_name, surfaces in REGION_MAPPING.items():
+        region_surfaces[region_name] = []
+        for surface in surfaces:
+            if idf.getobject('FenestrationSurface:Detailed', surface) is not None:
+                variable = 'Surface Window Heat Gain Rate [W](TimeStep)'  # Indicador de calor solar
+            elif idf.getobject('BuildingSurface:Detailed', surface) is not None:
+                variable = 'Surface Inside Face Temperature [C](TimeStep)'
+            else:
+                print(f"⚠️  Superfície {surface} não encontrada em {MODEL_FILE.name}")
+                continue
+            region_surfaces[region_name].append(f"{surface.upper()}:{variable}")
+    return region_surfaces
+
+
 def load_results():
     """Carrega resultados da simulação"""
-    if not CSV_FILE.exists():
+    if not output_exists(RESULTS_DIR):
         print(f"❌ Arquivo não encontrado: {CSV_FILE}")
         print("Execute a simulação primeiro com:")
         print("  energyplus -w weather/Fortaleza.epw -d results/sim_6zonas models/laboratorio_6zonas.idf")
         sys.exit(1)
     
     print(f"📂 Carregando resultados de: {CSV_FILE}")
-    df = pd.read_csv(CSV_FILE)
+    df = read_output(RESULTS_DIR)  # Prefere o cache colunar, se existir
     
     # Converter datetime
     if 'Date/Time' in df.columns:
@@ -92,35 +126,8 @@ def analyze_regions_temperature(df):
     temp_cols = [col for col in df.columns if 'Surface Inside Face Temperature' in col]
     window_heat_cols = [col for col in df.columns if 'Surface Window Heat Gain Rate' in col]
     
-    # Definir mapeamento de superfícies para regiões (usando nomes reais)
-    region_surfaces = {
-        'Região 1 - Frente Esquerda\n(Próx. Janela 1 + Lousa)': [
-            'WALL_LEFT_WINDOWS:Surface Inside Face Temperature [C](TimeStep)',
-            'WALL_FRONT_BLACKBOARD:Surface Inside Face Temperature [C](TimeStep)',
-            'WINDOW_1:Surface Window Heat Gain Rate [W](TimeStep)'  # Indicador de calor solar
-        ],
-        'Região 2 - Frente Direita\n(Próx. Porta + Lousa)': [
-            'WALL_RIGHT_DOOR:Surface Inside Face Temperature [C](TimeStep)',
-            'WALL_FRONT_BLACKBOARD:Surface Inside Face Temperature [C](TimeStep)'
-        ],
-        'Região 3 - Centro Esquerda\n(Próx. Janela 2)': [
-            'WALL_LEFT_WINDOWS:Surface Inside Face Temperature [C](TimeStep)',
-            'WINDOW_2:Surface Window Heat Gain Rate [W](TimeStep)'
-        ],
-        'Região 4 - Centro Direita\n(Centro da sala)': [
-            'WALL_RIGHT_DOOR:Surface Inside Face Temperature [C](TimeStep)'
-        ],
-        'Região 5 - Fundo Esquerda\n(Próx. Janelas 3,4 + ACs)': [
-            'WALL_LEFT_WINDOWS:Surface Inside Face Temperature [C](TimeStep)',
-            'WALL_BACK_AC:Surface Inside Face Temperature [C](TimeStep)',
-            'WINDOW_3:Surface Window Heat Gain Rate [W](TimeStep)',
-            'WINDOW_4:Surface Window Heat Gain Rate [W](TimeStep)'
-        ],
-        'Região 6 - Fundo Direita\n(Próx. ACs)': [
-            'WALL_RIGHT_DOOR:Surface Inside Face Temperature [C](TimeStep)',
-            'WALL_BACK_AC:Surface Inside Face Temperature [C](TimeStep)'
-        ]
-    }
+    # Mapeamento de superfícies para regiões (nomes do modelo)
+    region_surfaces = region_variables()
     
     results = []
     
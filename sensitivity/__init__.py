@@ -13,6 +13,7 @@ __author__ = "Grupo 2 - UFC Quixadá"
 from .config import (
     ALL_PARAMETERS,
     DEPENDENT_VARIABLES,
+    REGIONAL_TEMPERATURE_MODEL,
     NUM_SIMULATIONS,
     BASE_IDF_PATH,
     RESULTS_DIR,
@@ -21,8 +22,13 @@ from .config import (
 
 from .sampling import generate_sample_matrix, LHSSampler
 from .idf_modifier import IDFModifier, create_simulation_idf
+from .idf_index import IDFIndex
 from .simulation import SimulationRunner, run_sensitivity_simulations
-from .results import ResultsExtractor, extract_all_results, merge_inputs_outputs
+from .ledger import RunLedger, LEDGER_NAME
+from .result_cache import ResultCache
+from .aggregation import AggregationPlan, compile_plan
+from .results import (ResultsExtractor, ExtractionStage, extract_all_results,
+                      merge_inputs_outputs)
 from .analysis import SensitivityAnalyzer, run_sensitivity_analysis
 from .visualization import SensitivityVisualizer, create_all_plots
 
@@ -0,0 +1,319 @@
+"""
+Motor declarativo de agregação das variáveis dependentes.
+
+Compila DEPENDENT_VARIABLES e REGIONAL_TEMPERATURE_MODEL (config.py) em um
+plano de índices de colunas e reduções vetorizadas em NumPy. O plano é
+cacheado pela assinatura do cabeçalho do eplusout.csv: todas as simulações
+com o mesmo cabeçalho reutilizam o mesmo plano.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .config import DEPENDENT_VARIABLES, REGIONAL_TEMPERATURE_MODEL
+
+
+AGGREGATIONS = ('sum', 'max', 'mean', 'count_above_threshold')
+
+
+@dataclass
+class MetricPlan:
+    """Plano de cálculo de uma variável dependente."""
+    name: str
+    aggregation: str
+    indices: np.ndarray  # Posições em AggregationPlan.columns
+    scale: float = 1.0
+    threshold: Optional[float] = None
+    fill_value: float = np.nan
+
+
+@dataclass
+class RegionPlan:
+    """Plano de cálculo da temperatura de uma região conceitual."""
+    name: str
+    surfaces: List[Tuple[Optional[int], float]]  # (posição da superfície, peso)
+    windows: List[Tuple[Optional[int], float]]   # (posição da janela, peso)
+
+
+@dataclass
+class ColumnStats:
+    """Estatísticas por coluna, suficientes para calcular todas as métricas."""
+    sum: np.ndarray
+    count: np.ndarray
+    max: np.ndarray
+    above: Dict[float, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def mean(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.sum / self.count, np.nan)
+
+    def merge(self, other: 'ColumnStats') -> 'ColumnStats':
+        """
+        Combina estatísticas de dois blocos de linhas das mesmas colunas.
+
+        Permite reduzir o arquivo em blocos (streaming) com memória constante.
+        """
+        return ColumnStats(
+            sum=self.sum + other.sum,
+            count=self.count + other.count,
+            max=np.fmax(self.max, other.max),
+            above={thr: self.above[thr] + other.above[thr] for thr in self.above},
+        )
+
+
+@dataclass
+class AggregationPlan:
+    """Plano compilado para um cabeçalho específico de eplusout.csv."""
+    header: Tuple[str, ...]
+    columns: np.ndarray  # Índices das colunas necessárias no cabeçalho
+    metrics: List[MetricPlan]
+    regions: List[RegionPlan]
+    reference: Optional[int] = None
+    reference_default: float = 24.0
+    solar_divisor: float = 400.0
+
+    @property
+    def column_names(self) -> List[str]:
+        """Nomes das colunas necessárias, na ordem de AggregationPlan.columns."""
+        return [self.header[i] for i in self.columns]
+
+    @property
+    def thresholds(self) -> List[float]:
+        """Limites distintos usados por métricas count_above_threshold."""
+        return sorted({m.threshold for m in self.metrics
+                       if m.aggregation == 'count_above_threshold'})
+
+    @property
+    def output_names(self) -> List[str]:
+        return [m.name for m in self.metrics] + [r.name for r in self.regions]
+
+    def column_stats(self, values: np.ndarray) -> ColumnStats:
+        """
+        Calcula estatísticas por coluna de uma matriz de valores.
+
+        Args:
+            values: Matriz (n_linhas, len(columns)) na ordem de AggregationPlan.columns
+
+        Returns:
+            ColumnStats com soma, contagem, máximo e contagens acima dos limites
+        """
+        # Ordem Fortran: cada coluna contígua (soma pairwise, como no pandas)
+        values = np.asfortranarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+
+        count = valid.sum(axis=0)
+        total = np.where(valid, values, 0.0).sum(axis=0)
+        peak = np.max(values, axis=0, initial=-np.inf, where=valid)
+        peak[count == 0] = np.nan
+
+        above = {thr: (values > thr).sum(axis=0) for thr in self.thresholds}
+
+        return ColumnStats(sum=total, count=count, max=peak, above=above)
+
+    def timestep_rows(self, stats: ColumnStats) -> Optional[int]:
+        """Número de registros das colunas por timestep (None se o plano não usa nenhuma)."""
+        counts = [int(stats.count[pos]) for pos, i in enumerate(self.columns)
+                  if self.header[i].endswith('(TimeStep)')]
+        return max(counts) if counts else None
+
+    def finalize(self, stats: ColumnStats,
+                 expected_rows: Optional[int] = None) -> Dict[str, float]:
+        """
+        Calcula as variáveis dependentes a partir das estatísticas por coluna.
+
+        Args:
+            stats: Estatísticas por coluna
+            expected_rows: Registros por timestep esperados (None = sem verificação)
+
+        Returns:
+            Dicionário {variável: valor}
+
+        Raises:
+            ValueError: se as colunas por timestep não têm expected_rows registros
+                (ex.: dias de projeto misturados aos RunPeriods)
+        """
+        if expected_rows is not None:
+            rows = self.timestep_rows(stats)
+            if rows is not None and rows != expected_rows:
+                raise ValueError(f"{rows} registros por timestep; esperados {expected_rows} "
+                                 f"para o período simulado")
+
+        results = {}
+
+        for metric in self.metrics:
+            idx = metric.indices
+            if len(idx) == 0:
+                results[metric.name] = float(metric.fill_value)
+                continue
+
+            if metric.aggregation == 'sum':
+                value = stats.sum[idx].sum()
+            elif metric.aggregation == 'max':
+                peaks = stats.max[idx]
+                value = np.nan if np.isnan(peaks).all() else np.nanmax(peaks)
+            elif metric.aggregation == 'mean':
+                value = stats.mean[idx].mean()
+            else:  # count_above_threshold: média entre as zonas
+                value = stats.above[metric.threshold][idx].mean()
+
+            results[metric.name] = float(value * metric.scale)
+
+        if self.regions:
+            means = stats.mean
+            zone_temp = means[self.reference] if self.reference is not None else self.reference_default
+
+            for region in self.regions:
+                temp = zone_temp
+                for pos, weight in region.surfaces:
+                    t_surface = means[pos] if pos is not None else zone_temp
+                    temp += weight * (t_surface - zone_temp)
+                for pos, weight in region.windows:
+                    solar = means[pos] if pos is not None else 0.0
+                    temp += weight * solar / self.solar_divisor
+                results[region.name] = float(temp)
+
+        return results
+
+    def evaluate(self, values: np.ndarray,
+                 expected_rows: Optional[int] = None) -> Dict[str, float]:
+        """Calcula todas as variáveis de uma só vez a partir da matriz de valores."""
+        return self.finalize(self.column_stats(values), expected_rows)
+
+    def evaluate_chunks(self, chunks: Iterable[np.ndarray],
+                        expected_rows: Optional[int] = None) -> Dict[str, float]:
+        """
+        Calcula as variáveis a partir de blocos de linhas (acumuladores online).
+
+        Args:
+            chunks: Matrizes (n_linhas_bloco, len(columns)) em sequência
+            expected_rows: Registros por timestep esperados (ver finalize)
+
+        Returns:
+            Mesmo resultado de evaluate() sobre a concatenação dos blocos
+        """
+        stats = self.column_stats(np.empty((0, len(self.columns))))
+        for values in chunks:
+            stats = stats.merge(self.column_stats(values))
+        return self.finalize(stats, expected_rows)
+
+    def empty_results(self) -> Dict[str, float]:
+        """Resultado com NaN para todas as variáveis (arquivo ausente/inválido)."""
+        return {name: np.nan for name in self.output_names}
+
+
+_PLAN_CACHE: Dict[Tuple[Tuple[str, ...], Optional[Tuple[str, ...]]], AggregationPlan] = {}
+
+
+def _match(header_lower: Sequence[str], *terms: str) -> List[int]:
+    """Índices das colunas que contêm todos os termos (sem distinção de maiúsculas)."""
+    terms = [t.lower() for t in terms]
+    return [i for i, col in enumerate(header_lower) if all(t in col for t in terms)]
+
+
+def output_names(variables: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Nomes das variáveis produzidas pelo motor, na ordem de saída.
+
+    Args:
+        variables: Subconjunto de variáveis (None = todas)
+    """
+    names = list(DEPENDENT_VARIABLES) + list(REGIONAL_TEMPERATURE_MODEL['regions'])
+    if variables is None:
+        return names
+    return [n for n in names if n in variables]
+
+
+def compile_plan(header: Sequence[str],
+                 variables: Optional[Sequence[str]] = None) -> AggregationPlan:
+    """
+    Compila (ou recupera do cache) o plano de agregação para um cabeçalho.
+
+    Args:
+        header: Nomes das colunas do eplusout.csv
+        variables: Subconjunto de variáveis a calcular (None = todas)
+
+    Returns:
+        AggregationPlan reutilizável para qualquer arquivo com o mesmo cabeçalho
+    """
+    key = (tuple(header), tuple(sorted(variables)) if variables is not None else None)
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = _build_plan(key[0], variables)
+        _PLAN_CACHE[key] = plan
+    return plan
+
+
+def _build_plan(header: Tuple[str, ...],
+                variables: Optional[Sequence[str]]) -> AggregationPlan:
+    header_lower = [col.lower() for col in header]
+    wanted = set(output_names(variables))
+
+    # Variáveis dependentes declaradas em config.py
+    metric_columns = []
+    for name, spec in DEPENDENT_VARIABLES.items():
+        if name not in wanted:
+            continue
+        aggregation = spec['aggregation']
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Agregação não suportada em {name}: {aggregation}")
+
+        cols = sorted({i for term in spec['columns'] for i in _match(header_lower, term)})
+        if spec.get('first_only') and cols:
+            cols = cols[:1]
+        metric_columns.append((name, spec, cols))
+
+    # Modelo das temperaturas regionais
+    model = REGIONAL_TEMPERATURE_MODEL
+    region_specs = [(name, spec) for name, spec in model['regions'].items() if name in wanted]
+
+    def first(*terms: str) -> Optional[int]:
+        found = _match(header_lower, *terms)
+        return found[0] if found else None
+
+    reference = None
+    region_columns = []
+    if region_specs:
+        reference = first(model['reference'])
+        for name, spec in region_specs:
+            surfaces = [(first(surface, model['surface_variable']), weight)
+                        for surface, weight in spec.get('surfaces', {}).items()]
+            windows = [(first(window, model['window_variable']), weight)
+                       for window, weight in spec.get('windows', {}).items()]
+            region_columns.append((name, surfaces, windows))
+
+    # Colunas necessárias, na ordem do arquivo; métricas referenciam posições nesta lista
+    needed = {c for _, _, cols in metric_columns for c in cols}
+    needed |= {c for _, surfaces, windows in region_columns
+               for c, _ in surfaces + windows if c is not None}
+    if reference is not None:
+        needed.add(reference)
+    columns = sorted(needed)
+    pos = {col: i for i, col in enumerate(columns)}
+
+    def remap(items):
+        return [(pos[c] if c is not None else None, weight) for c, weight in items]
+
+    metrics = [
+        MetricPlan(
+            name=name,
+            aggregation=spec['aggregation'],
+            indices=np.array([pos[c] for c in cols], dtype=np.intp),
+            scale=spec.get('scale', 1.0),
+            threshold=spec.get('threshold'),
+            fill_value=spec.get('fill_value', np.nan),
+        )
+        for name, spec, cols in metric_columns
+    ]
+    regions = [RegionPlan(name=name, surfaces=remap(surfaces), windows=remap(windows))
+               for name, surfaces, windows in region_columns]
+
+    return AggregationPlan(
+        header=header,
+        columns=np.array(columns, dtype=np.intp),
+        metrics=metrics,
+        regions=regions,
+        reference=pos[reference] if reference is not None else None,
+        reference_default=model['reference_default'],
+        solar_divisor=model['solar_divisor'],
+    )
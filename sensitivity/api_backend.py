@@ -0,0 +1,168 @@
+"""
+Execução do EnergyPlus no próprio processo via API Python (pyenergyplus).
+
+Cada worker é um processo Python de longa duração que carrega a biblioteca
+do EnergyPlus uma única vez e roda uma simulação por vez, cada uma com um
+estado (state) novo. Um callback ao fim de cada timestep de zona lê apenas
+as variáveis e medidores usados pelo plano de agregação (aggregation.py)
+direto para arrays NumPy: não há eplusout.csv, ReadVarsESO nem parse do ESO.
+As métricas são devolvidas ao runner, que grava o metrics.json.
+
+O pyenergyplus vem junto com a instalação do EnergyPlus (>= 9.3), no mesmo
+diretório do executável. Sem ele, SimulationRunner volta ao executável (CLI).
+
+Nota: variáveis do timestep de sistema (HVAC) são lidas no fim do timestep de
+zona; o CSV reporta a média dos subpassos. Para o ZoneHVAC:IdealLoadsAirSystem
+do modelo os dois coincidem na prática.
+"""
+
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .aggregation import compile_plan
+
+
+# Valor de kind_of_sim para o período do arquivo climático
+KIND_RUN_PERIOD_WEATHER = 3
+
+_api = None
+_cancel = None
+
+
+def api_available(energyplus_path: str) -> bool:
+    """True se a instalação do EnergyPlus traz o pacote pyenergyplus."""
+    return (Path(energyplus_path).resolve().parent / 'pyenergyplus' / 'api.py').exists()
+
+
+def _init_worker(energyplus_dir: str, cancel_event):
+    """Inicializador do processo worker: importa a API uma única vez."""
+    global _api, _cancel
+    sys.path.insert(0, energyplus_dir)
+    from pyenergyplus.api import EnergyPlusAPI
+    _api = EnergyPlusAPI()
+    _cancel = cancel_event
+
+
+def _available_columns(state) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Variáveis e medidores disponíveis, como (cabeçalho estilo CSV, nome, chave).
+
+    O cabeçalho reproduz o do eplusout.csv ('CHAVE:Variável' ou 'Medidor'),
+    de modo que o mesmo plano de agregação encontra as mesmas colunas.
+    """
+    listing = _api.exchange.list_available_api_data_csv(state).decode('utf-8', 'ignore')
+    columns = []
+    for line in listing.splitlines():
+        fields = [f.strip() for f in line.split(',')]
+        if fields[0] == 'OutputVariable' and len(fields) >= 3:
+            columns.append((f"{fields[2]}:{fields[1]}", fields[1], fields[2]))
+        elif fields[0] == 'OutputMeter' and len(fields) >= 2:
+            columns.append((fields[1], fields[1], None))
+    return columns
+
+
+def run_in_process(idf_path: str, weather_file: str, run_dir: str,
+                   timeout: float) -> Dict:
+    """
+    Executa uma simulação no worker e calcula as métricas em memória.
+
+    Returns:
+        {'returncode', 'metrics' (None se nada foi coletado), 'rows', 'error'}
+    """
+    api = _api
+    state = api.state_manager.new_state()
+    api.runtime.set_console_output_status(state, False)
+    deadline = time.monotonic() + timeout
+
+    collected = {'plan': None, 'handles': None, 'weather': [], 'design': []}
+    stopped = []
+
+    def on_timestep(state_):
+        if _cancel.is_set() or time.monotonic() > deadline:
+            if not stopped:
+                stopped.append('Cancelada' if _cancel.is_set() else
+                               f'Timeout - simulação excedeu {timeout / 60:g} minutos')
+                api.runtime.stop_simulation(state_)
+            return
+        if not api.exchange.api_data_fully_ready(state_) or api.exchange.warmup_flag(state_):
+            return
+
+        if collected['handles'] is None:
+            # Primeiro timestep: resolve só as colunas que o plano usa
+            available = _available_columns(state_)
+            plan = compile_plan(tuple(header for header, _, _ in available))
+            handles = []
+            for col in plan.columns:
+                _, name, key = available[col]
+                if key is None:
+                    handles.append((True, api.exchange.get_meter_handle(state_, name)))
+                else:
+                    handles.append((False, api.exchange.get_variable_handle(state_, name, key)))
+            collected['plan'], collected['handles'] = plan, handles
+
+        row = [api.exchange.get_meter_value(state_, h) if is_meter
+               else api.exchange.get_variable_value(state_, h)
+               for is_meter, h in collected['handles']]
+        kind = api.exchange.kind_of_sim(state_)
+        collected['weather' if kind == KIND_RUN_PERIOD_WEATHER else 'design'].append(row)
+
+    api.runtime.callback_end_zone_timestep_after_zone_reporting(state, on_timestep)
+    try:
+        returncode = api.runtime.run_energyplus(
+            state, ['-w', str(weather_file), '-d', str(run_dir), str(idf_path)])
+    finally:
+        api.state_manager.delete_state(state)
+
+    if stopped:
+        return {'returncode': returncode, 'metrics': None, 'rows': 0, 'error': stopped[0]}
+
+    # Período do arquivo climático; só dias de projeto quando não há run period
+    rows = collected['weather'] or collected['design']
+    if collected['plan'] is None or not rows:
+        return {'returncode': returncode, 'metrics': None, 'rows': 0, 'error': None}
+    values = np.asarray(rows, dtype=np.float64)
+    return {'returncode': returncode, 'metrics': collected['plan'].evaluate(values),
+            'rows': len(rows), 'error': None}
+
+
+class ApiWorkerPool:
+    """Pool de processos de longa duração que executam o EnergyPlus via API."""
+
+    # Simulações por processo antes de reciclá-lo (libera memória da biblioteca)
+    MAX_TASKS_PER_CHILD = 50
+
+    def __init__(self, energyplus_path: str, max_workers: int):
+        # spawn: cada worker carrega a biblioteca do EnergyPlus do zero
+        ctx = multiprocessing.get_context('spawn')
+        self._cancel = ctx.Event()
+        kwargs = {}
+        if sys.version_info >= (3, 11):
+            kwargs['max_tasks_per_child'] = self.MAX_TASKS_PER_CHILD
+        # Processos são criados sob demanda, até max_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(str(Path(energyplus_path).resolve().parent), self._cancel),
+            **kwargs,
+        )
+
+    def run(self, idf_path: str, weather_file: str, run_dir: str, timeout: float) -> Dict:
+        """Executa uma simulação em um worker (bloqueia até terminar)."""
+        return self._executor.submit(run_in_process, str(idf_path), str(weather_file),
+                                     str(run_dir), timeout).result()
+
+    def cancel(self):
+        """Interrompe as simulações em andamento no próximo timestep."""
+        self._cancel.set()
+
+    def reset(self):
+        """Libera novas simulações após cancel()."""
+        self._cancel.clear()
+
+    def shutdown(self):
+        """Encerra os processos worker."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -139,28 +139,54 @@ ALL_PARAMETERS = [
 
 # ==================== VARIÁVEIS DEPENDENTES ====================
 
+# Cada variável é calculada pelo motor declarativo em aggregation.py:
+# - 'columns': trechos (sem distinção de maiúsculas) que identificam as colunas do eplusout.csv
+# - 'aggregation': redução por coluna (sum, max, mean, count_above_threshold)
+# - 'scale': fator de conversão aplicado ao resultado (ex.: J -> kWh)
+# - 'first_only': usa apenas a primeira coluna encontrada
+# - 'fill_value': valor quando nenhuma coluna é encontrada (padrão: NaN)
+
 DEPENDENT_VARIABLES = {
     'consumo_anual_resfriamento': {
         'output_var': 'Cooling:Electricity',
         'aggregation': 'sum',
+        'columns': [
+            'DistrictCooling:Facility',
+            'Zone Ideal Loads Zone Total Cooling Energy',
+            'Zone Ideal Loads Supply Air Total Cooling Energy',
+        ],
+        'scale': 1.0 / 3.6e6,  # J -> kWh
         'unit': 'kWh/ano',
         'description': 'Energia de resfriamento (carga térmica removida pelo AC)'
     },
     'consumo_anual_aquecimento': {
         'output_var': 'Heating:Energy',
         'aggregation': 'sum',
+        'columns': [
+            'Zone Ideal Loads Zone Total Heating Energy',
+            'Zone Ideal Loads Supply Air Total Heating Energy',
+        ],
+        'scale': 1.0 / 3.6e6,  # J -> kWh
+        'fill_value': 0.0,  # Sem aquecimento
         'unit': 'kWh/ano',
         'description': 'Energia de aquecimento (se houver)'
     },
     'consumo_eletricidade_total': {
         'output_var': 'Electricity:Facility',
         'aggregation': 'sum',
+        'columns': ['Electricity:Facility'],
+        'scale': 1.0 / 3.6e6,  # J -> kWh
         'unit': 'kWh/ano',
         'description': 'Consumo elétrico total da edificação'
     },
     'carga_pico_resfriamento': {
         'output_var': 'Zone Air System Sensible Cooling Rate',
         'aggregation': 'max',
+        'columns': [
+            'Zone Ideal Loads Zone Total Cooling Energy',
+            'DistrictCooling:Facility',
+        ],
+        'scale': 1.0 / 900.0 / 1000.0,  # J por timestep (900 s) -> kW
         'unit': 'kW',
         'description': 'Carga térmica de pico para dimensionamento'
     },
@@ -168,29 +194,107 @@ DEPENDENT_VARIABLES = {
         'output_var': 'Zone Operative Temperature',
         'aggregation': 'count_above_threshold',
         'threshold': 26.0,
+        'columns': ['Operative Temp', 'Zone Mean Air Temp', 'Zone Air Temperature'],
         'unit': 'horas',
         'description': 'Horas acima de 26°C (AC insuficiente)'
     },
     'ganho_solar_transmitido': {
         'output_var': 'Surface Window Transmitted Solar Radiation Rate',
         'aggregation': 'sum',
+        'columns': ['Surface Window Transmitted Solar Radiation Rate'],
+        'scale': (1.0 / 6.0) / 1000.0,  # W em timestep de 10 min -> kWh
         'unit': 'kWh/ano',
         'description': 'Radiação solar transmitida através das janelas'
     },
     'ganho_calor_janelas': {
         'output_var': 'Surface Window Heat Gain Rate',
         'aggregation': 'sum',
+        'columns': ['Surface Window Heat Gain Rate'],
+        'scale': (1.0 / 6.0) / 1000.0,  # W em timestep de 10 min -> kWh
         'unit': 'kWh/ano',
         'description': 'Ganho de calor total pelas janelas (solar + condução)'
     },
     'temperatura_media_anual': {
         'output_var': 'Zone Mean Air Temperature',
         'aggregation': 'mean',
+        'columns': ['Zone Mean Air Temperature'],
+        'first_only': True,
         'unit': '°C',
         'description': 'Temperatura média anual da zona'
     }
 }
 
+# ==================== TEMPERATURAS REGIONAIS ====================
+
+# As 6 regiões são divisões conceituais (não zonas físicas). A temperatura de
+# cada região combina:
+# 1. Temperatura média da zona (base)
+# 2. Fração da diferença para superfícies adjacentes ('surfaces': peso)
+# 3. Incremento por radiação solar nas janelas ('windows': peso × W / solar_divisor)
+# NOTA: Fatores reduzidos para evitar temperaturas irrealistas
+REGIONAL_TEMPERATURE_MODEL = {
+    'reference': 'Zone Mean Air Temperature',
+    'reference_default': 24.0,
+    'surface_variable': 'Inside Face Temperature',
+    'window_variable': 'Transmitted Solar',
+    'solar_divisor': 400.0,  # aprox: 200W ~ +0.5°C
+    'regions': {
+        # Frente-Esquerda (janela 1)
+        'temp_regiao_1': {
+            'surfaces': {'WALL_LEFT_WINDOWS': 0.15, 'WALL_FRONT_BLACKBOARD': 0.10},
+            'windows': {'WINDOW_1': 1.0},
+        },
+        # Frente-Direita (porta)
+        'temp_regiao_2': {
+            'surfaces': {'WALL_RIGHT_DOOR': 0.20, 'WALL_FRONT_BLACKBOARD': 0.10},
+        },
+        # Centro-Esquerda (janela 2)
+        'temp_regiao_3': {
+            'surfaces': {'WALL_LEFT_WINDOWS': 0.15},
+            'windows': {'WINDOW_2': 1.0},
+        },
+        # Centro (longe janelas)
+        'temp_regiao_4': {
+            'surfaces': {'WALL_FRONT_BLACKBOARD': 0.05, 'WALL_BACK_AC': 0.05},
+        },
+        # Fundo-Esquerda (janelas 3,4)
+        'temp_regiao_5': {
+            'surfaces': {'WALL_BACK_AC': 0.10, 'WALL_LEFT_WINDOWS': 0.10},
+            'windows': {'WINDOW_3': 0.3, 'WINDOW_4': 0.3},
+        },
+        # Fundo-Direita (ACs)
+        'temp_regiao_6': {
+            'surfaces': {'WALL_BACK_AC': 0.20, 'WALL_RIGHT_DOOR': 0.10},
+        },
+    },
+}
+
+# ==================== MODO DE TRIAGEM (SCREENING) ====================
+
+# Períodos reduzidos para uma primeira rodada de ranqueamento dos parâmetros
+# (--screening). 'periods': (mês início, dia início, mês fim, dia fim), cada
+# um vira um RunPeriod; 'design_days': simula apenas os SizingPeriod:DesignDay
+# do IDF base (o número de dias vem do próprio IDF). Métricas extensivas (sum,
+# count_above_threshold) são extrapoladas para o ano por 365 / dias simulados;
+# mean e max são mantidas. Dias de projeto servem só para ranqueamento: nada
+# é extrapolado.
+# Timesteps por hora do IDF base (Timestep,6); com os dias simulados, dá o
+# número de registros esperado nos outputs de uma simulação de triagem
+TIMESTEPS_PER_HOUR = 6
+
+SCREENING_PERIODS = {
+    # Uma semana no meio de cada trimestre
+    'weeks': {'periods': [(1, 15, 1, 21), (4, 15, 4, 21), (7, 15, 7, 21), (10, 15, 10, 21)]},
+    # Um mês por trimestre
+    'months': {'periods': [(1, 1, 1, 31), (4, 1, 4, 30), (7, 1, 7, 31), (10, 1, 10, 31)]},
+    # Dias de projeto de aquecimento e resfriamento (apenas ranqueamento)
+    'designdays': {'design_days': True},
+}
+
+# Simulações anuais completas após a triagem: 'extremes' (menores e maiores
+# valores de SCREENING_KPI) ou 'random' (amostra de validação)
+SCREENING_KPI = 'consumo_anual_resfriamento'
+
 # ==================== CONFIGURAÇÕES DA SIMULAÇÃO ====================
 
 # Diretório base do projeto (parent do diretório sensitivity)
@@ -211,5 +315,11 @@ RESULTS_DIR = str(_BASE_DIR / 'results' / 'sensitivity_analysis')
 # Arquivo climático
 WEATHER_FILE = str(_BASE_DIR / 'weather' / 'Quixada_UFC.epw')
 
+# IDD do EnergyPlus usado pelo eppy (ENERGYPLUS_IDD sobrescreve)
+IDD_PATH = os.environ.get('ENERGYPLUS_IDD', r"C:\EnergyPlusV25-1-0\Energy+.idd")
+
+# Cache do IDD já interpretado pelo eppy (pickle); None desativa
+IDD_CACHE_DIR = str(_BASE_DIR / 'results' / 'idd_cache')
+
 # Seeds para reprodutibilidade
 RANDOM_SEED = 42
@@ -0,0 +1,130 @@
+"""
+Backend de extração a partir do eplusout.eso, sem ReadVarsESO.
+
+O dicionário de dados do ESO é lido uma única vez; os nomes de colunas no
+estilo do eplusout.csv são reconstruídos a partir dele, de modo que o mesmo
+plano de agregação (aggregation.py) escolhe os códigos de relatório
+necessários. As linhas de dados são lidas em streaming e apenas os valores
+desses códigos são acumulados em arrays tipados (array('d')), reduzidos
+depois com NumPy.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .aggregation import AggregationPlan, ColumnStats, compile_plan
+
+
+ESO_NAME = 'eplusout.eso'
+
+END_OF_DICTIONARY = 'End of Data Dictionary'
+END_OF_DATA = 'End of Data'
+
+# Códigos fixos do ESO (ambiente e carimbos de tempo), não são variáveis
+_TIME_CODES = 6
+
+
+def _column_name(line: str) -> Tuple[str, str]:
+    """
+    Converte uma linha do dicionário do ESO no nome de coluna do CSV.
+
+    Ex.: '7,1,LABORATORIO_ZONE,Zone Mean Air Temperature [C] !TimeStep'
+    -> ('7', 'LABORATORIO_ZONE:Zone Mean Air Temperature [C](TimeStep)')
+    Medidores não têm chave: '13,1,Electricity:Facility [J] !TimeStep'.
+    """
+    definition, _, frequency = line.partition('!')
+    parts = definition.strip().split(',', 3)
+    code = parts[0]
+    label = ':'.join(p.strip() for p in parts[2:])
+
+    # '!Daily [Value,Min,Hour,...]' -> 'Daily' (mesmo sufixo do eplusout.csv)
+    frequency = frequency.strip().split(' [')[0].strip()
+    return code, f"{label}({frequency})"
+
+
+def read_dictionary(eso_file: str) -> Tuple[List[str], List[str]]:
+    """
+    Lê apenas o dicionário de dados do ESO.
+
+    Returns:
+        (nomes de colunas no estilo CSV, códigos de relatório correspondentes)
+    """
+    header, codes = [], []
+
+    with open(eso_file, 'r', encoding='utf-8', errors='ignore') as f:
+        next(f)  # Program Version
+        for line in f:
+            if line.startswith(END_OF_DICTIONARY):
+                break
+            code, name = _column_name(line)
+            if int(code) <= _TIME_CODES:
+                continue
+            header.append(name)
+            codes.append(code)
+
+    return header, codes
+
+
+def _stream_values(eso_file: str, codes: Sequence[str]) -> List[array]:
+    """
+    Lê as linhas de dados e acumula os valores dos códigos pedidos.
+
+    Para frequências agregadas (diária, mensal...), usa o primeiro valor da
+    linha, como o ReadVarsESO.
+    """
+    position = {code: i for i, code in enumerate(codes)}
+    series = [array('d') for _ in codes]
+    lookup = position.get
+
+    with open(eso_file, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            if line.startswith(END_OF_DICTIONARY):
+                break
+
+        for line in f:
+            code, _, rest = line.partition(',')
+            pos = lookup(code)
+            if pos is None:
+                if code.startswith(END_OF_DATA):
+                    break
+                continue
+            value = rest.split(',', 1)[0]
+            series[pos].append(float(value))
+
+    return series
+
+
+def _series_stats(plan: AggregationPlan, series: List[array]) -> ColumnStats:
+    """Estatísticas por coluna para séries de comprimentos diferentes."""
+    if not series:
+        return plan.column_stats(np.empty((0, 0)))
+
+    per_column = [plan.column_stats(np.frombuffer(values, dtype=np.float64).reshape(-1, 1))
+                  for values in series]
+
+    return ColumnStats(
+        sum=np.concatenate([s.sum for s in per_column]),
+        count=np.concatenate([s.count for s in per_column]),
+        max=np.concatenate([s.max for s in per_column]),
+        above={thr: np.concatenate([s.above[thr] for s in per_column])
+               for thr in plan.thresholds},
+    )
+
+
+def extract_from_eso(eso_file: str, variables: Optional[Sequence[str]] = None,
+                     expected_rows: Optional[int] = None) -> Dict[str, float]:
+    """
+    Calcula as variáveis dependentes diretamente do eplusout.eso.
+
+    Args:
+        eso_file: Caminho do eplusout.eso
+        variables: Subconjunto de variáveis (None = todas)
+        expected_rows: Registros por timestep esperados (ver AggregationPlan.finalize)
+
+    Returns:
+        Dicionário {variável: valor}, igual ao do backend CSV
+    """
+    header, codes = read_dictionary(eso_file)
+    plan = compile_plan(tuple(header), variables)
+    series = _stream_values(eso_file, [codes[i] for i in plan.columns])
+    return plan.finalize(_series_stats(plan, series), expected_rows)
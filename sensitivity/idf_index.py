@@ -0,0 +1,475 @@
+"""
+Leitor/gravador leve de IDF, sem eppy.
+
+IDFIndex interpreta um modelo em poucos milissegundos: uma única passada por
+expressão regular encontra os limites, a classe e o nome de cada objeto e
+monta índices por classe e por (classe, nome), com getobject em O(1). Os
+campos de um objeto só são decodificados quando acessados. A gravação é
+fiel ao original: objetos não alterados saem com o texto exato (comentários,
+espaçamento), e os alterados só têm os valores editados substituídos.
+
+Com um Energy+.idd (idd_path), os campos também são acessados pelos nomes do
+eppy (ex.: mat.Solar_Absorptance), de modo que o mesmo código de
+IDFModifier opera sobre um IDFIndex ou sobre um IDF do eppy. Sem IDD, os
+campos são acessados por índice (obj.obj[i], com a classe em obj.obj[0]).
+Os valores são sempre strings, como estão no arquivo.
+"""
+
+import os
+import re
+from pathlib import Path
+from string import ascii_letters, digits
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from .idf_template import COMMENT_COLUMN, COMMENT_SEPARATOR, format_field, format_value
+
+
+# Comentário até o fim da linha ou separador de campos
+_TOKEN = re.compile(r'!.*|[,;]')
+# Campo no IDD: 'A1 , \field Name' (o \field pode faltar)
+_IDD_FIELD = re.compile(r'^\s*[AN]\d+\s*[,;]\s*(?:\\field\s+(.*?))?\s*$')
+# Restante da linha após o ';' quando só há um comentário
+_LINE_END = re.compile(r'(?:[ \t]*!.*)?')
+# Separador seguido de espaços até um comentário na mesma linha
+_ALIGNED = re.compile(r'([,;])([ \t]*)(?=!)')
+_LEGAL = set(ascii_letters + digits + ' ')
+
+_IDD_TEXT: Dict[str, str] = {}
+_IDD_CLASSES: Dict[Tuple[str, str], Optional[Tuple[str, List[str]]]] = {}
+
+
+def _eppy_name(idd_field: str) -> str:
+    """Nome do campo como o eppy o expõe (bunchhelpers.makefieldname)."""
+    return ''.join(c for c in idd_field if c in _LEGAL).replace(' ', '_')
+
+
+def idd_class(idd_path: str, key: str) -> Optional[Tuple[str, List[str]]]:
+    """
+    Nome da classe (grafia do IDD) e nomes dos campos, lidos do Energy+.idd.
+
+    Só a classe pedida é interpretada; o texto do IDD é lido uma vez por processo.
+
+    Returns:
+        (classe, ['key', campo1, ...]) ou None se a classe não existe no IDD
+    """
+    cache_key = (idd_path, key.upper())
+    if cache_key not in _IDD_CLASSES:
+        if idd_path not in _IDD_TEXT:
+            with open(idd_path, encoding='latin-1') as f:
+                _IDD_TEXT[idd_path] = f.read()
+        text = _IDD_TEXT[idd_path]
+        match = re.search(r'^(%s)\s*[,;]' % re.escape(key), text, re.M | re.I)
+        if match is None:
+            _IDD_CLASSES[cache_key] = None
+        else:
+            names = ['key']
+            for line in text[match.end():].splitlines()[1:]:
+                if line[:1] not in ('', ' ', '\t', '\\', '!'):
+                    break  # Próxima classe
+                field = _IDD_FIELD.match(line)
+                if field:
+                    names.append(_eppy_name(field.group(1) or ''))
+            _IDD_CLASSES[cache_key] = (match.group(1), names)
+    return _IDD_CLASSES[cache_key]
+
+
+class Slot(NamedTuple):
+    """Lacuna de um SpliceTemplate: valor de um campo variável."""
+    key: object        # Identificação da lacuna (ex.: nome do parâmetro)
+    original: str      # Texto original do trecho (valor, separador e espaços)
+    last: bool         # Último campo do objeto
+    sep: str           # Separador incluído no trecho ('' = só o valor)
+    width: int         # Largura do valor + espaços até o comentário
+
+
+def _aligned(text: str, sep: str, width: int) -> str:
+    """Valor com o separador e os espaços que mantêm a coluna do comentário."""
+    if not sep:
+        return text
+    return text + sep + ' ' * max(1, width - len(text))
+
+
+def _decode(source: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Valores (classe em [0]) e posições (início, fim) de cada valor em source."""
+    values, spans = [], []
+    start = 0
+    for match in _TOKEN.finditer(source):
+        if match.group() != ',' and match.group() != ';':
+            start = match.end()
+            continue
+        chunk = source[start:match.start()]
+        stripped = chunk.strip()
+        if stripped:
+            begin = start + len(chunk) - len(chunk.lstrip())
+            spans.append((begin, begin + len(stripped)))
+        else:
+            # Campo vazio: o valor entra logo antes do separador
+            spans.append((match.start(), match.start()))
+        values.append(stripped)
+        start = match.end()
+    return values, spans
+
+
+class IDFObject:
+    """Objeto de um IDFIndex; campos decodificados sob demanda."""
+
+    def __init__(self, index: 'IDFIndex', key: str, name: Optional[str],
+                 source: Optional[str], prefix: str):
+        fields = object.__setattr__
+        fields(self, '_index', index)
+        fields(self, 'key', key)
+        fields(self, 'name', name)
+        fields(self, '_source', source)    # Texto original (None = objeto novo)
+        fields(self, 'prefix', prefix)     # Texto entre o objeto anterior e este
+        fields(self, '_values', None)
+        fields(self, '_original', None)
+        fields(self, '_spans', None)
+
+    def _decoded(self):
+        if self._values is None:
+            values, spans = _decode(self._source)
+            object.__setattr__(self, '_original', list(values))
+            object.__setattr__(self, '_values', values)
+            object.__setattr__(self, '_spans', spans)
+        return self._values
+
+    @property
+    def obj(self) -> List:
+        """Valores dos campos, com a classe em [0] (como eppy)."""
+        return self._decoded()
+
+    @property
+    def fieldnames(self) -> List[str]:
+        """Nomes dos campos (eppy), com 'key' em [0]; requer o IDD."""
+        schema = self._index._schema(self.key)
+        if schema is None:
+            raise AttributeError('fieldnames')
+        names = schema[1]
+        return names + [''] * (len(self.obj) - len(names))
+
+    def _field_index(self, name: str) -> int:
+        if self._index.idd_path is None and name == 'Name':
+            return 1
+        try:
+            return self.fieldnames.index(name)
+        except ValueError:
+            raise AttributeError(f"{self.key} não tem o campo {name}") from None
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name == 'fieldnames':
+            # A propriedade falhou: classe ausente no IDD
+            raise AttributeError(f"{self.key}: nomes de campo requerem a classe no IDD (idd_path)")
+        index = self._field_index(name)
+        values = self._decoded()
+        return values[index] if index < len(values) else ''
+
+    def __setattr__(self, name: str, value):
+        if name in ('key', 'name', 'prefix'):
+            object.__setattr__(self, name, value)
+        else:
+            self[self._field_index(name)] = value
+
+    def __getitem__(self, index: int):
+        return self._decoded()[index]
+
+    def __setitem__(self, index: int, value):
+        values = self._decoded()
+        if index >= len(values):
+            values.extend([''] * (index + 1 - len(values)))
+        values[index] = value
+        if index == 1:
+            self._index._rename(self, str(value))
+
+    def _changed(self, i: int) -> bool:
+        value = self._values[i]
+        return not (i < len(self._original) and isinstance(value, str)
+                    and value == self._original[i])
+
+    def _region(self, i: int) -> Tuple[int, int, str, int]:
+        """
+        Trecho do valor i no texto original: (início, fim, separador, largura).
+
+        Com um comentário na mesma linha, o trecho inclui o separador e os
+        espaços até o comentário, para manter a coluna do '!-'.
+        """
+        begin, end = self._spans[i]
+        aligned = _ALIGNED.match(self._source, end)
+        if aligned is None:
+            return begin, end, '', 0
+        return begin, aligned.end(), aligned.group(1), aligned.end() - begin - 1
+
+    def parts(self, holes: Optional[Dict[int, object]] = None) -> List:
+        """
+        Texto do objeto como lista de strings e Slots (holes[i] no lugar do valor i).
+
+        Objetos sem alteração mantêm o texto original; nos alterados, só os
+        valores editados mudam. Objetos novos ou com campos acrescentados são
+        escritos no formato do eppy.
+        """
+        holes = holes or {}
+        if self._source is not None and self._values is None and not holes:
+            return [self._source]
+        values = self._decoded()
+        if self._source is not None and len(values) == len(self._original):
+            parts, position = [], 0
+            for i in range(1, len(values)):
+                if i not in holes and not self._changed(i):
+                    continue
+                begin, end, sep, width = self._region(i)
+                last = i == len(values) - 1
+                if i in holes:
+                    part = Slot(holes[i], self._source[begin:end], last, sep, width)
+                else:
+                    part = _aligned(format_value(values[i], last), sep, width)
+                parts += [self._source[position:begin], part]
+                position = end
+            parts.append(self._source[position:])
+            return parts
+
+        names = self._index._comments(self.key, len(values))
+        parts = [f"{values[0]},"]
+        for i in range(1, len(values)):
+            last = i == len(values) - 1
+            if i in holes:
+                # Mesma coluna de format_field: '    ' + valor + sep, ljust, '    !- '
+                sep, width = (';' if last else ','), COMMENT_COLUMN - 4
+                text = _aligned(format_value(values[i], last), sep, width)
+                parts += ['\n    ', Slot(holes[i], text, last, sep, width),
+                          COMMENT_SEPARATOR[1:] + names[i]]
+            else:
+                parts += ['\n', format_field(values[i], names[i], last)]
+        return parts
+
+    def __repr__(self):
+        return ''.join(str(part) for part in self.parts())
+
+
+class _ClassView:
+    """idfobjects do IDFIndex: classe (qualquer grafia) -> objetos, na ordem do arquivo."""
+
+    def __init__(self, index: 'IDFIndex'):
+        self._index = index
+
+    def __getitem__(self, key: str) -> List[IDFObject]:
+        return list(self._index._by_class.get(key.upper(), ()))
+
+    def __contains__(self, key: str) -> bool:
+        return key.upper() in self._index._by_class
+
+    def keys(self):
+        return self._index._by_class.keys()
+
+
+class IDFIndex:
+    """
+    Modelo IDF indexado por classe e por nome, com gravação fiel ao original.
+    """
+
+    def __init__(self, text: str, idd_path: Optional[str] = None):
+        """
+        Args:
+            text: Conteúdo do IDF
+            idd_path: Energy+.idd, para acesso aos campos pelo nome (opcional)
+        """
+        self.idd_path = idd_path
+        self._objects: List[IDFObject] = []
+        self._by_class: Dict[str, List[IDFObject]] = {}
+        self._by_name: Dict[Tuple[str, str], IDFObject] = {}
+        self.idfobjects = _ClassView(self)
+
+        # Uma passada: início, classe, primeiro campo e fim de cada objeto
+        gap_start = 0          # Fim do objeto anterior
+        start = None           # Início do objeto atual
+        key = name = None
+        position = 0           # Fim do último token
+        for match in _TOKEN.finditer(text):
+            token = match.group()
+            if token[0] == '!':
+                position = match.end()
+                continue
+            chunk = text[position:match.start()]
+            value = chunk.strip()
+            if start is None:
+                if not value:
+                    position = match.end()
+                    continue  # Separador solto: fica no texto entre objetos
+                start = position + len(chunk) - len(chunk.lstrip())
+                key = value
+            elif name is None:
+                name = value
+            position = match.end()
+            if token == ';':
+                # O comentário na linha do ';' pertence ao objeto
+                end = _LINE_END.match(text, match.end()).end()
+                self._append(IDFObject(self, key, name, text[start:end],
+                                       text[gap_start:start]))
+                gap_start, start, key, name = end, None, None, None
+        self._tail = text[gap_start:]
+
+    @classmethod
+    def load(cls, path: str, idd_path: Optional[str] = None) -> 'IDFIndex':
+        """Lê um arquivo IDF (latin-1, preservando qualquer byte)."""
+        with open(path, 'rb') as f:
+            return cls(f.read().decode('latin-1'), idd_path=idd_path)
+
+    def _append(self, obj: IDFObject, position: Optional[int] = None):
+        if position is None:
+            self._objects.append(obj)
+        else:
+            self._objects.insert(position, obj)
+        self._by_class.setdefault(obj.key.upper(), []).append(obj)
+        if obj.name is not None:
+            self._by_name.setdefault((obj.key.upper(), obj.name.upper()), obj)
+
+    def _rename(self, obj: IDFObject, name: str):
+        key = obj.key.upper()
+        if obj.name is not None and self._by_name.get((key, obj.name.upper())) is obj:
+            del self._by_name[(key, obj.name.upper())]
+        object.__setattr__(obj, 'name', name)
+        self._by_name.setdefault((key, name.upper()), obj)
+
+    def _schema(self, key: str):
+        return idd_class(self.idd_path, key) if self.idd_path else None
+
+    def _comments(self, key: str, n_fields: int) -> List[str]:
+        """Comentários '!- Campo' dos campos de um objeto reescrito."""
+        schema = self._schema(key)
+        names = [name.replace('_', ' ') for name in schema[1]] if schema else []
+        return names + [f"Field {i}" for i in range(len(names), n_fields)]
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def getobject(self, key: str, name: str) -> Optional[IDFObject]:
+        """Objeto da classe key com o nome dado (sem diferenciar maiúsculas)."""
+        return self._by_name.get((key.upper(), name.upper()))
+
+    def newidfobject(self, key: str, **fields) -> IDFObject:
+        """Cria um objeto (após o último da mesma classe) com os campos dados."""
+        schema = self._schema(key)
+        if schema is None:
+            raise ValueError(f"Classe desconhecida no IDD: {key}")
+        obj = IDFObject(self, schema[0], None, None, self._new_prefix(schema[0]))
+        object.__setattr__(obj, '_values', [schema[0]])
+        self._insert(obj)
+        for field, value in fields.items():
+            setattr(obj, field, value)
+        return obj
+
+    def copyidfobject(self, source: IDFObject) -> IDFObject:
+        """Cópia de um objeto, inserida após o último da mesma classe."""
+        copy = IDFObject(self, source.key, source.name, source._source,
+                         self._new_prefix(source.key))
+        if source._values is not None:
+            object.__setattr__(copy, '_values', list(source._values))
+            object.__setattr__(copy, '_original', list(source._original))
+            object.__setattr__(copy, '_spans', source._spans)
+        self._insert(copy)
+        return copy
+
+    def _new_prefix(self, key: str) -> str:
+        """Linha em branco + a indentação do último objeto da classe."""
+        same = self._by_class.get(key.upper())
+        indent = same[-1].prefix.rsplit('\n', 1)[-1] if same else ''
+        return '\n\n' + indent
+
+    def _insert(self, obj: IDFObject):
+        same = self._by_class.get(obj.key.upper())
+        position = self._objects.index(same[-1]) + 1 if same else len(self._objects)
+        self._append(obj, position)
+
+    def removeidfobject(self, obj: IDFObject):
+        """
+        Remove o objeto.
+
+        O texto antes dele (ex.: comentário de cabeçalho da classe) passa ao
+        objeto seguinte se este for da mesma classe; senão é removido junto.
+        """
+        position = self._objects.index(obj)
+        del self._objects[position]
+        if position < len(self._objects) and \
+                self._objects[position].key.upper() == obj.key.upper():
+            object.__setattr__(self._objects[position], 'prefix', obj.prefix)
+        self._by_class[obj.key.upper()].remove(obj)
+        if not self._by_class[obj.key.upper()]:
+            del self._by_class[obj.key.upper()]
+        if obj.name is not None and \
+                self._by_name.get((obj.key.upper(), obj.name.upper())) is obj:
+            del self._by_name[(obj.key.upper(), obj.name.upper())]
+            for other in self._by_class.get(obj.key.upper(), ()):
+                if other.name is not None and other.name.upper() == obj.name.upper():
+                    self._by_name[(obj.key.upper(), obj.name.upper())] = other
+                    break
+
+    def parts(self, holes: Optional[Dict[Tuple[int, int], object]] = None) -> List:
+        """Texto do modelo como lista, com holes[(id(objeto), campo)] nos valores."""
+        by_object: Dict[int, Dict[int, object]] = {}
+        for (obj_id, index), hole in (holes or {}).items():
+            by_object.setdefault(obj_id, {})[index] = hole
+        parts = []
+        for obj in self._objects:
+            parts.append(obj.prefix)
+            parts += obj.parts(by_object.get(id(obj)))
+        parts.append(self._tail)
+        return parts
+
+    def to_string(self) -> str:
+        return ''.join(self.parts())
+
+    def save(self, path: str):
+        """Grava o modelo (temporário + rename)."""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(self.to_string().encode('latin-1'))
+        os.replace(tmp_path, path)
+
+    def template(self, fields: Dict[str, List[Tuple[IDFObject, int]]],
+                 converters: Dict[str, Optional[Callable]]) -> 'SpliceTemplate':
+        """
+        Texto do modelo com os campos de fields como lacunas (ver SpliceTemplate).
+
+        Raises:
+            ValueError: se um campo não existe no objeto
+        """
+        holes = {}
+        for name, targets in fields.items():
+            for obj, index in targets:
+                if index >= len(obj.obj) or index == 0:
+                    raise ValueError(f"{obj.key}: campo {index} ausente no IDF base")
+                holes[(id(obj), index)] = name
+        return SpliceTemplate(self.parts(holes), converters)
+
+
+class SpliceTemplate:
+    """Texto de um IDFIndex com lacunas nos campos variáveis."""
+
+    def __init__(self, parts: List, converters: Dict[str, Optional[Callable]]):
+        """
+        Args:
+            parts: Strings e Slots (Slot.key = nome do parâmetro)
+            converters: Parâmetro -> conversão do valor da amostra (None = nenhuma)
+        """
+        self.parts = parts
+        self.converters = converters
+
+    def render(self, parameters: Dict[str, float]) -> bytes:
+        """Conteúdo do IDF (latin-1) com os valores de parameters nas lacunas."""
+        values = {}
+        for name, value in parameters.items():
+            convert = self.converters.get(name)
+            values[name] = value if convert is None else convert(value)
+        out = []
+        for part in self.parts:
+            if isinstance(part, Slot):
+                if part.key in values:
+                    text = format_value(values[part.key], part.last)
+                    part = _aligned(text, part.sep, part.width)
+                else:
+                    part = part.original
+            out.append(part)
+        return ''.join(out).encode('latin-1')
@@ -2,133 +2,404 @@
 Modificador de arquivos IDF para análise de sensibilidade.
 
 Atualiza parâmetros específicos do modelo EnergyPlus usando eppy.
+
+O IDD é interpretado uma única vez por processo (opcionalmente lido de um
+pickle em IDD_CACHE_DIR) e o IDF base uma única vez por IDFModifier. Cada
+variante é uma cópia do modelo em memória em que só as classes alteradas
+pelos modificadores (_MODIFIED_CLASSES) são duplicadas; as demais são
+compartilhadas com o modelo base.
+
+Por padrão, as variantes são gravadas por IDFTemplate (idf_template.py): o
+eppy serializa uma única vez cada combinação de backend e triagem, e cada
+amostra só substitui as linhas dos campos em _PARAMETER_FIELDS. O arquivo é
+idêntico ao gravado pelo eppy (writer='eppy').
+
+Com writer='native', o eppy não é usado: o IDF base é lido por IDFIndex
+(idf_index.py) em milissegundos, os mesmos modificadores operam sobre ele e
+as variantes mantêm a formatação do arquivo original (comentários e
+espaçamento), com só os valores alterados substituídos.
 """
 
+import copy
+import hashlib
+import io
 import os
+import pickle
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+from .config import IDD_PATH, IDD_CACHE_DIR
+from .idf_index import IDFIndex, SpliceTemplate
+from .idf_template import IDFTemplate
+
+
+# Classes alteradas por create_modified_idf (parâmetros, outputs e RunPeriods).
+# Um modificador que altere outra classe precisa incluí-la aqui: as demais
+# são compartilhadas entre as variantes e o modelo base.
+_MODIFIED_CLASSES = (
+    'MATERIAL',
+    'WINDOWMATERIAL:SIMPLEGLAZINGSYSTEM',
+    'ZONEINFILTRATION:DESIGNFLOWRATE',
+    'ELECTRICEQUIPMENT',
+    'PEOPLE',
+    'SCHEDULE:COMPACT',
+    'OUTPUTCONTROL:FILES',
+    'OUTPUT:SQLITE',
+    'SIMULATIONCONTROL',
+    'RUNPERIOD',
+)
+
+# Área do laboratório (m²)
+AREA_LAB = 66.29
+
+
+def _equipment_level(value: float) -> float:
+    """Densidade de equipamentos (W/m²) -> potência total (W)."""
+    return value * AREA_LAB
+
+
+def _number_of_people(value: float) -> int:
+    """Densidade de ocupação (pessoas/m²) -> número de pessoas."""
+    return int(value * AREA_LAB)
+
+
+# Parâmetro -> (método que localiza os campos alterados, conversão do valor)
+_PARAMETER_FIELDS = {
+    'absortancia_parede': ('_wall_absorptance_fields', None),
+    'fator_solar_vidro': ('_glass_shgc_fields', None),
+    'infiltracao_ar': ('_infiltration_fields', None),
+    'uso_cortinas': ('_shading_fields', None),
+    'densidade_equipamentos': ('_equipment_density_fields', _equipment_level),
+    'ocupacao': ('_occupancy_fields', _number_of_people),
+    'setpoint_resfriamento': ('_cooling_setpoint_fields', None),
+    'cop_ac': ('_cop_fields', None),
+    'condutividade_parede': ('_wall_conductivity_fields', None),
+}
+
+WRITERS = ('template', 'eppy', 'native')
+
+_IDD_LOCK = threading.Lock()
+
+
+def _idd_cache_file(idd_path: str, cache_dir: str) -> Path:
+    """Pickle do IDD: identificado por caminho, tamanho e mtime do IDD e versão do eppy."""
+    import eppy
+    
+    stat = os.stat(idd_path)
+    ident = f"{Path(idd_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{eppy.__version__}"
+    digest = hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(idd_path).stem}_{digest}.pkl"
+
+
+def load_idd(idd_path: str = IDD_PATH, cache_dir: Optional[str] = IDD_CACHE_DIR):
+    """
+    Configura o eppy com o IDD, interpretando-o uma única vez por processo.
+    
+    Com cache_dir, o IDD interpretado é lido de (ou gravado em) um pickle, o
+    que evita interpretá-lo de novo em cada processo worker.
+    """
+    from io import StringIO
+    from eppy.modeleditor import IDF
+    
+    with _IDD_LOCK:
+        if IDF.getiddname() is not None and IDF.idd_info is not None:
+            return
+        IDF.setiddname(idd_path)
+        
+        cache_file = _idd_cache_file(idd_path, cache_dir) if cache_dir else None
+        if cache_file is not None and cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    IDF.setidd(*pickle.load(f))
+                return
+            except Exception as e:
+                print(f"⚠ Cache do IDD ignorado ({cache_file.name}): {e}")
+        
+        # Ler um IDF vazio interpreta o IDD e o guarda nos atributos de classe
+        IDF(StringIO(''))
+        
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump((IDF.idd_info, IDF.idd_index, IDF.block, IDF.idd_version),
+                                f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_file)
+            except OSError as e:
+                print(f"⚠ Aviso ao gravar cache do IDD: {e}")
 
 
 class IDFModifier:
-    """Modifica arquivos IDF com novos valores de parâmetros usando eppy."""
+    """
+    Modifica arquivos IDF com novos valores de parâmetros usando eppy.
+    
+    Um IDFModifier de longa duração interpreta o IDF base uma única vez;
+    create_modified_idf() parte de uma cópia em memória desse modelo.
+    """
     
-    def __init__(self, base_idf_path: str):
+    def __init__(self, base_idf_path: str, idd_path: str = IDD_PATH,
+                 idd_cache_dir: Optional[str] = IDD_CACHE_DIR, writer: str = 'template'):
+        """
+        Args:
+            base_idf_path: IDF base
+            idd_path: Energy+.idd da versão do EnergyPlus
+            idd_cache_dir: Diretório do pickle do IDD interpretado (None = sem cache)
+            writer: 'template' (texto pré-dividido), 'eppy' (modelo de objetos) ou
+                'native' (IDFIndex, sem eppy; mantém a formatação do IDF base)
+        """
+        if writer not in WRITERS:
+            raise ValueError(f"Writer não suportado: {writer}")
         self.base_idf_path = Path(base_idf_path)
         if not self.base_idf_path.exists():
             raise FileNotFoundError(f"Arquivo IDF base não encontrado: {base_idf_path}")
+        self.idd_path = idd_path
+        self.idd_cache_dir = idd_cache_dir
+        self.writer = writer
+        self.base_mtime = self.base_idf_path.stat().st_mtime_ns
+        self._base = None
+        self._templates: Dict[Tuple[str, Optional[str]], Optional[IDFTemplate]] = {}
+        self._splices: Dict[Tuple[str, Optional[str]], Optional[SpliceTemplate]] = {}
+        self._base_text = None
+        self._lock = threading.RLock()
+    
+    def _base_model(self):
+        """IDF base interpretado (uma única vez)."""
+        with self._lock:
+            if self._base is None:
+                from eppy.modeleditor import IDF
+                
+                load_idd(self.idd_path, self.idd_cache_dir)
+                self._base = IDF(str(self.base_idf_path))
+            return self._base
     
-    def create_modified_idf(self, parameters: Dict[str, float], output_path: str):
+    def _new_variant(self):
+        """Cópia do modelo base: só as classes de _MODIFIED_CLASSES são duplicadas."""
+        from eppy.modeleditor import IDF
+        from eppy.idfreader import makeabunch
+        from eppy.idf_msequence import Idf_MSequence
+        from eppy.EPlusInterfaceFunctions.structures import CaseInsensitiveDict
+        
+        base = self._base_model()
+        idf = IDF()
+        idf.idfname = base.idfname
+        idf.idfabsname = base.idfabsname
+        idf.model = copy.copy(base.model)
+        idf.model.dt = dict(base.model.dt)
+        idf.idfobjects = CaseInsensitiveDict(base.idfobjects)
+        
+        for key in _MODIFIED_CLASSES:
+            if key not in base.model.dt:
+                continue  # Classe inexistente nesta versão do IDD
+            key_i = base.model.dtls.index(key)
+            objs = [list(obj) for obj in base.model.dt[key]]
+            bunches = [makeabunch(IDF.idd_info, obj, key_i, block=IDF.block) for obj in objs]
+            idf.model.dt[key] = objs
+            idf.idfobjects[key] = Idf_MSequence(bunches, objs, idf)
+        return idf
+    
+    def create_modified_idf(self, parameters: Dict[str, float], output_path: str,
+                            backend: str = 'csv', screening: Optional[str] = None):
         """
         Cria novo arquivo IDF com parâmetros modificados.
         
         Args:
             parameters: Dicionário com {nome_parametro: valor}
             output_path: Caminho do arquivo IDF modificado
+            backend: Fonte dos resultados ('csv', 'sql' ou 'eso'); fora de 'csv',
+                o eplusout.csv é desativado
+            screening: Modo de triagem (chave de SCREENING_PERIODS); substitui o
+                RunPeriod anual por períodos reduzidos
         """
-        from eppy.modeleditor import IDF
+        if self.writer == 'native':
+            template = self.native_template(backend, screening)
+        elif self.writer == 'template':
+            template = self.idf_template(backend, screening)
+        else:
+            template = None
+        if template is not None:
+            content = template.render(parameters)
+        else:
+            content = self._render_with_eppy(parameters, backend, screening)
         
-        # Configura eppy com IDD
-        eplus_path = r"C:\EnergyPlusV25-1-0"
-        idd_path = os.path.join(eplus_path, "Energy+.idd")
-        IDF.setiddname(idd_path)
-        
-        # Carrega IDF base
-        idf = IDF(str(self.base_idf_path))
+        # Salva arquivo modificado (temporário + rename: um model.idf existente
+        # está sempre completo, o que permite reaproveitá-lo ao retomar a execução)
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, output_path)
+    
+    def _render_with_eppy(self, parameters: Dict[str, float], backend: str,
+                          screening: Optional[str]) -> bytes:
+        """Conteúdo do IDF gerado pelo eppy (modelo de objetos completo)."""
+        idf = self._structural_variant(backend, screening)
         
         # Aplica modificações
+        for name, value in parameters.items():
+            if name not in _PARAMETER_FIELDS:
+                continue
+            _, convert = _PARAMETER_FIELDS[name]
+            if convert is not None:
+                value = convert(value)
+            for bunch, index in self._parameter_fields(idf, name):
+                bunch[bunch.fieldnames[index]] = value
+        
+        buffer = io.BytesIO()
+        idf.save(buffer)
+        return buffer.getvalue()
+    
+    def _structural_variant(self, backend: str, screening: Optional[str]):
+        """Cópia do modelo base com outputs e RunPeriods do backend e da triagem."""
+        idf = self._new_variant()
+        if backend != 'csv':
+            self._configure_outputs(idf, backend)
+        if screening is not None:
+            self._configure_run_period(idf, screening)
+        return idf
+    
+    def idf_template(self, backend: str, screening: Optional[str]) -> Optional[IDFTemplate]:
+        """
+        Texto pré-dividido da variante (backend, triagem), criado na primeira
+        chamada com uma única serialização pelo eppy. None se o IDF base não
+        permitir o atalho (o eppy é usado).
+        """
+        key = (backend, screening)
+        with self._lock:
+            if key not in self._templates:
+                idf = self._structural_variant(backend, screening)
+                fields = {name: self._parameter_fields(idf, name) for name in _PARAMETER_FIELDS}
+                converters = {name: convert for name, (_, convert) in _PARAMETER_FIELDS.items()}
+                try:
+                    self._templates[key] = IDFTemplate.from_idf(idf, fields, converters)
+                except ValueError as e:
+                    print(f"⚠ Gravação por template desativada ({e}); usando eppy")
+                    self._templates[key] = None
+            return self._templates[key]
+    
+    def native_template(self, backend: str, screening: Optional[str]) -> Optional[SpliceTemplate]:
+        """
+        Texto da variante (backend, triagem) lido por IDFIndex, com lacunas nos
+        campos variáveis. None se o IDF base não permitir o atalho (o eppy é usado).
+        """
+        key = (backend, screening)
+        with self._lock:
+            if key not in self._splices:
+                if self._base_text is None:
+                    with open(self.base_idf_path, 'rb') as f:
+                        self._base_text = f.read().decode('latin-1')
+                idf = IDFIndex(self._base_text, idd_path=self.idd_path)
+                if backend != 'csv':
+                    self._configure_outputs(idf, backend)
+                if screening is not None:
+                    self._configure_run_period(idf, screening)
+                fields = {name: self._parameter_fields(idf, name) for name in _PARAMETER_FIELDS}
+                converters = {name: convert for name, (_, convert) in _PARAMETER_FIELDS.items()}
+                try:
+                    self._splices[key] = idf.template(fields, converters)
+                except ValueError as e:
+                    print(f"⚠ Gravação nativa desativada ({e}); usando eppy")
+                    self._splices[key] = None
+            return self._splices[key]
+    
+    def _parameter_fields(self, idf, name: str) -> List[Tuple[object, int]]:
+        """Campos (objeto eppy ou IDFObject, índice) alterados pelo parâmetro name."""
+        locator, _ = _PARAMETER_FIELDS[name]
         try:
-            if 'absortancia_parede' in parameters:
-                self._modify_wall_absorptance(idf, parameters['absortancia_parede'])
-            
-            if 'fator_solar_vidro' in parameters:
-                self._modify_glass_shgc(idf, parameters['fator_solar_vidro'])
-            
-            if 'infiltracao_ar' in parameters:
-                self._modify_infiltration(idf, parameters['infiltracao_ar'])
-            
-            if 'uso_cortinas' in parameters:
-                self._modify_shading(idf, parameters['uso_cortinas'])
-            
-            if 'densidade_equipamentos' in parameters:
-                self._modify_equipment_density(idf, parameters['densidade_equipamentos'])
-            
-            if 'ocupacao' in parameters:
-                self._modify_occupancy(idf, parameters['ocupacao'])
-            
-            if 'setpoint_resfriamento' in parameters:
-                self._modify_cooling_setpoint(idf, parameters['setpoint_resfriamento'])
-            
-            if 'cop_ac' in parameters:
-                self._modify_cop(idf, parameters['cop_ac'])
-            
-            if 'condutividade_parede' in parameters:
-                self._modify_wall_conductivity(idf, parameters['condutividade_parede'])
+            return getattr(self, locator)(idf)
         except Exception as e:
-            print(f"⚠ Aviso ao modificar parâmetro: {e}")
+            print(f"⚠ Aviso ao modificar parâmetro {name}: {e}")
+            return []
+    
+    def _configure_outputs(self, idf, backend: str):
+        """Desativa o eplusout.csv e garante o arquivo lido pelo backend (SQL ou ESO)."""
+        for control in idf.idfobjects['OUTPUTCONTROL:FILES']:
+            control.Output_CSV = 'No'
+            if backend == 'eso':
+                control.Output_ESO = 'Yes'
         
-        # Salva arquivo modificado
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        idf.saveas(str(output_path))
+        if backend == 'sql' and not idf.idfobjects['OUTPUT:SQLITE']:
+            idf.newidfobject('OUTPUT:SQLITE', Option_Type='Simple')
+    
+    def _configure_run_period(self, idf, mode: str):
+        """Substitui o RunPeriod anual pelos períodos de triagem (ver screening.py)."""
+        from .screening import run_periods
+        
+        periods = run_periods(mode)
+        if not periods:
+            # Apenas dias de projeto (SizingPeriod:DesignDay)
+            for control in idf.idfobjects['SIMULATIONCONTROL']:
+                control.Run_Simulation_for_Sizing_Periods = 'Yes'
+                control.Run_Simulation_for_Weather_File_Run_Periods = 'No'
+            return
+        
+        # Sem os dias de projeto nos outputs: a extrapolação (screening.py)
+        # considera só os dias dos RunPeriods
+        for control in idf.idfobjects['SIMULATIONCONTROL']:
+            control.Run_Simulation_for_Sizing_Periods = 'No'
+        
+        # Os novos períodos herdam os demais campos do RunPeriod anual
+        annual = list(idf.idfobjects['RUNPERIOD'])
+        for period in periods:
+            run_period = idf.copyidfobject(annual[0])
+            run_period.Name = period['name']
+            run_period.Begin_Month = period['begin_month']
+            run_period.Begin_Day_of_Month = period['begin_day']
+            run_period.End_Month = period['end_month']
+            run_period.End_Day_of_Month = period['end_day']
+            run_period.Day_of_Week_for_Start_Day = period['start_weekday']
+        for run_period in annual:
+            idf.removeidfobject(run_period)
     
-    def _modify_wall_absorptance(self, idf, value: float):
-        """Modifica absortância solar das paredes externas (Argamassa)."""
+    def _wall_absorptance_fields(self, idf):
+        """Absortância solar das paredes externas (Argamassa)."""
         mat = idf.getobject('MATERIAL', 'Argamassa_2_5cm')
-        if mat:
-            mat.Solar_Absorptance = value
+        return [(mat, mat.fieldnames.index('Solar_Absorptance'))] if mat else []
     
-    def _modify_glass_shgc(self, idf, value: float):
-        """Modifica fator solar (SHGC) dos vidros."""
+    def _glass_shgc_fields(self, idf):
+        """Fator solar (SHGC) dos vidros."""
         vidro = idf.getobject('WINDOWMATERIAL:SIMPLEGLAZINGSYSTEM', 'Vidro_Simples_4mm')
-        if vidro:
-            vidro.Solar_Heat_Gain_Coefficient = value
+        return [(vidro, vidro.fieldnames.index('Solar_Heat_Gain_Coefficient'))] if vidro else []
     
-    def _modify_infiltration(self, idf, value: float):
-        """Modifica taxa de infiltração de ar (ACH)."""
-        # Procura por todos os objetos ZoneInfiltration
-        for infiltration in idf.idfobjects['ZONEINFILTRATION:DESIGNFLOWRATE']:
-            infiltration.Air_Changes_per_Hour = value
+    def _infiltration_fields(self, idf):
+        """Taxa de infiltração de ar (ACH)."""
+        # Todos os objetos ZoneInfiltration
+        return [(infiltration, infiltration.fieldnames.index('Air_Changes_per_Hour'))
+                for infiltration in idf.idfobjects['ZONEINFILTRATION:DESIGNFLOWRATE']]
     
-    def _modify_shading(self, idf, value: float):
-        """Ativa/desativa sombreamento interno (cortinas) - NÃO IMPLEMENTADO."""
+    def _shading_fields(self, idf):
+        """Sombreamento interno (cortinas) - NÃO IMPLEMENTADO."""
         # O IDF não possui objetos WindowShadingControl
         # Este parâmetro será ignorado por enquanto
-        pass
+        return []
     
-    def _modify_equipment_density(self, idf, value: float):
-        """Modifica densidade de potência de equipamentos (W/m²)."""
-        # Área do laboratório: 66.29 m²
-        area_lab = 66.29
-        watts_total = value * area_lab
-        
+    def _equipment_density_fields(self, idf):
+        """Potência de equipamentos (W, ver _equipment_level)."""
         # Procura pelo equipamento principal (pode ser Projetor ou similar)
         for equip in idf.idfobjects['ELECTRICEQUIPMENT']:
             # Modifica apenas se usar EquipmentLevel
             if hasattr(equip, 'Design_Level_Calculation_Method'):
                 if equip.Design_Level_Calculation_Method == 'EquipmentLevel':
-                    equip.Design_Level = watts_total
-                    break
-    
-    def _modify_occupancy(self, idf, value: float):
-        """Modifica densidade de ocupação (pessoas/m²)."""
-        # Área do laboratório: 66.29 m²
-        area_lab = 66.29
-        num_people = int(value * area_lab)
-        
+                    return [(equip, equip.fieldnames.index('Design_Level'))]
+        return []
+    
+    def _occupancy_fields(self, idf):
+        """Número de pessoas (ver _number_of_people)."""
         # Procura pelo objeto People
         for people in idf.idfobjects['PEOPLE']:
             # Modifica apenas se usar método "People"
             if hasattr(people, 'Number_of_People_Calculation_Method'):
                 if people.Number_of_People_Calculation_Method == 'People':
-                    people.Number_of_People = num_people
-                    break
+                    return [(people, people.fieldnames.index('Number_of_People'))]
+        return []
     
-    def _modify_cooling_setpoint(self, idf, value: float):
-        """Modifica setpoint de temperatura de resfriamento."""
+    def _cooling_setpoint_fields(self, idf):
+        """Setpoint de temperatura de resfriamento."""
+        fields = []
         # Procura pelo schedule de termostato de resfriamento
         for schedule in idf.idfobjects['SCHEDULE:COMPACT']:
             if 'Resfriamento' in schedule.Name or 'Cooling' in schedule.Name:
-                # Modifica o último campo (valor da temperatura)
                 # Schedule:Compact tem campos variáveis, procura por "Until:"
                 for i, field in enumerate(schedule.obj):
                     if isinstance(field, str) and 'Until' in field:
@@ -137,25 +408,41 @@ class IDFModifier:
                             try:
                                 # Tenta converter para float para confirmar que é um valor
                                 float(schedule.obj[i + 1])
-                                schedule.obj[i + 1] = value
+                                fields.append((schedule, i + 1))
                             except ValueError:
                                 continue
+        return fields
     
-    def _modify_cop(self, idf, value: float):
-        """Modifica COP do sistema de ar condicionado - NÃO APLICÁVEL."""
+    def _cop_fields(self, idf):
+        """COP do sistema de ar condicionado - NÃO APLICÁVEL."""
         # O sistema usa ZoneHVAC:IdealLoadsAirSystem que não tem COP
         # Este parâmetro será ignorado
-        pass
+        return []
     
-    def _modify_wall_conductivity(self, idf, value: float):
-        """Modifica condutividade térmica das paredes (bloco cerâmico)."""
+    def _wall_conductivity_fields(self, idf):
+        """Condutividade térmica das paredes (bloco cerâmico)."""
         mat = idf.getobject('MATERIAL', 'Bloco_Ceramico_9cm')
-        if mat:
-            mat.Conductivity = value
+        return [(mat, mat.fieldnames.index('Conductivity'))] if mat else []
+
+
+_MODIFIERS: Dict[str, IDFModifier] = {}
+_MODIFIERS_LOCK = threading.Lock()
+
+
+def shared_modifier(base_idf: str) -> IDFModifier:
+    """IDFModifier de longa duração do processo para base_idf (recriado se o arquivo mudar)."""
+    key = str(Path(base_idf).resolve())
+    with _MODIFIERS_LOCK:
+        modifier = _MODIFIERS.get(key)
+        if modifier is None or modifier.base_mtime != os.stat(key).st_mtime_ns:
+            modifier = IDFModifier(key)
+            _MODIFIERS[key] = modifier
+        return modifier
 
 
 def create_simulation_idf(sim_id: int, parameters: Dict[str, float], 
-                         base_idf: str, output_dir: str) -> str:
+                         base_idf: str, output_dir: str, backend: str = 'csv',
+                         screening: Optional[str] = None) -> str:
     """
     Cria arquivo IDF para uma simulação específica.
     
@@ -164,14 +451,17 @@ def create_simulation_idf(sim_id: int, parameters: Dict[str, float],
         parameters: Dicionário com parâmetros
         base_idf: Caminho do IDF base
         output_dir: Diretório para salvar IDF modificado
+        backend: Fonte dos resultados ('csv', 'sql' ou 'eso')
+        screening: Modo de triagem (período reduzido; None = ano completo)
     
     Returns:
         Caminho do arquivo IDF criado
     """
     sim_id = int(sim_id)  # Garante que é int
-    modifier = IDFModifier(base_idf)
+    modifier = shared_modifier(base_idf)
     output_path = Path(output_dir) / f"sim_{sim_id:04d}" / "model.idf"
-    modifier.create_modified_idf(parameters, str(output_path))
+    modifier.create_modified_idf(parameters, str(output_path), backend=backend,
+                                 screening=screening)
     
     return str(output_path)
 
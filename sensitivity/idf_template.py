@@ -0,0 +1,117 @@
+"""
+Gravação rápida de variantes do IDF a partir de um texto pré-dividido.
+
+O IDF de uma variante só difere do modelo base em poucos campos numéricos
+(absortância, SHGC, infiltração, equipamentos, ocupação, setpoint e
+condutividade). IDFTemplate guarda as linhas do IDF já serializado pelo eppy
+uma única vez e a posição (linha) de cada campo que os modificadores alteram;
+cada variante é gerada trocando só essas linhas, sem modelo de objetos.
+
+A formatação de campo reproduz a do eppy (EpBunch.__repr__ e IDF.save), de
+modo que o arquivo gerado é idêntico, byte a byte, ao gravado pelo eppy.
+"""
+
+import os
+import platform
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Coluna em que começa o comentário '!- Campo {unidade}' (eppy: ljust(26))
+COMMENT_COLUMN = 26
+# Valores mais largos vão para notação científica (eppy: scientificnotation)
+MAX_VALUE_WIDTH = 18
+COMMENT_SEPARATOR = '    !- '
+
+
+def format_value(value, last: bool) -> str:
+    """Texto de um valor de campo como o eppy o escreve."""
+    try:
+        number = int(value)
+        if number != value:
+            number = value
+    except ValueError:
+        number = value
+
+    text = "%s" % (number,)
+    if not last and len(text) > MAX_VALUE_WIDTH:
+        try:
+            text = "%e" % (number,)
+        except TypeError:
+            pass
+    return text
+
+
+def format_field(value, comment: str, last: bool) -> str:
+    """Linha de um campo como o eppy a escreve."""
+    line = "    %s%s" % (format_value(value, last), ';' if last else ',')
+    return "%s%s%s" % (line.ljust(COMMENT_COLUMN), COMMENT_SEPARATOR, comment)
+
+
+class IDFTemplate:
+    """Texto de um IDF serializado com os campos variáveis localizados."""
+
+    def __init__(self, lines: List[str], slots: Dict[str, List[Tuple[int, str, bool]]],
+                 converters: Dict[str, Optional[Callable]], linesep: str):
+        """
+        Args:
+            lines: Linhas do arquivo (como IDF.save as separa)
+            slots: Parâmetro -> [(linha, comentário, último campo do objeto)]
+            converters: Parâmetro -> conversão do valor da amostra (None = nenhuma)
+            linesep: Separador de linhas do arquivo
+        """
+        self.lines = lines
+        self.slots = slots
+        self.converters = converters
+        self.linesep = linesep
+
+    @classmethod
+    def from_idf(cls, idf, fields: Dict[str, List[Tuple[object, int]]],
+                 converters: Dict[str, Optional[Callable]]) -> 'IDFTemplate':
+        """
+        Serializa idf (eppy) uma vez e localiza os campos variáveis.
+
+        Args:
+            idf: Modelo eppy já com as alterações estruturais (outputs, RunPeriods)
+            fields: Parâmetro -> [(objeto eppy, índice do campo)]
+            converters: Parâmetro -> conversão do valor da amostra
+
+        Raises:
+            ValueError: se um campo não existe no objeto ou se a formatação
+                reproduzida difere da do eppy
+        """
+        # Cabeçalho e separador de IDF.save(lineendings='default')
+        lines = [f"!- {platform.system()} Line endings "]
+        first_line = {}
+        for key in idf.model.dtls:
+            for bunch in idf.idfobjects[key]:
+                first_line[id(bunch.obj)] = len(lines) + 1
+                lines.extend(repr(bunch).splitlines())
+
+        slots = {}
+        for name, targets in fields.items():
+            slots[name] = []
+            for bunch, index in targets:
+                if index >= len(bunch.obj):
+                    raise ValueError(f"{bunch.key}: campo {index} ausente no IDF base")
+                line_no = first_line[id(bunch.obj)] + index
+                line = lines[line_no]
+                last = index == len(bunch.obj) - 1
+                comment = line.split(COMMENT_SEPARATOR, 1)[-1]
+                if format_field(bunch.obj[index], comment, last) != line:
+                    raise ValueError(f"{bunch.key}: formatação do campo {index} difere do eppy")
+                slots[name].append((line_no, comment, last))
+
+        return cls(lines, slots, converters, os.linesep)
+
+    def render(self, parameters: Dict[str, float]) -> bytes:
+        """Conteúdo do IDF (latin-1, como IDF.save) com os valores de parameters."""
+        lines = list(self.lines)
+        for name, value in parameters.items():
+            if name not in self.slots:
+                continue
+            convert = self.converters.get(name)
+            if convert is not None:
+                value = convert(value)
+            for line_no, comment, last in self.slots[name]:
+                lines[line_no] = format_field(value, comment, last)
+        return self.linesep.join(lines).encode('latin-1')
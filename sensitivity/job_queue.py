@@ -0,0 +1,510 @@
+"""
+Fila de simulações em diretório compartilhado (execução em várias máquinas).
+
+Um coordenador publica uma tarefa por amostra LHS em um diretório visível a
+todas as máquinas (ex.: NFS). Workers em qualquer máquina puxam tarefas,
+criam o IDF localmente (create_simulation_idf), simulam, extraem as
+métricas e devolvem os arquivos mantidos (keep). O coordenador incorpora os
+resultados ao diretório da execução à medida que chegam.
+
+Layout do diretório da fila:
+    job.json             configuração da etapa atual (run_id, backend, keep, ...)
+    pending/sim_XXXX.json  tarefas disponíveis ({sim_id, run_id, parameters})
+    claimed/sim_XXXX.json  tarefas em execução (mtime = último heartbeat)
+    done/sim_XXXX/         resultado (result.json + arquivos mantidos)
+    closed               criado pelo coordenador quando todos os resultados chegaram
+
+Uma execução pode publicar várias etapas na mesma fila (ex.: triagem e
+depois o ano completo): entre elas, o job.json é marcado como 'finished' em
+vez de a fila ser fechada, e os workers passam para a etapa seguinte quando
+o run_id do job.json muda. Resultados de uma etapa anterior que chegarem
+atrasados são descartados.
+
+Toda transição de estado é um os.rename, atômico no mesmo sistema de
+arquivos: dois workers nunca pegam a mesma tarefa. Tarefas cujo heartbeat
+para (máquina desligada, worker morto) voltam para pending/ após o lease.
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Optional, Sequence
+import pandas as pd
+from tqdm import tqdm
+from .ledger import RunLedger
+from .simulation import DEFAULT_KEEP, SimulationRunner
+
+
+JOB_NAME = 'job.json'
+RESULT_NAME = 'result.json'
+CLOSED_NAME = 'closed'
+
+
+def _write_json(path: Path, payload: Dict):
+    """Grava JSON de forma atômica (arquivo temporário + rename)."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=1, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+class JobQueue:
+    """Fila de tarefas em um diretório compartilhado (ver docstring do módulo)."""
+
+    # Intervalo (s) de polling de workers e coordenador
+    POLL_INTERVAL = 2.0
+    # Intervalo (s) entre heartbeats das tarefas em execução
+    HEARTBEAT_INTERVAL = 30.0
+
+    def __init__(self, queue_dir: str):
+        self.queue_dir = Path(queue_dir)
+        self.pending_dir = self.queue_dir / 'pending'
+        self.claimed_dir = self.queue_dir / 'claimed'
+        self.done_dir = self.queue_dir / 'done'
+
+    @staticmethod
+    def _name(sim_id: int) -> str:
+        return f"sim_{int(sim_id):04d}"
+
+    # ---- coordenador -------------------------------------------------
+
+    def publish(self, run_id: str, samples_df: pd.DataFrame, config: Dict,
+                skip_ids: Sequence[int] = ()) -> int:
+        """
+        Publica uma tarefa por amostra (exceto skip_ids e as já publicadas).
+
+        Args:
+            run_id: Identificador da execução (a fila pertence a uma só execução)
+            samples_df: DataFrame com amostras LHS (coluna sim_id + parâmetros)
+            config: Configuração lida pelos workers (backend, keep, ...)
+            skip_ids: Simulações que não devem ser publicadas (ex.: já concluídas)
+
+        Returns:
+            Número de tarefas publicadas
+        """
+        for d in (self.pending_dir, self.claimed_dir, self.done_dir):
+            d.mkdir(parents=True, exist_ok=True)
+
+        job_file = self.queue_dir / JOB_NAME
+        if job_file.exists():
+            existing = json.loads(job_file.read_text(encoding='utf-8'))
+            if existing.get('run_id') != run_id:
+                if not (self.closed or existing.get('finished')):
+                    raise ValueError(f"A fila {self.queue_dir} pertence a outra execução "
+                                     f"em andamento ({existing.get('run_id')})")
+                # Execução anterior encerrada: descarta as sobras
+                for d in (self.pending_dir, self.claimed_dir, self.done_dir):
+                    shutil.rmtree(d, ignore_errors=True)
+                    d.mkdir(parents=True)
+        (self.queue_dir / CLOSED_NAME).unlink(missing_ok=True)
+        _write_json(job_file, dict(config, run_id=run_id))
+
+        skip = set(int(i) for i in skip_ids)
+        published = 0
+        param_names = [c for c in samples_df.columns if c != 'sim_id']
+        for sim_id, values in zip(samples_df['sim_id'], samples_df[param_names].to_numpy()):
+            sim_id = int(sim_id)
+            name = self._name(sim_id) + '.json'
+            if sim_id in skip or (self.claimed_dir / name).exists() \
+                    or (self.done_dir / self._name(sim_id)).exists() \
+                    or (self.pending_dir / name).exists():
+                continue
+            _write_json(self.pending_dir / name, {
+                'sim_id': sim_id,
+                'run_id': run_id,
+                'parameters': {p: float(v) for p, v in zip(param_names, values)},
+            })
+            published += 1
+        return published
+
+    def requeue_expired(self, lease: float) -> List[int]:
+        """Devolve a pending/ as tarefas sem heartbeat há mais de lease segundos."""
+        requeued = []
+        now = time.time()
+        for claim in self.claimed_dir.glob('sim_*.json'):
+            try:
+                if now - claim.stat().st_mtime > lease:
+                    os.rename(claim, self.pending_dir / claim.name)
+                    requeued.append(int(claim.stem.split('_')[1]))
+            except OSError:
+                continue  # Concluída ou devolvida por outro processo
+        return requeued
+
+    def collect(self, dest_base_dir: str, run_id: Optional[str] = None,
+                received: Collection[int] = ()) -> List[Dict]:
+        """
+        Move os resultados prontos para dest_base_dir/sim_XXXX/.
+
+        Args:
+            dest_base_dir: Diretório base das simulações da execução
+            run_id: Se informado, resultados de outra etapa são descartados
+            received: Simulações já incorporadas; cópias atrasadas (tarefa
+                devolvida à fila após o lease) são descartadas sem tocar
+                nos arquivos já recebidos
+
+        Returns:
+            Resultados (mesmo formato de SimulationRunner.run_simulation)
+        """
+        results = []
+        for entry in sorted(self.done_dir.glob('sim_*')):
+            result_file = entry / RESULT_NAME
+            if entry.name.startswith('.') or not result_file.exists():
+                continue
+            if int(entry.name.split('_')[1]) in received:
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            result = json.loads(result_file.read_text(encoding='utf-8'))
+            if run_id is not None and result.pop('run_id', run_id) != run_id:
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+
+            dest = Path(dest_base_dir) / entry.name
+            dest.mkdir(parents=True, exist_ok=True)
+            for src in entry.iterdir():
+                if src.name != RESULT_NAME:
+                    shutil.copyfile(src, dest / src.name)
+            result['output_dir'] = str(dest)
+            results.append(result)
+            shutil.rmtree(entry, ignore_errors=True)
+        return results
+
+    def close(self):
+        """Sinaliza aos workers que não haverá mais tarefas."""
+        (self.queue_dir / CLOSED_NAME).touch()
+
+    def finish_run(self):
+        """Encerra a etapa atual sem fechar a fila (outra etapa será publicada)."""
+        job_file = self.queue_dir / JOB_NAME
+        config = json.loads(job_file.read_text(encoding='utf-8'))
+        _write_json(job_file, dict(config, finished=True))
+
+    # ---- worker ------------------------------------------------------
+
+    def config(self) -> Optional[Dict]:
+        """Configuração da execução (None se o coordenador ainda não publicou)."""
+        job_file = self.queue_dir / JOB_NAME
+        if not job_file.exists():
+            return None
+        return json.loads(job_file.read_text(encoding='utf-8'))
+
+    @property
+    def closed(self) -> bool:
+        return (self.queue_dir / CLOSED_NAME).exists()
+
+    def claim(self, run_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Pega uma tarefa de pending/ (None se não houver).
+
+        Com run_id, uma tarefa de outra etapa é devolvida a pending/ e None
+        é retornado.
+        """
+        if not self.pending_dir.exists():
+            return None
+        for job in sorted(self.pending_dir.glob('sim_*.json')):
+            claimed = self.claimed_dir / job.name
+            try:
+                os.rename(job, claimed)
+            except OSError:
+                continue  # Outro worker pegou primeiro
+            os.utime(claimed)  # Início do lease
+            task = json.loads(claimed.read_text(encoding='utf-8'))
+            if run_id is not None and task.get('run_id', run_id) != run_id:
+                os.rename(claimed, job)
+                return None
+            return task
+        return None
+
+    def heartbeat(self, sim_ids: Sequence[int]):
+        """Renova o lease das tarefas em execução."""
+        for sim_id in sim_ids:
+            try:
+                os.utime(self.claimed_dir / (self._name(sim_id) + '.json'))
+            except OSError:
+                pass
+
+    def complete(self, result: Dict, files_dir: Optional[Path] = None):
+        """
+        Publica o resultado de uma tarefa em done/ e libera o claim.
+
+        Args:
+            result: Resultado da simulação (serializável em JSON)
+            files_dir: Diretório com os arquivos a devolver (movido para done/)
+        """
+        name = self._name(result['sim_id'])
+        tmp = Path(tempfile.mkdtemp(prefix=f".{name}_", dir=self.done_dir))
+        if files_dir is not None:
+            for src in Path(files_dir).iterdir():
+                shutil.move(str(src), str(tmp / src.name))
+        _write_json(tmp / RESULT_NAME, result)
+        try:
+            os.rename(tmp, self.done_dir / name)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # Execução duplicada: já há resultado
+        (self.claimed_dir / (name + '.json')).unlink(missing_ok=True)
+
+
+def _current_run(jobs: JobQueue) -> Optional[str]:
+    config = jobs.config()
+    return config.get('run_id') if config is not None else None
+
+
+def run_worker(queue_dir: str, base_idf: str, weather_file: str, max_workers: int = 4,
+               work_dir: Optional[str] = None, adaptive: bool = False,
+               pin_cpus: bool = False, timeout: float = 300,
+               speculative: bool = False, engine: str = 'cli',
+               energyplus_path: Optional[str] = None) -> int:
+    """
+    Executa tarefas da fila até o coordenador fechá-la.
+
+    Uma thread pega tarefas e cria os IDFs localmente; as simulações usam o
+    mesmo despachante de run_sensitivity_simulations (SimulationRunner.run_batch).
+    Cada resultado volta à fila com os arquivos de keep da configuração
+    (por padrão, eplusout.err, metrics.json e eplusout.csv.gz). Extração,
+    compressão e cópia para a fila rodam em threads próprias: o despachante
+    continua iniciando simulações enquanto um resultado é enviado.
+
+    Quando o coordenador publica uma nova etapa (run_id diferente no
+    job.json), o worker relê a configuração e continua servindo.
+
+    Args:
+        queue_dir: Diretório compartilhado da fila
+        base_idf: IDF base (cópia local)
+        weather_file: Arquivo climático (cópia local)
+        max_workers: Simulações simultâneas nesta máquina (no modo adaptativo, o máximo)
+        work_dir: Diretório local das simulações (padrão: diretório temporário)
+        adaptive: Ajusta a concorrência pela carga da máquina
+        pin_cpus: Fixa cada EnergyPlus em um núcleo dedicado
+        timeout: Teto (s) do timeout por simulação (ver stragglers.py)
+        speculative: Duplica simulações lentas em workers ociosos
+        engine: 'cli' (executável) ou 'api' (pyenergyplus, ver api_backend.py)
+        energyplus_path: Executável do EnergyPlus ('synthetic' = sintético)
+
+    Returns:
+        Número de tarefas executadas
+    """
+    jobs = JobQueue(queue_dir)
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"Worker {host} aguardando tarefas em {queue_dir}...")
+
+    runner_options = dict(energyplus_path=energyplus_path, weather_file=weather_file,
+                          adaptive=adaptive, pin_cpus=pin_cpus, timeout=timeout,
+                          speculative=speculative, engine=engine)
+    run_id = None
+    executed = 0
+    while True:
+        config = jobs.config()
+        if config is None or config.get('run_id') == run_id:
+            if config is not None and jobs.closed:
+                break
+            time.sleep(JobQueue.POLL_INTERVAL)
+            continue
+        run_id = config.get('run_id')
+        executed += _serve_run(jobs, config, host, base_idf, max_workers, work_dir,
+                               runner_options)
+
+    print(f"✓ Worker {host}: {executed} simulações executadas")
+    return executed
+
+
+def _serve_run(jobs: JobQueue, config: Dict, host: str, base_idf: str, max_workers: int,
+               work_dir: Optional[str], runner_options: Dict) -> int:
+    """
+    Executa as tarefas de uma etapa (um run_id) até a fila fechar ou a etapa mudar.
+
+    Returns:
+        Número de tarefas executadas
+    """
+    from .idf_modifier import create_simulation_idf
+
+    run_id = config.get('run_id')
+    backend = config.get('backend', 'csv')
+    keep = config.get('keep') or DEFAULT_KEEP
+    screening = config.get('screening')
+
+    local_dir = Path(tempfile.mkdtemp(prefix='sensitivity_worker_', dir=work_dir))
+    runner = SimulationRunner(keep=keep, screening=screening, **runner_options)
+    pending = queue.Queue(maxsize=2 * max_workers)
+    stop = threading.Event()
+    in_flight = set()
+    lock = threading.Lock()
+
+    def put(item) -> bool:
+        # Fila cheia: espera vaga, desistindo se o lote terminar
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=SimulationRunner.DISPATCH_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            while not stop.is_set():
+                job = jobs.claim(run_id)
+                if job is None:
+                    if jobs.closed or _current_run(jobs) != run_id:
+                        break
+                    stop.wait(JobQueue.POLL_INTERVAL)
+                    continue
+                sim_id = int(job['sim_id'])
+                with lock:
+                    in_flight.add(sim_id)
+                try:
+                    idf_path = create_simulation_idf(sim_id, job['parameters'], base_idf,
+                                                     str(local_dir), backend=backend,
+                                                     screening=screening)
+                except Exception as e:
+                    finish({'sim_id': sim_id, 'success': False,
+                            'error': f'Erro ao criar IDF: {e}'})
+                    continue
+                if not put({'sim_id': sim_id, 'idf_path': idf_path,
+                            'output_dir': str(local_dir / JobQueue._name(sim_id))}):
+                    return
+        finally:
+            put(None)
+
+    def heartbeat():
+        while not stop.wait(JobQueue.HEARTBEAT_INTERVAL):
+            with lock:
+                sim_ids = list(in_flight)
+            jobs.heartbeat(sim_ids)
+
+    def ship(result: Dict):
+        sim_id = int(result['sim_id'])
+        sim_dir = local_dir / JobQueue._name(sim_id)
+        outbox = local_dir / f"outbox_{sim_id:04d}"
+        try:
+            if _current_run(jobs) != run_id:
+                # A etapa terminou (cópia duplicada): o claim já é de outra etapa
+                print(f"⚠ sim_{sim_id:04d} descartada: etapa {run_id} encerrada")
+                return
+            outbox.mkdir(exist_ok=True)
+            if sim_dir.exists():
+                runner.retain_outputs(sim_dir, outbox, bool(result.get('success')))
+            result = {k: v for k, v in result.items() if k not in ('output_dir', 'err_file')}
+            result['worker'] = host
+            result['run_id'] = run_id
+            jobs.complete(result, outbox)
+        except Exception as e:
+            # Sem heartbeat, a tarefa volta a pending/ após o lease
+            print(f"⚠ Erro ao devolver sim_{sim_id:04d} à fila: {e}")
+        finally:
+            shutil.rmtree(outbox, ignore_errors=True)
+            shutil.rmtree(sim_dir, ignore_errors=True)
+            with lock:
+                in_flight.discard(sim_id)
+
+    # Pós-processamento fora da thread do despachante (run_batch)
+    shipper = ThreadPoolExecutor(max_workers=2, thread_name_prefix='job-ship')
+
+    def finish(result: Dict):
+        shipper.submit(ship, result)
+
+    threads = [threading.Thread(target=produce, name="job-claimer", daemon=True),
+               threading.Thread(target=heartbeat, name="job-heartbeat", daemon=True)]
+    for thread in threads:
+        thread.start()
+    try:
+        results_df = runner.run_batch(pending, max_workers=max_workers, on_result=finish)
+    finally:
+        shipper.shutdown(wait=True)  # Resultados ainda sendo enviados
+        stop.set()
+        for thread in threads:
+            thread.join()
+        runner.close()
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+    return len(results_df)
+
+
+def run_distributed_simulations(samples_df: pd.DataFrame, queue_dir: str, run_id: str,
+                                output_base_dir: str, backend: str = 'csv',
+                                keep: Sequence[str] = DEFAULT_KEEP,
+                                ledger_path: Optional[str] = None, resume: bool = False,
+                                lease: float = 900, screening: Optional[str] = None,
+                                on_result: Optional[Callable[[Dict], None]] = None,
+                                close: bool = True) -> pd.DataFrame:
+    """
+    Coordena a execução das simulações por workers de outras máquinas.
+
+    Publica as amostras na fila e incorpora os resultados ao diretório da
+    execução (output_base_dir/sim_XXXX/ e ledger) à medida que chegam.
+    Equivalente distribuído de run_sensitivity_simulations.
+
+    Args:
+        samples_df: DataFrame com amostras LHS
+        queue_dir: Diretório compartilhado da fila
+        run_id: Identificador da execução (ex.: timestamp do diretório)
+        output_base_dir: Diretório base dos outputs
+        backend: Fonte dos resultados usada pelos workers
+        keep: Arquivos devolvidos pelos workers
+        ledger_path: Caminho do ledger JSONL (opcional)
+        resume: Pula simulações concluídas com sucesso no ledger
+        lease: Segundos sem heartbeat após os quais uma tarefa volta à fila
+        screening: Modo de triagem repassado aos workers (ver screening.py)
+        on_result: Chamado com o resultado de cada simulação recebida
+        close: Fecha a fila ao final (False = outra etapa da execução será
+            publicada na mesma fila; os workers continuam)
+
+    Returns:
+        DataFrame com status das simulações
+    """
+    jobs = JobQueue(queue_dir)
+    ledger = RunLedger(ledger_path) if ledger_path else None
+    done_ids = set()
+    results = []
+    if resume:
+        if ledger is None:
+            raise ValueError("resume=True requer ledger_path")
+        done_ids = ledger.successful_ids() & set(int(i) for i in samples_df['sim_id'])
+        results = [rec for rec in ledger.successful_records() if rec['sim_id'] in done_ids]
+        print(f"✓ Retomando execução: {len(done_ids)} simulações já concluídas no ledger")
+        if on_result is not None:
+            for rec in results:
+                on_result(rec)
+
+    expected = set(int(i) for i in samples_df['sim_id']) - done_ids
+    published = jobs.publish(run_id, samples_df,
+                             {'backend': backend, 'keep': list(keep), 'screening': screening},
+                             skip_ids=done_ids)
+    print(f"✓ {published} tarefas publicadas em {queue_dir}")
+    print(f"  Inicie os workers com: python run_sensitivity_analysis.py --worker "
+          f"--queue {queue_dir}")
+
+    received = set()
+    with tqdm(total=len(expected), desc="Simulações") as pbar:
+        while received < expected:
+            for result in jobs.collect(output_base_dir, run_id, received | done_ids):
+                sim_id = int(result['sim_id'])
+                if sim_id not in expected or sim_id in received:
+                    continue
+                received.add(sim_id)
+                results.append(result)
+                if ledger is not None:
+                    ledger.record(result)
+                if on_result is not None:
+                    on_result(result)
+                pbar.update(1)
+            if received < expected:
+                for sim_id in jobs.requeue_expired(lease):
+                    print(f"\n⚠ sim_{sim_id:04d} sem heartbeat: devolvida à fila")
+                time.sleep(JobQueue.POLL_INTERVAL)
+    if close:
+        jobs.close()
+    else:
+        jobs.finish_run()
+
+    results_df = pd.DataFrame(results) if results else pd.DataFrame(columns=['sim_id', 'success'])
+    results_df = results_df.sort_values('sim_id').reset_index(drop=True)
+
+    n_success = results_df['success'].sum()
+    print(f"\n✓ Simulações concluídas: {n_success}/{len(results_df)} com sucesso")
+    return results_df
@@ -0,0 +1,70 @@
+"""
+Registro persistente (ledger) do andamento de um lote de simulações.
+
+Cada simulação concluída é anexada como uma linha JSON em run_ledger.jsonl,
+no diretório da execução, assim que termina. Se o workflow for interrompido,
+o ledger permite retomar a execução (--resume) pulando as simulações que já
+terminaram com sucesso.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Set
+import pandas as pd
+
+
+LEDGER_NAME = 'run_ledger.jsonl'
+
+
+class RunLedger:
+    """Ledger JSONL {sim_id, success, ...}; a última linha de cada sim_id prevalece."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.records: Dict[int, Dict] = {}
+        self._torn_tail = False
+
+        if self.path.exists():
+            line = ''
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Linha incompleta (interrupção durante a escrita)
+                    self.records[int(record['sim_id'])] = record
+                self._torn_tail = bool(line) and not line.endswith('\n')
+
+    def record(self, result: Dict):
+        """
+        Anexa o resultado de uma simulação ao ledger.
+
+        A linha é escrita de uma só vez e sincronizada em disco (fsync), de modo
+        que uma interrupção perde no máximo a linha em andamento.
+        """
+        result = dict(result, sim_id=int(result['sim_id']))
+        line = json.dumps(result, ensure_ascii=False, default=str) + '\n'
+        if self._torn_tail:
+            line = '\n' + line  # Isola a linha incompleta deixada por uma interrupção
+            self._torn_tail = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.records[result['sim_id']] = result
+
+    def successful_ids(self) -> Set[int]:
+        """IDs das simulações já concluídas com sucesso."""
+        return {sim_id for sim_id, rec in self.records.items() if rec.get('success')}
+
+    def successful_records(self) -> List[Dict]:
+        """Registros das simulações bem-sucedidas, ordenados por sim_id."""
+        return [self.records[sim_id] for sim_id in sorted(self.successful_ids())]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Último status de cada simulação (mesmo formato de run_batch)."""
+        return pd.DataFrame([self.records[sim_id] for sim_id in sorted(self.records)])
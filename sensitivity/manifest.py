@@ -0,0 +1,244 @@
+"""
+Manifesto de extração incremental de resultados.
+
+Registra, por simulação, a impressão digital dos outputs (eplusout.csv ou
+cache colunar) e a versão da definição de cada métrica extraída. Na próxima
+re-extração, apenas as métricas cuja definição mudou (em DEPENDENT_VARIABLES
+ou REGIONAL_TEMPERATURE_MODEL) e as simulações cujos outputs mudaram são
+recalculadas.
+
+Também grava/lê o metrics.json de cada simulação: métricas já extraídas
+(por exemplo, no diretório temporário da simulação), válidas enquanto a
+versão da definição de cada métrica não mudar, os outputs de que vieram
+(eplusout.csv, .sql, .eso) não forem regravados e o modo de triagem for o
+mesmo.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from .aggregation import output_names
+from .config import DEPENDENT_VARIABLES, REGIONAL_TEMPERATURE_MODEL
+from .eso_backend import ESO_NAME
+from .output_cache import CSV_NAME, INDEX_NAME, csv_path
+from .sqlite_backend import SQL_NAME
+
+
+METRICS_NAME = 'metrics.json'
+# Campos de DEPENDENT_VARIABLES que afetam o valor (rótulos como 'unit' e
+# 'description' não invalidam métricas já extraídas)
+VALUE_FIELDS = ('columns', 'aggregation', 'scale', 'threshold', 'first_only', 'fill_value')
+# Outputs de que as métricas de metrics.json são extraídas
+SOURCE_NAMES = (CSV_NAME, SQL_NAME, ESO_NAME)
+
+
+def _digest(obj) -> str:
+    text = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def metric_versions() -> Dict[str, str]:
+    """
+    Versão (hash curto) da definição de cada variável extraída.
+
+    Mudar colunas, agregação, escala ou limite de uma variável em
+    DEPENDENT_VARIABLES muda apenas a versão dela (só os campos de
+    VALUE_FIELDS contam); mudar parâmetros comuns do modelo regional muda a
+    versão das 6 regiões.
+    """
+    versions = {name: _digest({k: spec[k] for k in VALUE_FIELDS if k in spec})
+                for name, spec in DEPENDENT_VARIABLES.items()}
+
+    shared = {k: v for k, v in REGIONAL_TEMPERATURE_MODEL.items() if k != 'regions'}
+    for name, spec in REGIONAL_TEMPERATURE_MODEL['regions'].items():
+        versions[name] = _digest({'model': shared, 'region': spec})
+
+    return versions
+
+
+def _file_fingerprint(path: Path, content_hash: bool = False) -> Dict:
+    stat = path.stat()
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if content_hash:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        fingerprint['sha1'] = sha.hexdigest()
+    return fingerprint
+
+
+def _sources_match(sim_dir: Path, recorded: Dict[str, Dict]) -> bool:
+    """
+    Confere os outputs presentes em sim_dir com os registrados no metrics.json.
+
+    Tamanho e mtime iguais bastam; com mtime diferente (ex.: cópia do
+    diretório temporário), o conteúdo é comparado pelo SHA-1.
+    """
+    for name in SOURCE_NAMES:
+        path = sim_dir / name
+        if not path.exists():
+            continue  # Output não retido: nada a conferir
+        expected = recorded.get(name)
+        if expected is None:
+            return False
+        current = _file_fingerprint(path)
+        if current['size'] != expected['size']:
+            return False
+        if current['mtime_ns'] != expected['mtime_ns'] and \
+                _file_fingerprint(path, content_hash=True)['sha1'] != expected.get('sha1'):
+            return False
+    return True
+
+
+def write_metrics(sim_dir: str, metrics: Dict[str, float], source_dir: Optional[str] = None,
+                  screening: Optional[str] = None):
+    """
+    Grava as métricas extraídas de uma simulação em sim_dir/metrics.json.
+
+    Cada valor é gravado com a versão atual da sua definição; NaN é gravado
+    como null. A impressão digital (tamanho, mtime, SHA-1) dos outputs de
+    source_dir (padrão: sim_dir) também é gravada: se forem regravados,
+    read_metrics descarta as métricas. screening é o modo de triagem cujo
+    número de registros foi conferido na extração (None = ano completo).
+    """
+    versions = metric_versions()
+    source_dir = Path(source_dir if source_dir is not None else sim_dir)
+    payload = {
+        'screening': screening,
+        'metrics': {name: (None if value != value else float(value))
+                    for name, value in metrics.items()},
+        'versions': {name: versions[name] for name in metrics if name in versions},
+        'sources': {name: _file_fingerprint(source_dir / name, content_hash=True)
+                    for name in SOURCE_NAMES if (source_dir / name).exists()},
+    }
+
+    sim_dir = Path(sim_dir)
+    tmp = sim_dir / (METRICS_NAME + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=1)
+    os.replace(tmp, sim_dir / METRICS_NAME)
+
+
+def read_metrics(sim_dir: str, variables: Optional[Sequence[str]] = None,
+                 screening: Optional[str] = None) -> Optional[Dict[str, float]]:
+    """
+    Lê métricas de sim_dir/metrics.json.
+
+    Returns:
+        {variável: valor} se todas as variáveis pedidas estiverem presentes
+        com a versão atual da definição, os outputs de sim_dir forem os
+        mesmos da extração e o modo de triagem gravado for screening; None
+        caso contrário
+    """
+    metrics_file = Path(sim_dir) / METRICS_NAME
+    if not metrics_file.exists():
+        return None
+    try:
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if payload.get('screening') != screening:
+        return None
+    if not _sources_match(Path(sim_dir), payload.get('sources', {})):
+        return None
+
+    versions = metric_versions()
+    stored, stored_versions = payload.get('metrics', {}), payload.get('versions', {})
+    results = {}
+    for name in output_names(variables):
+        if name not in stored or stored_versions.get(name) != versions.get(name):
+            return None
+        results[name] = float('nan') if stored[name] is None else stored[name]
+    return results
+
+
+def output_fingerprint(sim_dir: str, content_hash: bool = False) -> Optional[Dict]:
+    """
+    Impressão digital dos outputs de uma simulação.
+
+    Args:
+        sim_dir: Diretório da simulação
+        content_hash: Inclui SHA-1 do conteúdo (mais lento; imune a mudanças de mtime)
+
+    Returns:
+        Dicionário com tamanho/mtime (e hash), ou None se não houver outputs
+    """
+    sim_dir = Path(sim_dir)
+    source = csv_path(sim_dir)
+    if not source.exists():
+        source = sim_dir / INDEX_NAME  # Apenas cache colunar
+    if not source.exists():
+        return None
+
+    stat = source.stat()
+    fingerprint = {'file': source.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if content_hash:
+        sha = hashlib.sha1()
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        fingerprint['sha1'] = sha.hexdigest()
+        del fingerprint['mtime_ns']
+
+    return fingerprint
+
+
+class ExtractionManifest:
+    """Manifesto JSON {sim: {fingerprint, metrics: {variável: versão}}}."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('simulations', {})
+
+    def stale_metrics(self, sim_key: str, fingerprint: Optional[Dict],
+                      versions: Dict[str, str],
+                      variables: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Variáveis que precisam ser recalculadas para uma simulação.
+
+        Args:
+            sim_key: Identificador da simulação (ex.: 'sim_0001')
+            fingerprint: Impressão digital atual dos outputs
+            versions: Versões atuais das definições (metric_versions())
+            variables: Variáveis consideradas (None = todas)
+
+        Returns:
+            Lista de variáveis desatualizadas, na ordem de saída
+        """
+        names = output_names(variables)
+        entry = self.entries.get(sim_key)
+
+        if entry is None or fingerprint is None or entry.get('fingerprint') != fingerprint:
+            return names
+
+        recorded = entry.get('metrics', {})
+        return [name for name in names if recorded.get(name) != versions.get(name)]
+
+    def update(self, sim_key: str, fingerprint: Dict, versions: Dict[str, str],
+               variables: Sequence[str]):
+        """Registra que as variáveis foram extraídas com as versões atuais."""
+        entry = self.entries.get(sim_key)
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            entry = {'fingerprint': fingerprint, 'metrics': {}}
+            self.entries[sim_key] = entry
+
+        for name in variables:
+            entry['metrics'][name] = versions[name]
+
+    def save(self):
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'simulations': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
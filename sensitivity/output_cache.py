@@ -0,0 +1,269 @@
+"""
+Cache colunar binário dos outputs das simulações (eplusout.csv).
+
+Converte cada sim_XXXX/eplusout.csv uma única vez em:
+- eplusout.values.npy: matriz float32 em ordem Fortran (cada coluna contígua),
+  lida depois via memory-map (np.load(mmap_mode='r'))
+- eplusout.text_N.npy: colunas de texto (ex.: Date/Time)
+- eplusout.columns.json: índice do cabeçalho + impressão digital do CSV de origem
+
+Leitores (ResultsExtractor e scripts de análise) usam read_output(), que
+prefere o cache quando ele está atualizado e recorre ao CSV caso contrário.
+O CSV pode estar comprimido (eplusout.csv.gz, ver retenção seletiva em
+simulation.py).
+
+Uso:
+    python -m sensitivity.output_cache results/sensitivity_analysis/[timestamp]/simulations
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+
+CSV_NAME = 'eplusout.csv'
+CSV_GZ_NAME = CSV_NAME + '.gz'
+INDEX_NAME = 'eplusout.columns.json'
+VALUES_NAME = 'eplusout.values.npy'
+TEXT_NAME = 'eplusout.text_{}.npy'
+
+CACHE_FORMAT_VERSION = 1
+
+# Colunas não numéricas do eplusout.csv
+TEXT_COLUMNS = ('Date/Time',)
+
+
+def csv_path(sim_dir: str) -> Path:
+    """CSV de origem da simulação: eplusout.csv ou, se ausente, eplusout.csv.gz."""
+    sim_dir = Path(sim_dir)
+    plain = sim_dir / CSV_NAME
+    if not plain.exists() and (sim_dir / CSV_GZ_NAME).exists():
+        return sim_dir / CSV_GZ_NAME
+    return plain
+
+
+def _source_fingerprint(csv_file: Path) -> Dict[str, int]:
+    """Tamanho e mtime do CSV de origem (detecta cache desatualizado)."""
+    stat = csv_file.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _load_index(sim_dir: Path) -> Optional[Dict]:
+    index_file = sim_dir / INDEX_NAME
+    if not index_file.exists():
+        return None
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('format_version') != CACHE_FORMAT_VERSION:
+        return None
+    return index
+
+
+def is_cache_fresh(sim_dir: str) -> bool:
+    """
+    Verifica se o cache colunar existe e corresponde ao eplusout.csv atual.
+
+    Sem o CSV (ex.: removido para economizar disco), o cache é considerado válido.
+    """
+    sim_dir = Path(sim_dir)
+    index = _load_index(sim_dir)
+    if index is None or not (sim_dir / VALUES_NAME).exists():
+        return False
+
+    csv_file = csv_path(sim_dir)
+    if not csv_file.exists():
+        return True
+    return index.get('source') == _source_fingerprint(csv_file)
+
+
+def output_exists(sim_dir: str) -> bool:
+    """Indica se há outputs legíveis (cache atualizado, eplusout.csv ou .csv.gz)."""
+    return csv_path(sim_dir).exists() or is_cache_fresh(sim_dir)
+
+
+def convert_output(sim_dir: str, dtype: str = 'float32', force: bool = False) -> Path:
+    """
+    Converte sim_dir/eplusout.csv para o cache colunar binário.
+
+    Args:
+        sim_dir: Diretório da simulação
+        dtype: Tipo das colunas numéricas ('float32' ou 'float64')
+        force: Reconverte mesmo se o cache estiver atualizado
+
+    Returns:
+        Caminho do índice do cache (eplusout.columns.json)
+    """
+    sim_dir = Path(sim_dir)
+    csv_file = csv_path(sim_dir)
+
+    if not force and is_cache_fresh(sim_dir):
+        return sim_dir / INDEX_NAME
+
+    if not csv_file.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {csv_file}")
+
+    fingerprint = _source_fingerprint(csv_file)
+    df = pd.read_csv(csv_file)
+
+    numeric = [col for col in df.columns if df[col].dtype.kind in 'fiub']
+    text = [col for col in df.columns if df[col].dtype.kind not in 'fiub']
+
+    # Escreve em arquivos temporários e renomeia; o índice é gravado por último
+    values = np.asfortranarray(df[numeric].to_numpy(dtype=dtype))
+    tmp_values = sim_dir / (VALUES_NAME + '.tmp')
+    with open(tmp_values, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp_values, sim_dir / VALUES_NAME)
+
+    text_files = {}
+    for i, col in enumerate(text):
+        name = TEXT_NAME.format(i)
+        tmp_text = sim_dir / (name + '.tmp')
+        with open(tmp_text, 'wb') as f:
+            np.save(f, df[col].astype(str).to_numpy(dtype=str))
+        os.replace(tmp_text, sim_dir / name)
+        text_files[col] = name
+
+    index = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'columns': list(df.columns),
+        'numeric': numeric,
+        'text': text_files,
+        'dtype': str(values.dtype),
+        'rows': int(len(df)),
+        'source': fingerprint,
+    }
+    tmp_index = sim_dir / (INDEX_NAME + '.tmp')
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_index, sim_dir / INDEX_NAME)
+
+    return sim_dir / INDEX_NAME
+
+
+def read_header(sim_dir: str) -> List[str]:
+    """Lê apenas o cabeçalho (nomes das colunas) dos outputs de uma simulação."""
+    sim_dir = Path(sim_dir)
+    if is_cache_fresh(sim_dir):
+        return _load_index(sim_dir)['columns']
+    return list(pd.read_csv(csv_path(sim_dir), nrows=0).columns)
+
+
+def read_output(sim_dir: str, columns: Optional[Sequence[str]] = None,
+                dtype: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lê os outputs de uma simulação, preferindo o cache colunar.
+
+    Com o cache, as colunas numéricas são mapeadas em memória (sem parse de
+    texto). Sem cache atualizado, lê o eplusout.csv fazendo o parse apenas
+    das colunas pedidas (usecols).
+
+    Args:
+        sim_dir: Diretório da simulação
+        columns: Colunas desejadas (None = todas)
+        dtype: Tipo das colunas numéricas (ex.: 'float32'; None = padrão do pandas)
+
+    Returns:
+        DataFrame com as colunas na ordem original do arquivo
+    """
+    sim_dir = Path(sim_dir)
+    selected = set(columns) if columns is not None else None
+
+    if not is_cache_fresh(sim_dir):
+        csv_dtype = None
+        if dtype is not None and selected is not None:
+            csv_dtype = {c: dtype for c in selected if c not in TEXT_COLUMNS}
+        return pd.read_csv(csv_path(sim_dir),
+                           usecols=list(selected) if selected is not None else None,
+                           dtype=csv_dtype)
+
+    index = _load_index(sim_dir)
+    wanted = index['columns'] if selected is None else [
+        c for c in index['columns'] if c in selected]
+
+    values = np.load(sim_dir / VALUES_NAME, mmap_mode='r')
+    numeric_pos = {col: i for i, col in enumerate(index['numeric'])}
+
+    data = {}
+    for col in wanted:
+        if col in numeric_pos:
+            column = values[:, numeric_pos[col]]
+            data[col] = column if dtype is None else column.astype(dtype, copy=False)
+        else:
+            data[col] = np.load(sim_dir / index['text'][col])
+
+    return pd.DataFrame(data, columns=wanted, copy=False)
+
+
+def read_output_chunks(sim_dir: str, columns: Sequence[str], chunksize: int,
+                       dtype: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê os outputs em blocos de linhas de tamanho fixo (memória constante).
+
+    Args:
+        sim_dir: Diretório da simulação
+        columns: Colunas desejadas
+        chunksize: Linhas por bloco
+        dtype: Tipo das colunas numéricas (None = padrão do pandas)
+
+    Yields:
+        DataFrames com até chunksize linhas, colunas na ordem do arquivo
+    """
+    sim_dir = Path(sim_dir)
+
+    if not is_cache_fresh(sim_dir):
+        selected = set(columns)
+        csv_dtype = None
+        if dtype is not None:
+            csv_dtype = {c: dtype for c in selected if c not in TEXT_COLUMNS}
+        with pd.read_csv(csv_path(sim_dir), usecols=list(selected), dtype=csv_dtype,
+                         chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    # Cache: fatias do memory-map (apenas as páginas do bloco são lidas)
+    df = read_output(sim_dir, columns=columns)
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        yield chunk if dtype is None else chunk.astype(
+            {c: dtype for c in chunk.columns if c not in TEXT_COLUMNS})
+
+
+def convert_simulations(simulations_dir: str, dtype: str = 'float32',
+                        force: bool = False) -> int:
+    """
+    Converte todos os sim_XXXX/eplusout.csv de um diretório de simulações.
+
+    Returns:
+        Número de simulações convertidas ou já atualizadas
+    """
+    from tqdm import tqdm
+
+    sim_dirs = sorted(p for p in Path(simulations_dir).glob('sim_*')
+                      if csv_path(p).exists())
+    converted = 0
+
+    for sim_dir in tqdm(sim_dirs, desc="Cache colunar"):
+        try:
+            convert_output(sim_dir, dtype=dtype, force=force)
+            converted += 1
+        except Exception as e:
+            print(f"✗ Erro ao converter {sim_dir.name}: {e}")
+
+    return converted
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python -m sensitivity.output_cache <diretório simulations> [--force]")
+        sys.exit(1)
+
+    n = convert_simulations(sys.argv[1], force='--force' in sys.argv[2:])
+    print(f"✓ {n} simulações no cache colunar")
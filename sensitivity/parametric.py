@@ -0,0 +1,242 @@
+"""
+IDF paramétrico único (objetos Parametric:* do EnergyPlus).
+
+Em vez de um IDF por amostra, create_parametric_idf grava um único arquivo:
+o IDF base (como IDFTemplate o gera) com '=$parametro' nos campos que
+IDFModifier altera, um Parametric:SetValueForRun por parâmetro com o valor
+de cada amostra e um Parametric:FileNameSuffix com o sim_id de cada run.
+O ParametricPreprocessor do EnergyPlus expande esse arquivo em um IDF por
+run (<nome>-<sufixo>.idf), que expand_parametric_idf move para
+sim_XXXX/model.idf.
+
+Os valores já vão convertidos (W, número de pessoas) e formatados como o
+eppy os grava, então a expansão não precisa de Parametric:Logic nem de
+expressões e reproduz os IDFs de IDFModifier. Com o EnergyPlus sintético
+(sem ParametricPreprocessor), o arquivo é expandido em Python; numa
+instalação real sem o ParametricPreprocessor, a expansão falha.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from .idf_modifier import shared_modifier
+from .idf_template import COMMENT_SEPARATOR, format_field, format_value
+from .synthetic import SYNTHETIC_ENERGYPLUS
+
+
+PARAMETRIC_NAME = 'parametric.idf'
+SET_VALUE = 'Parametric:SetValueForRun'
+FILE_SUFFIX = 'Parametric:FileNameSuffix'
+
+
+def _suffix(sim_id: int) -> str:
+    return f"{sim_id:04d}"
+
+
+def _field_text(line: str) -> str:
+    """Valor de uma linha de campo, com a vírgula ou o ponto e vírgula."""
+    return line.split('!-', 1)[0].strip()
+
+
+def _object_lines(key: str, name: str, values: List[str], comment: str) -> List[str]:
+    """Linhas de um objeto Parametric:* no formato do eppy."""
+    lines = ['', f"{key},", format_field(name, 'Name', False)]
+    for i, text in enumerate(values, start=1):
+        lines.append(format_field(text, f"{comment} {i}", i == len(values)))
+    return lines
+
+
+def create_parametric_idf(samples_df: pd.DataFrame, base_idf: str, output_path: str,
+                          backend: str = 'csv', screening: Optional[str] = None) -> str:
+    """
+    Grava o IDF paramétrico com um run por amostra de samples_df.
+
+    Args:
+        samples_df: Amostras LHS (sim_id e parâmetros)
+        base_idf: Caminho do IDF base
+        output_path: Caminho do IDF paramétrico
+        backend: Fonte dos resultados ('csv', 'sql' ou 'eso')
+        screening: Modo de triagem (período reduzido; None = ano completo)
+
+    Returns:
+        Caminho do arquivo criado
+    """
+    template = shared_modifier(base_idf).idf_template(backend, screening)
+    if template is None:
+        raise RuntimeError("IDF paramétrico requer a gravação por template (ver idf_template.py)")
+
+    param_names = [c for c in samples_df.columns if c != 'sim_id']
+    sim_ids = samples_df['sim_id'].astype(int).tolist()
+    rows = samples_df[param_names].to_numpy().tolist()
+
+    lines = list(template.lines)
+    objects = []
+    for col, name in enumerate(param_names):
+        slots = template.slots.get(name)
+        if not slots:
+            continue
+        convert = template.converters.get(name)
+        values = [row[col] if convert is None else convert(row[col]) for row in rows]
+
+        # O eppy formata o último campo de um objeto sem notação científica:
+        # campos finais e intermediários do mesmo parâmetro usam variáveis próprias
+        kinds = sorted({last for _, _, last in slots})
+        for last in kinds:
+            variable = f"${name}" if len(kinds) == 1 else f"${name}_{'fim' if last else 'meio'}"
+            for line_no, comment, slot_last in slots:
+                if slot_last == last:
+                    lines[line_no] = format_field(f"={variable}", comment, last)
+            objects += _object_lines(SET_VALUE, variable,
+                                     [format_value(v, last) for v in values], 'Value for Run')
+    objects += _object_lines(FILE_SUFFIX, 'Simulacoes', [_suffix(i) for i in sim_ids],
+                             'Suffix for File for Run')
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(template.linesep.join(lines + objects).encode('latin-1'))
+    os.replace(tmp_path, output_path)
+    return str(output_path)
+
+
+def find_parametric_preprocessor(energyplus_path: Optional[str]) -> Optional[str]:
+    """
+    ParametricPreprocessor da instalação do EnergyPlus.
+
+    Returns:
+        Caminho do executável; None com o EnergyPlus sintético (expansão em Python)
+
+    Raises:
+        FileNotFoundError: se a instalação não tiver o ParametricPreprocessor
+    """
+    if energyplus_path == SYNTHETIC_ENERGYPLUS:
+        return None
+    if not energyplus_path:
+        raise FileNotFoundError("EnergyPlus não encontrado (necessário para o ParametricPreprocessor)")
+    base = Path(energyplus_path).resolve().parent / 'PreProcess' / 'ParametricPreprocessor'
+    for exe in ('ParametricPreprocessor', 'ParametricPreprocessor.exe'):
+        if (base / exe).exists():
+            return str(base / exe)
+    raise FileNotFoundError(f"ParametricPreprocessor não encontrado em {base}")
+
+
+def _read_parametric(parametric_idf: Path) -> Tuple[str, List[str], Dict[str, List[str]], List[str]]:
+    """
+    Lê o IDF paramétrico, separando o modelo dos objetos Parametric:*.
+
+    Returns:
+        (separador de linhas, linhas do modelo, {variável: valores por run},
+        sufixos dos runs)
+    """
+    with open(parametric_idf, 'rb') as f:
+        raw = f.read().decode('latin-1')
+    linesep = '\r\n' if '\r\n' in raw else '\n'
+
+    # Separa o modelo dos objetos Parametric:* (e da linha em branco anterior)
+    model, objects, current = [], [], None
+    for line in raw.splitlines():
+        if current is None and line.startswith('Parametric:'):
+            current = [line]
+            if model and model[-1] == '':
+                model.pop()
+        elif current is not None:
+            current.append(line)
+            if _field_text(line).endswith(';'):
+                objects.append(current)
+                current = None
+        else:
+            model.append(line)
+
+    variables, suffixes = {}, None
+    for obj in objects:
+        key = obj[0].rstrip(',')
+        values = [_field_text(line)[:-1] for line in obj[1:]]
+        if key == SET_VALUE:
+            variables[values[0]] = values[1:]
+        elif key == FILE_SUFFIX:
+            suffixes = values[1:]
+    if suffixes is None:
+        n_runs = len(next(iter(variables.values()), []))
+        suffixes = [str(i) for i in range(1, n_runs + 1)]
+    return linesep, model, variables, suffixes
+
+
+def _expand_in_python(parametric_idf: Path):
+    """
+    Expande o IDF paramétrico como o ParametricPreprocessor.
+
+    Suporta o que create_parametric_idf grava: campos '=$variável' e os
+    objetos Parametric:SetValueForRun e Parametric:FileNameSuffix.
+    """
+    linesep, model, variables, suffixes = _read_parametric(parametric_idf)
+
+    fields = []
+    for line_no, line in enumerate(model):
+        text = _field_text(line)
+        if text.startswith('=$'):
+            fields.append((line_no, text[1:-1], line.split(COMMENT_SEPARATOR, 1)[-1],
+                           text.endswith(';')))
+
+    for run, suffix in enumerate(suffixes):
+        lines = list(model)
+        for line_no, variable, comment, last in fields:
+            lines[line_no] = format_field(variables[variable][run], comment, last)
+        expanded = parametric_idf.with_name(f"{parametric_idf.stem}-{suffix}.idf")
+        with open(expanded, 'wb') as f:
+            f.write(linesep.join(lines).encode('latin-1'))
+
+
+def expand_parametric_idf(parametric_idf: str, output_base_dir: str,
+                          preprocessor: Optional[str] = None,
+                          timeout: float = 600,
+                          expected_runs: Optional[int] = None) -> Dict[int, str]:
+    """
+    Expande o IDF paramétrico e move cada run para sim_XXXX/model.idf.
+
+    Arquivos <stem>-*.idf de expansões anteriores são removidos antes, e
+    só os sufixos declarados em Parametric:FileNameSuffix são movidos.
+
+    Args:
+        parametric_idf: IDF criado por create_parametric_idf
+        output_base_dir: Diretório base das simulações
+        preprocessor: Executável do ParametricPreprocessor (None = expansão
+            em Python, usada apenas com o motor sintético)
+        timeout: Tempo máximo do ParametricPreprocessor (s)
+        expected_runs: Número de runs esperado (ex.: len(samples_df))
+
+    Returns:
+        {sim_id: caminho do model.idf}
+    """
+    parametric_idf = Path(parametric_idf).resolve()
+    for stale in parametric_idf.parent.glob(f"{parametric_idf.stem}-*.idf"):
+        stale.unlink()
+
+    _, _, _, suffixes = _read_parametric(parametric_idf)
+    if expected_runs is not None and len(suffixes) != expected_runs:
+        raise RuntimeError(f"IDF paramétrico declara {len(suffixes)} runs; "
+                           f"esperados {expected_runs}")
+
+    if preprocessor is not None:
+        result = subprocess.run([preprocessor, parametric_idf.name], cwd=parametric_idf.parent,
+                                capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            err_file = parametric_idf.with_suffix('.PPerr')
+            raise RuntimeError(f"ParametricPreprocessor falhou (código {result.returncode}); "
+                               f"ver {err_file.name}")
+    else:
+        _expand_in_python(parametric_idf)
+
+    idfs = {}
+    for suffix in suffixes:
+        expanded = parametric_idf.with_name(f"{parametric_idf.stem}-{suffix}.idf")
+        if not expanded.exists():
+            raise RuntimeError(f"Run '{suffix}' não foi gerado pela expansão ({expanded.name})")
+        sim_id = int(suffix)
+        target = Path(output_base_dir) / f"sim_{sim_id:04d}" / "model.idf"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(expanded, target)
+        idfs[sim_id] = str(target)
+    return idfs
@@ -0,0 +1,218 @@
+"""
+Monitoramento de recursos para a execução adaptativa de simulações.
+
+Mede núcleos ociosos, memória disponível e memória residente (RSS) de cada
+EnergyPlus, e decide quantas simulações simultâneas cabem na máquina sem
+sobrecarregá-la. Usa psutil quando instalado; caso contrário, lê /proc
+(Linux). Sem nenhuma das duas fontes, a concorrência fica no máximo pedido.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Set
+
+
+MB = 1024 * 1024
+
+
+def _psutil():
+    """Importa psutil sob demanda (dependência opcional)."""
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+def usable_cores() -> Set[int]:
+    """Núcleos em que este processo pode executar (respeita cgroups/taskset)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+def available_memory() -> Optional[int]:
+    """Memória disponível em bytes (None se não for possível medir)."""
+    psutil = _psutil()
+    if psutil is not None:
+        return int(psutil.virtual_memory().available)
+
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Memória residente (RSS) de um processo em bytes."""
+    psutil = _psutil()
+    if psutil is not None:
+        try:
+            return int(psutil.Process(pid).memory_info().rss)
+        except psutil.Error:
+            return None
+
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class CpuMonitor:
+    """
+    Núcleos ociosos no intervalo entre duas chamadas de idle_cores().
+
+    Só os núcleos em que o processo pode executar (usable_cores) contam: com
+    afinidade ou cpuset restritos, núcleos ociosos fora deles não recebem
+    simulações.
+    """
+
+    def __init__(self, cores: Optional[Set[int]] = None):
+        self.cores = sorted(cores if cores is not None else usable_cores())
+        self._last = self._read_times()
+
+    def _read_times(self) -> Optional[tuple]:
+        """(tempo ocioso, tempo total) acumulados dos núcleos de self.cores."""
+        psutil = _psutil()
+        if psutil is not None:
+            per_cpu = psutil.cpu_times(percpu=True)
+            times = [per_cpu[core] for core in self.cores if core < len(per_cpu)]
+            idle = sum(t.idle + getattr(t, 'iowait', 0.0) for t in times)
+            return idle, sum(sum(t) for t in times)
+
+        wanted = {f"cpu{core}" for core in self.cores}
+        idle = total = 0.0
+        try:
+            with open('/proc/stat', 'r') as f:
+                for line in f:
+                    name, _, rest = line.partition(' ')
+                    if name not in wanted:
+                        continue
+                    values = [float(v) for v in rest.split()]
+                    # user nice system idle iowait irq softirq steal [guest guest_nice]
+                    idle += values[3] + values[4]
+                    total += sum(values[:8])
+        except (OSError, ValueError):
+            return None
+        return (idle, total) if total > 0 else None
+
+    def idle_cores(self) -> Optional[float]:
+        """Número (fracionário) de núcleos utilizáveis ociosos desde a última medição."""
+        current = self._read_times()
+        last, self._last = self._last, current
+        if current is None or last is None or current[1] <= last[1]:
+            return None
+
+        idle_fraction = (current[0] - last[0]) / (current[1] - last[1])
+        return idle_fraction * len(self.cores)
+
+
+class AdaptiveConcurrency:
+    """
+    Decide o número de simulações simultâneas a partir da carga da máquina.
+
+    O alvo é o menor entre:
+    - simulações em andamento + núcleos ociosos (aumentando no máximo metade
+      da folga por ajuste, pois cada EnergyPlus leva alguns segundos para
+      ocupar o núcleo);
+    - simulações em andamento + memória livre (descontada a reserva) / RSS
+      de pico observado por simulação.
+    """
+
+    def __init__(self, max_workers: int, min_workers: int = 1,
+                 memory_reserve_mb: float = 1024, default_rss_mb: float = 500):
+        """
+        Args:
+            max_workers: Limite superior de simulações simultâneas
+            min_workers: Limite inferior
+            memory_reserve_mb: Memória mantida livre para o sistema
+            default_rss_mb: Estimativa de RSS por simulação até haver medições
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.min_workers = max(1, min(int(min_workers), self.max_workers))
+        self.memory_reserve = memory_reserve_mb * MB
+        self.peak_rss = default_rss_mb * MB
+        self._observed = False
+        self._cpu = CpuMonitor()
+
+    def observe_rss(self, rss: Optional[int]):
+        """Registra a RSS medida de uma simulação em andamento."""
+        if not rss:
+            return
+        if not self._observed:
+            self.peak_rss, self._observed = rss, True
+        else:
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def target(self, running: int, current: int) -> int:
+        """
+        Novo limite de concorrência.
+
+        Args:
+            running: Simulações em andamento
+            current: Limite atual
+        """
+        target = self.max_workers
+
+        idle = self._cpu.idle_cores()
+        if idle is not None:
+            if idle >= 1:
+                target = min(target, max(current, running) + max(1, int(idle // 2)))
+            else:
+                target = min(target, max(running, self.min_workers))
+
+        free = available_memory()
+        if free is not None:
+            fits = int(max(0.0, free - self.memory_reserve) // self.peak_rss)
+            target = min(target, running + fits)
+
+        return max(self.min_workers, min(target, self.max_workers))
+
+
+class CorePinner:
+    """Distribui simulações entre núcleos dedicados (os.sched_setaffinity)."""
+
+    def __init__(self, cores: Optional[Set[int]] = None):
+        self.cores = sorted(cores if cores is not None else usable_cores())
+        self._usage: Dict[int, int] = {core: 0 for core in self.cores}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supported() -> bool:
+        return hasattr(os, 'sched_setaffinity')
+
+    def pin(self, pid: int) -> Optional[int]:
+        """
+        Fixa o processo no núcleo menos ocupado.
+
+        Returns:
+            Núcleo escolhido (None se não for possível fixar)
+        """
+        if not self.supported() or not self.cores:
+            return None
+
+        with self._lock:
+            core = min(self.cores, key=lambda c: self._usage[c])
+            self._usage[core] += 1
+
+        try:
+            os.sched_setaffinity(pid, {core})
+        except OSError:
+            self.release(core)
+            return None
+        return core
+
+    def release(self, core: Optional[int]):
+        """Libera o núcleo ao fim da simulação."""
+        if core is None:
+            return
+        with self._lock:
+            self._usage[core] -= 1
@@ -0,0 +1,168 @@
+"""
+Cache de resultados de simulações endereçado por conteúdo.
+
+A chave de cada entrada é o hash (SHA-256) dos bytes do IDF gerado, do
+arquivo climático EPW e da versão do EnergyPlus: duas amostras que geram o
+mesmo modelo (por exemplo, diferindo apenas em parâmetros ainda sem efeito no
+IDF, como cop_ac) ou uma nova execução com a mesma semente reaproveitam a
+simulação já feita.
+
+Cada entrada guarda o metrics.json (variáveis dependentes extraídas, ver
+manifest.py), o eplusout.err e, opcionalmente, a série temporal compacta
+(eplusout.csv.gz), que permite recalcular métricas cujas definições mudaram.
+
+Layout: <cache_dir>/<2 primeiros hex>/<chave>/. O mtime do diretório da
+entrada marca o último acesso; ao exceder max_bytes, as entradas acessadas
+há mais tempo são removidas (LRU).
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .manifest import METRICS_NAME
+from .output_cache import CSV_NAME, CSV_GZ_NAME
+
+
+ERR_NAME = 'eplusout.err'
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 do conteúdo de um arquivo."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class ResultCache:
+    """Cache local {hash(IDF, EPW, versão do EnergyPlus): métricas (+ série temporal)}."""
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = 2 << 30,
+                 keep_series: bool = False):
+        """
+        Args:
+            cache_dir: Diretório do cache (criado se não existir)
+            max_bytes: Tamanho máximo do cache (None = sem limite)
+            keep_series: Guarda também o eplusout.csv.gz de cada simulação
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.keep_series = keep_series
+        self._lock = threading.Lock()
+        # Hash do EPW por (caminho, tamanho, mtime): o mesmo arquivo serve o lote todo
+        self._epw_digests: Dict[Tuple[str, int, int], str] = {}
+
+    def key(self, idf_path: str, weather_file: str, energyplus_version: str) -> str:
+        """Chave da simulação: hash do IDF, do EPW e da versão do EnergyPlus."""
+        stat = os.stat(weather_file)
+        epw_id = (str(Path(weather_file).resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            epw_digest = self._epw_digests.get(epw_id)
+        if epw_digest is None:
+            epw_digest = file_digest(weather_file)
+            with self._lock:
+                self._epw_digests[epw_id] = epw_digest
+
+        sha = hashlib.sha256()
+        for part in (file_digest(idf_path), epw_digest, energyplus_version):
+            sha.update(part.encode('utf-8'))
+            sha.update(b'\0')
+        return sha.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def fetch(self, key: str, output_dir: str) -> bool:
+        """
+        Copia a entrada para output_dir, se existir.
+
+        Returns:
+            True em caso de acerto (cache hit)
+        """
+        entry = self._entry(key)
+        if not (entry / METRICS_NAME).exists():
+            return False
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for src in entry.iterdir():
+                shutil.copyfile(src, output_dir / src.name)
+            os.utime(entry)  # Marca o acesso (LRU)
+        except OSError:
+            return False  # Entrada removida por evict() concorrente
+        return True
+
+    def store(self, key: str, output_dir: str):
+        """
+        Grava no cache os outputs de uma simulação bem-sucedida.
+
+        output_dir deve conter o metrics.json; a série temporal é lida do
+        eplusout.csv.gz ou comprimida a partir do eplusout.csv.
+        """
+        output_dir = Path(output_dir)
+        entry = self._entry(key)
+        if entry.exists() or not (output_dir / METRICS_NAME).exists():
+            return
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key[:8]}_", dir=entry.parent))
+        try:
+            for name in (METRICS_NAME, ERR_NAME):
+                if (output_dir / name).exists():
+                    shutil.copyfile(output_dir / name, tmp / name)
+
+            if self.keep_series:
+                if (output_dir / CSV_GZ_NAME).exists():
+                    shutil.copyfile(output_dir / CSV_GZ_NAME, tmp / CSV_GZ_NAME)
+                elif (output_dir / CSV_NAME).exists():
+                    with open(output_dir / CSV_NAME, 'rb') as f_in, \
+                            gzip.open(tmp / CSV_GZ_NAME, 'wb', compresslevel=6) as f_out:
+                        shutil.copyfileobj(f_in, f_out, 1 << 20)
+
+            # Rename atômico: leitores nunca veem uma entrada incompleta
+            os.replace(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # Outra thread gravou a mesma chave
+            return
+
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(último acesso, tamanho, diretório) de cada entrada."""
+        entries = []
+        for prefix in self.cache_dir.iterdir():
+            if not prefix.is_dir():
+                continue
+            for entry in prefix.iterdir():
+                if entry.name.startswith('.'):
+                    continue  # Gravação em andamento
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                except OSError:
+                    continue
+        return entries
+
+    def size(self) -> int:
+        """Tamanho total (bytes) das entradas do cache."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes: int):
+        """Remove as entradas acessadas há mais tempo até o cache caber em max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in entries:
+                if total <= max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
@@ -1,413 +1,159 @@
 """
 Extrator de resultados de simulações EnergyPlus.
 
-Lê arquivos de saída (.csv, .err) e extrai variáveis dependentes.
+Lê arquivos de saída (.csv, cache colunar, eplusout.sql ou eplusout.eso; .err)
+e extrai variáveis dependentes.
 """
 
+import multiprocessing
+import threading
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, Optional
-from .config import DEPENDENT_VARIABLES
+from typing import Dict, List, Optional
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+from .aggregation import compile_plan, output_names
+from .output_cache import output_exists, read_header, read_output, read_output_chunks
+from .sqlite_backend import SQL_NAME, extract_from_sql
+from .eso_backend import ESO_NAME, extract_from_eso
+from .manifest import read_metrics
+from .screening import expected_rows, extrapolate
+
+
+# Fontes de outputs suportadas por ResultsExtractor: arquivo lido e função de extração
+BACKENDS = {
+    'csv': None,
+    'sql': (SQL_NAME, extract_from_sql),
+    'eso': (ESO_NAME, extract_from_eso),
+}
 
 
 class ResultsExtractor:
     """Extrai resultados das simulações EnergyPlus."""
     
-    def __init__(self, output_dir: str):
-        self.output_dir = Path(output_dir)
-    
-    def extract_all_variables(self) -> Dict[str, float]:
-        """
-        Extrai todas as variáveis dependentes.
-        
-        Returns:
-            Dicionário com valores das variáveis dependentes
-        """
-        results = {}
-        
-        # Consumos energéticos
-        results['consumo_anual_resfriamento'] = self._extract_cooling_consumption()
-        results['consumo_anual_aquecimento'] = self._extract_heating_consumption()
-        results['consumo_eletricidade_total'] = self._extract_electricity_total()
-        
-        # Cargas térmicas
-        results['carga_pico_resfriamento'] = self._extract_peak_cooling()
-        
-        # Conforto térmico
-        results['horas_desconforto'] = self._extract_discomfort_hours()
-        
-        # Ganhos de calor
-        results['ganho_solar_transmitido'] = self._extract_solar_gain()
-        results['ganho_calor_janelas'] = self._extract_window_heat_gain()
-        
-        # Temperatura média anual
-        results['temperatura_media_anual'] = self._extract_mean_temperature()
-        
-        # Temperatura das 6 regiões teóricas
-        regional_temps = self._extract_regional_temperatures()
-        results.update(regional_temps)
-        
-        return results
-    
-    def _extract_cooling_consumption(self) -> float:
-        """
-        Extrai consumo anual de eletricidade para refrigeração (kWh/ano).
-        
-        Lê do eplusout.csv a coluna de consumo do sistema de resfriamento.
-        Usa DistrictCooling:Facility [J] para sistemas ideais.
-        """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return np.nan
-        
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por colunas de DistrictCooling ou consumo de resfriamento
-            cooling_columns = [col for col in df.columns if 
-                             'DistrictCooling:Facility' in col or
-                             any(x in col.lower() for x in 
-                                 ['zone ideal loads zone total cooling energy',
-                                  'zone ideal loads supply air total cooling energy'])]
-            
-            if not cooling_columns:
-                return np.nan
-            
-            # Soma consumo total (converte J para kWh)
-            total_j = df[cooling_columns].sum().sum()
-            total_kwh = total_j / 3.6e6  # 1 kWh = 3.6e6 J
-            
-            return float(total_kwh)
-        
-        except Exception as e:
-            print(f"Erro ao extrair consumo em {self.output_dir}: {e}")
-            return np.nan
-    
-    def _extract_peak_cooling(self) -> float:
-        """
-        Extrai carga de pico de resfriamento (kW).
-        
-        Calcula a taxa máxima instantânea de resfriamento.
-        Para sistemas ideais, usa Zone Ideal Loads Zone Total Cooling Energy [J]
-        e calcula a potência dividindo pelo timestep.
-        """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return np.nan
-        
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por colunas de energia de resfriamento timestep
-            cooling_energy_cols = [col for col in df.columns if 
-                                  'Zone Ideal Loads Zone Total Cooling Energy' in col or
-                                  'DistrictCooling:Facility' in col]
-            
-            if not cooling_energy_cols:
-                return np.nan
-            
-            # Timestep padrão do EnergyPlus: 15 minutos = 900 segundos
-            timestep_seconds = 900.0
-            
-            # Calcula potência (W) = Energia (J) / tempo (s)
-            # Depois converte para kW
-            max_w = (df[cooling_energy_cols].max().max()) / timestep_seconds
-            max_kw = max_w / 1000.0
-            
-            return float(max_kw)
-        
-        except Exception as e:
-            print(f"Erro ao extrair pico em {self.output_dir}: {e}")
-            return np.nan
-    
-    def _extract_discomfort_hours(self, threshold: float = 26.0) -> float:
+    def __init__(self, output_dir: str, dtype: str = 'float32',
+                 chunksize: Optional[int] = None, backend: str = 'csv',
+                 screening: Optional[str] = None):
         """
-        Extrai horas de desconforto (horas acima do threshold).
-        
         Args:
-            threshold: Temperatura limite para desconforto (°C)
-        
-        Returns:
-            Número de horas acima do threshold
+            output_dir: Diretório de saída da simulação
+            dtype: Tipo usado no parse das colunas numéricas ('float64' reproduz
+                exatamente os valores do CSV; reduções são sempre em float64)
+            chunksize: Se informado, lê os outputs em blocos desse número de
+                linhas (memória constante, independente do tamanho do arquivo)
+            backend: 'csv' (eplusout.csv ou cache colunar), 'sql' (agregações
+                calculadas pelo SQLite sobre o eplusout.sql) ou 'eso' (parser
+                em streaming do eplusout.eso)
+            screening: Modo de triagem da simulação; métricas extensivas são
+                extrapoladas para o ano (ver screening.py)
         """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return np.nan
-        
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por temperatura operativa ou do ar da zona
-            temp_cols = [col for col in df.columns if 
-                        any(x in col.lower() for x in 
-                            ['operative temp', 'zone mean air temp', 
-                             'zone air temperature'])]
-            
-            if not temp_cols:
-                return np.nan
-            
-            # Conta horas acima do threshold
-            discomfort_hours = 0
-            for col in temp_cols:
-                discomfort_hours += (df[col] > threshold).sum()
-            
-            # Média entre as zonas (se houver múltiplas)
-            if len(temp_cols) > 1:
-                discomfort_hours /= len(temp_cols)
-            
-            return float(discomfort_hours)
-        
-        except Exception as e:
-            print(f"Erro ao extrair desconforto em {self.output_dir}: {e}")
-            return np.nan
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend não suportado: {backend}")
+        self.output_dir = Path(output_dir)
+        self.dtype = dtype
+        self.chunksize = chunksize
+        self.backend = backend
+        self.screening = screening
     
-    def _extract_heating_consumption(self) -> float:
+    def _load_output(self, columns: List[str]) -> pd.DataFrame:
         """
-        Extrai consumo anual de energia para aquecimento (kWh/ano).
+        Carrega apenas as colunas necessárias dos outputs.
         
-        Lê do eplusout.csv a coluna de energia de aquecimento.
-        Usa Zone Ideal Loads Zone Total Heating Energy [J].
+        Usa o cache colunar (output_cache.py) quando atualizado; senão, faz o
+        parse só dessas colunas do eplusout.csv.
         """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return np.nan
-        
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por colunas de aquecimento
-            heating_columns = [col for col in df.columns if 
-                             any(x in col.lower() for x in 
-                                 ['zone ideal loads zone total heating energy',
-                                  'zone ideal loads supply air total heating energy'])]
-            
-            if not heating_columns:
-                return 0.0  # Sem aquecimento
-            
-            # Soma consumo total (converte J para kWh)
-            total_j = df[heating_columns].sum().sum()
-            total_kwh = total_j / 3.6e6
-            
-            return float(total_kwh)
-        
-        except Exception as e:
-            print(f"Erro ao extrair aquecimento em {self.output_dir}: {e}")
-            return np.nan
+        return read_output(self.output_dir, columns=columns, dtype=self.dtype)
     
-    def _extract_electricity_total(self) -> float:
-        """
-        Extrai consumo total de eletricidade da edificação (kWh/ano).
-        
-        Inclui iluminação, equipamentos e outros consumos elétricos.
-        Usa Electricity:Facility [J].
+    def extract_all_variables(self, variables: Optional[List[str]] = None,
+                              strict: bool = False) -> Dict[str, float]:
         """
-        csv_file = self.output_dir / 'eplusout.csv'
+        Extrai todas as variáveis dependentes.
         
-        if not csv_file.exists():
-            return np.nan
+        Lê apenas o cabeçalho dos outputs, compila o plano de agregação
+        (ver aggregation.py) e faz um único passe de leitura restrito às
+        colunas que DEPENDENT_VARIABLES e REGIONAL_TEMPERATURE_MODEL usam.
         
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por coluna de eletricidade total
-            elec_columns = [col for col in df.columns if 
-                           'Electricity:Facility' in col]
-            
-            if not elec_columns:
-                return np.nan
-            
-            # Soma consumo total (converte J para kWh)
-            total_j = df[elec_columns].sum().sum()
-            total_kwh = total_j / 3.6e6
-            
-            return float(total_kwh)
+        Args:
+            variables: Subconjunto de variáveis a extrair (None = todas)
+            strict: Levanta a exceção em vez de devolver NaN quando os outputs
+                faltam ou a extração falha (ex.: antes de gravar metrics.json)
         
-        except Exception as e:
-            print(f"Erro ao extrair eletricidade total em {self.output_dir}: {e}")
-            return np.nan
-    
-    def _extract_solar_gain(self) -> float:
-        """
-        Extrai radiação solar transmitida através das janelas (kWh/ano).
+        Com backend='sql' ou 'eso', as mesmas métricas são calculadas a partir
+        do eplusout.sql (sqlite_backend.py) ou do eplusout.eso (eso_backend.py).
+        Se a simulação já gravou metrics.json com as definições atuais (ver
+        retenção seletiva em simulation.py), os valores são lidos de lá.
+        Em simulações de triagem, o metrics.json guarda os valores do período
+        simulado; a extrapolação para o ano é aplicada aqui.
         
-        Lê do eplusout.csv as colunas de radiação solar transmitida.
-        Usa 'Surface Window Transmitted Solar Radiation Rate [W]'.
+        Returns:
+            Dicionário com valores das variáveis dependentes
         """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return np.nan
-        
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por colunas de radiação solar transmitida pelas janelas
-            solar_columns = [col for col in df.columns if 
-                           'Surface Window Transmitted Solar Radiation Rate' in col]
-            
-            if not solar_columns:
-                return np.nan
-            
-            # Timestep de 10 minutos = 1/6 hora
-            timestep_hours = 1.0 / 6.0
-            
-            # Calcula energia em Wh e depois converte para kWh
-            total_wh = df[solar_columns].sum().sum() * timestep_hours
-            total_kwh = total_wh / 1000.0
-            
-            return float(total_kwh)
-        
-        except Exception as e:
-            print(f"Erro ao extrair ganho solar em {self.output_dir}: {e}")
-            return np.nan
+        return extrapolate(self.extract_period(variables, strict), self.screening)
     
-    def _extract_window_heat_gain(self) -> float:
+    def extract_period(self, variables: Optional[List[str]] = None,
+                       strict: bool = False) -> Dict[str, float]:
         """
-        Extrai ganho de calor total pelas janelas (kWh/ano).
+        Extrai as variáveis sobre o período simulado (sem extrapolação).
         
-        Inclui radiação solar + condução térmica.
-        Usa 'Surface Window Heat Gain Rate [W]'.
+        Em triagem, o número de registros é conferido (dias de projeto não
+        podem entrar na extrapolação); um metrics.json só é aceito se foi
+        gravado para o mesmo modo de triagem, isto é, após a mesma conferência.
         """
-        csv_file = self.output_dir / 'eplusout.csv'
+        stored = read_metrics(self.output_dir, variables, screening=self.screening)
+        if stored is not None:
+            return stored
         
-        if not csv_file.exists():
-            return np.nan
+        rows = expected_rows(self.screening) if self.screening else None
         
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Procura por colunas de ganho de calor total das janelas
-            heat_gain_columns = [col for col in df.columns if 
-                               'Surface Window Heat Gain Rate' in col]
-            
-            if not heat_gain_columns:
-                return np.nan
-            
-            # Timestep de 10 minutos = 1/6 hora
-            timestep_hours = 1.0 / 6.0
-            
-            # Calcula energia em Wh e depois converte para kWh
-            total_wh = df[heat_gain_columns].sum().sum() * timestep_hours
-            total_kwh = total_wh / 1000.0
-            
-            return float(total_kwh)
+        if self.backend != 'csv':
+            return self._extract_from_backend(variables, rows, strict)
         
-        except Exception as e:
-            print(f"Erro ao extrair ganho calor janelas em {self.output_dir}: {e}")
-            return np.nan
-    
-    def _extract_mean_temperature(self) -> float:
-        """
-        Extrai temperatura média anual da zona (°C).
-        
-        Usa 'Zone Mean Air Temperature [C]'.
-        """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return np.nan
+        if not output_exists(self.output_dir):
+            if strict:
+                raise FileNotFoundError(f"Outputs não encontrados em {self.output_dir}")
+            return {name: np.nan for name in output_names(variables)}
         
         try:
-            df = pd.read_csv(csv_file)
+            plan = compile_plan(tuple(read_header(self.output_dir)), variables)
+            columns = plan.column_names
             
-            # Procura por coluna de temperatura média da zona
-            temp_col = [col for col in df.columns if 
-                       'Zone Mean Air Temperature' in col]
+            if self.chunksize:
+                # Streaming: acumuladores online por bloco de linhas
+                chunks = read_output_chunks(self.output_dir, columns, self.chunksize,
+                                            dtype=self.dtype)
+                return plan.evaluate_chunks(
+                    (chunk[columns].to_numpy(dtype=np.float64) for chunk in chunks), rows)
             
-            if not temp_col:
-                return np.nan
-            
-            # Calcula média anual
-            mean_temp = df[temp_col[0]].mean()
-            
-            return float(mean_temp)
+            df = self._load_output(columns)
+            # Colunas chegam na ordem do arquivo, a mesma de plan.columns
+            values = df[columns].to_numpy(dtype=np.float64)
+            return plan.evaluate(values, rows)
         
         except Exception as e:
-            print(f"Erro ao extrair temperatura média em {self.output_dir}: {e}")
-            return np.nan
+            if strict:
+                raise
+            print(f"Erro ao extrair resultados em {self.output_dir}: {e}")
+            return {name: np.nan for name in output_names(variables)}
     
-    def _extract_regional_temperatures(self) -> Dict[str, float]:
-        """
-        Extrai temperatura média de 6 regiões teóricas do laboratório.
-        
-        As 6 regiões são divisões conceituais (não zonas físicas):
-        - Região 1 (Frente-Esquerda): Próximo janela 1 + lousa
-        - Região 2 (Frente-Direita): Próximo porta + lousa
-        - Região 3 (Centro-Esquerda): Próximo janela 2
-        - Região 4 (Centro-Direita): Centro da sala
-        - Região 5 (Fundo-Esquerda): Próximo janelas 3,4 + ACs
-        - Região 6 (Fundo-Direita): Próximo ACs
-        
-        Usa temperatura de superfícies internas próximas para estimar temperatura regional.
-        """
-        csv_file = self.output_dir / 'eplusout.csv'
-        
-        if not csv_file.exists():
-            return {f'temp_regiao_{i}': np.nan for i in range(1, 7)}
+    def _extract_from_backend(self, variables: Optional[List[str]] = None,
+                              rows: Optional[int] = None,
+                              strict: bool = False) -> Dict[str, float]:
+        """Extrai as variáveis do eplusout.sql ou do eplusout.eso."""
+        file_name, extract = BACKENDS[self.backend]
+        source = self.output_dir / file_name
+        if not source.exists():
+            if strict:
+                raise FileNotFoundError(f"Output não encontrado: {source}")
+            return {name: np.nan for name in output_names(variables)}
         
         try:
-            df = pd.read_csv(csv_file)
-            
-            # Temperatura média da zona (referência)
-            zone_temp_col = [c for c in df.columns if 'Zone Mean Air Temperature' in c]
-            zone_temp = df[zone_temp_col[0]].mean() if zone_temp_col else 24.0
-            
-            # Temperatura de superfícies internas
-            wall_front_col = [c for c in df.columns if 'WALL_FRONT_BLACKBOARD' in c and 'Inside Face Temperature' in c]
-            wall_back_col = [c for c in df.columns if 'WALL_BACK_AC' in c and 'Inside Face Temperature' in c]
-            wall_left_col = [c for c in df.columns if 'WALL_LEFT_WINDOWS' in c and 'Inside Face Temperature' in c]
-            wall_right_col = [c for c in df.columns if 'WALL_RIGHT_DOOR' in c and 'Inside Face Temperature' in c]
-            
-            # Extrai temperaturas médias de paredes
-            t_front = df[wall_front_col[0]].mean() if wall_front_col else zone_temp
-            t_back = df[wall_back_col[0]].mean() if wall_back_col else zone_temp
-            t_left = df[wall_left_col[0]].mean() if wall_left_col else zone_temp
-            t_right = df[wall_right_col[0]].mean() if wall_right_col else zone_temp
-            
-            # Radiação solar através das janelas (W) - indica aquecimento local
-            # Quanto mais radiação, mais quente fica a região próxima
-            window1_solar = [c for c in df.columns if 'WINDOW_1' in c and 'Transmitted Solar' in c]
-            window2_solar = [c for c in df.columns if 'WINDOW_2' in c and 'Transmitted Solar' in c]
-            window3_solar = [c for c in df.columns if 'WINDOW_3' in c and 'Transmitted Solar' in c]
-            window4_solar = [c for c in df.columns if 'WINDOW_4' in c and 'Transmitted Solar' in c]
-            
-            # Radiação média (W)
-            solar_w1 = df[window1_solar[0]].mean() if window1_solar else 0
-            solar_w2 = df[window2_solar[0]].mean() if window2_solar else 0
-            solar_w3 = df[window3_solar[0]].mean() if window3_solar else 0
-            solar_w4 = df[window4_solar[0]].mean() if window4_solar else 0
-            
-            # Normaliza radiação para incremento de temperatura (aprox: 200W ~ +0.5°C)
-            # Baseado em ganho térmico típico por radiação solar direta
-            delta_t_w1 = solar_w1 / 400.0  # °C
-            delta_t_w2 = solar_w2 / 400.0
-            delta_t_w3 = solar_w3 / 400.0
-            delta_t_w4 = solar_w4 / 400.0
-            
-            # Calcula temperatura regional combinando:
-            # 1. Temperatura da zona (base)
-            # 2. Fração da diferença para superfícies adjacentes (reduzido)
-            # 3. Incremento por radiação solar nas janelas
-            # NOTA: Fatores reduzidos para evitar temperaturas irrealistas
-            results = {
-                'temp_regiao_1': zone_temp + 0.15 * (t_left - zone_temp) + 0.10 * (t_front - zone_temp) + delta_t_w1,  # Frente-Esquerda (janela 1)
-                'temp_regiao_2': zone_temp + 0.20 * (t_right - zone_temp) + 0.10 * (t_front - zone_temp),              # Frente-Direita (porta)
-                'temp_regiao_3': zone_temp + 0.15 * (t_left - zone_temp) + delta_t_w2,                                # Centro-Esquerda (janela 2)
-                'temp_regiao_4': zone_temp + 0.05 * (t_front - zone_temp) + 0.05 * (t_back - zone_temp),               # Centro (longe janelas)
-                'temp_regiao_5': zone_temp + 0.10 * (t_back - zone_temp) + 0.10 * (t_left - zone_temp) + 0.3 * (delta_t_w3 + delta_t_w4),  # Fundo-Esquerda (janelas 3,4)
-                'temp_regiao_6': zone_temp + 0.20 * (t_back - zone_temp) + 0.10 * (t_right - zone_temp),               # Fundo-Direita (ACs)
-            }
-            
-            return {k: float(v) for k, v in results.items()}
-        
+            return extract(source, variables, rows)
         except Exception as e:
-            print(f"Erro ao extrair temperaturas regionais em {self.output_dir}: {e}")
-            return {f'temp_regiao_{i}': np.nan for i in range(1, 7)}
+            if strict:
+                raise
+            print(f"Erro ao extrair resultados em {source}: {e}")
+            return {name: np.nan for name in output_names(variables)}
     
     def get_error_summary(self) -> Dict[str, any]:
         """
@@ -435,55 +181,165 @@ class ResultsExtractor:
             return {'error': str(e)}
 
 
-def extract_all_results(sim_results_df: pd.DataFrame, base_output_dir: str) -> pd.DataFrame:
+# Colunas de extracted_results.csv (ordem fixa para escrita incremental)
+RESULT_COLUMNS = ['sim_id'] + output_names() + ['success']
+
+
+def _failed_result(sim_id: int) -> Dict:
+    """Linha de resultado para simulação que falhou (valores NaN)."""
+    row = {name: np.nan for name in output_names()}
+    row['sim_id'] = sim_id
+    row['success'] = False
+    return row
+
+
+def _extract_chunk(base_output_dir: str, sim_ids: List[int],
+                   read_chunksize: Optional[int] = None,
+                   backend: str = 'csv', screening: Optional[str] = None) -> List[Dict]:
     """
-    Extrai resultados de todas as simulações.
+    Extrai um lote de simulações (executado em um processo do pool).
     
     Args:
-        sim_results_df: DataFrame com status das simulações
         base_output_dir: Diretório base dos outputs
+        sim_ids: IDs das simulações do lote
+        read_chunksize: Linhas por bloco na leitura em streaming (None = arquivo inteiro)
+        backend: Fonte dos outputs ('csv', 'sql' ou 'eso')
+        screening: Modo de triagem das simulações (None = ano completo)
     
     Returns:
-        DataFrame com variáveis dependentes de cada simulação
+        Lista de linhas de resultado, uma por simulação
     """
-    print("\nExtraindo resultados das simulações...")
-    
-    results_list = []
+    rows = []
     
-    for idx, row in sim_results_df.iterrows():
-        sim_id = row['sim_id']
-        
-        if not row['success']:
-            # Simulação falhou - valores NaN
-            results_list.append({
-                'sim_id': sim_id,
-                'consumo_anual_resfriamento': np.nan,
-                'carga_pico_resfriamento': np.nan,
-                'horas_desconforto': np.nan,
-                'success': False
-            })
-            continue
-        
+    for sim_id in sim_ids:
         output_dir = Path(base_output_dir) / f"sim_{sim_id:04d}"
-        extractor = ResultsExtractor(output_dir)
+        extractor = ResultsExtractor(output_dir, chunksize=read_chunksize, backend=backend,
+                                     screening=screening)
         
         try:
             results = extractor.extract_all_variables()
             results['sim_id'] = sim_id
             results['success'] = True
-            results_list.append(results)
+            rows.append(results)
         
         except Exception as e:
             print(f"✗ Erro ao extrair resultados de sim_{sim_id}: {e}")
-            results_list.append({
-                'sim_id': sim_id,
-                'consumo_anual_resfriamento': np.nan,
-                'carga_pico_resfriamento': np.nan,
-                'horas_desconforto': np.nan,
-                'success': False
-            })
+            rows.append(_failed_result(sim_id))
+    
+    return rows
+
+
+class _ResultWriter:
+    """Acumula linhas de resultado, opcionalmente anexando-as a um CSV."""
     
-    results_df = pd.DataFrame(results_list)
+    def __init__(self, output_path: Optional[str] = None):
+        self.output_path = output_path
+        self.collected = []
+        self.out_file = None
+        if output_path is not None:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            self.out_file = open(output_path, 'w', newline='', encoding='utf-8')
+            self.out_file.write(','.join(RESULT_COLUMNS) + '\n')
+    
+    def emit(self, rows: List[Dict]):
+        chunk_df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+        if self.out_file is not None:
+            chunk_df.to_csv(self.out_file, header=False, index=False)
+            self.out_file.flush()
+        else:
+            self.collected.append(chunk_df)
+    
+    def close(self):
+        if self.out_file is not None:
+            self.out_file.close()
+            self.out_file = None
+    
+    def results(self) -> pd.DataFrame:
+        """DataFrame com todas as linhas emitidas, ordenado por sim_id."""
+        if self.output_path is not None:
+            results_df = pd.read_csv(self.output_path, float_precision='round_trip')
+        elif self.collected:
+            results_df = pd.concat(self.collected, ignore_index=True)
+        else:
+            results_df = pd.DataFrame(columns=RESULT_COLUMNS)
+        
+        results_df = results_df.sort_values('sim_id').reset_index(drop=True)
+        results_df['success'] = results_df['success'].astype(bool)
+        return results_df
+
+
+def extract_all_results(sim_results_df: pd.DataFrame, base_output_dir: str,
+                        max_workers: int = 1, output_path: Optional[str] = None,
+                        chunk_size: Optional[int] = None,
+                        read_chunksize: Optional[int] = None,
+                        backend: str = 'csv', screening: Optional[str] = None) -> pd.DataFrame:
+    """
+    Extrai resultados de todas as simulações.
+    
+    As simulações bem-sucedidas são divididas em lotes de sim_ids e
+    distribuídas em um pool de processos. Se output_path for informado,
+    cada lote é anexado ao CSV assim que fica pronto (em ordem de chegada).
+    
+    Args:
+        sim_results_df: DataFrame com status das simulações
+        base_output_dir: Diretório base dos outputs
+        max_workers: Processos paralelos (1 = extração no processo atual)
+        output_path: CSV de saída escrito incrementalmente (opcional)
+        chunk_size: Simulações por lote (padrão: ~4 lotes por worker)
+        read_chunksize: Lê cada eplusout.csv em blocos desse número de linhas
+            (memória constante por worker; None = arquivo inteiro)
+        backend: 'csv' (eplusout.csv/cache colunar), 'sql' (eplusout.sql) ou
+            'eso' (eplusout.eso)
+        screening: Modo de triagem das simulações (None = ano completo)
+    
+    Returns:
+        DataFrame com variáveis dependentes de cada simulação (ordenado por sim_id)
+    """
+    print("\nExtraindo resultados das simulações...")
+    
+    sim_ids = [int(sim_id) for sim_id in sim_results_df['sim_id']]
+    ok_ids = [sim_id for sim_id, ok in zip(sim_ids, sim_results_df['success']) if ok]
+    ok_set = set(ok_ids)
+    failed_ids = [sim_id for sim_id in sim_ids if sim_id not in ok_set]
+    
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(ok_ids) // (max(1, max_workers) * 4)))
+    chunks = [ok_ids[i:i + chunk_size] for i in range(0, len(ok_ids), chunk_size)]
+    
+    writer = _ResultWriter(output_path)
+    emit = writer.emit
+    
+    try:
+        # Simulações que falharam - valores NaN
+        if failed_ids:
+            emit([_failed_result(sim_id) for sim_id in failed_ids])
+        
+        with tqdm(total=len(ok_ids), desc="Extração") as pbar:
+            if max_workers <= 1:
+                for chunk in chunks:
+                    emit(_extract_chunk(base_output_dir, chunk, read_chunksize, backend,
+                                        screening))
+                    pbar.update(len(chunk))
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(_extract_chunk, str(base_output_dir), chunk,
+                                        read_chunksize, backend, screening): chunk
+                        for chunk in chunks
+                    }
+                    for future in as_completed(futures):
+                        chunk = futures[future]
+                        try:
+                            rows = future.result()
+                        except Exception as e:
+                            print(f"✗ Erro ao extrair lote {chunk[0]}-{chunk[-1]}: {e}")
+                            rows = [_failed_result(sim_id) for sim_id in chunk]
+                        emit(rows)
+                        pbar.update(len(chunk))
+    finally:
+        writer.close()
+    
+    results_df = writer.results()
     
     # Estatísticas
     n_valid = results_df['success'].sum()
@@ -492,6 +348,95 @@ def extract_all_results(sim_results_df: pd.DataFrame, base_output_dir: str) -> p
     return results_df
 
 
+class ExtractionStage:
+    """
+    Etapa de extração do pipeline: extrai cada simulação assim que ela termina.
+    
+    As simulações chegam por submit() (normalmente o on_result de
+    SimulationRunner.run_batch) e são extraídas em um pool de processos, como
+    em extract_all_results (parse do CSV em vários núcleos). O número de
+    simulações aguardando extração é limitado: ao atingir o limite, o
+    submit() bloqueia até os workers alcançarem as simulações. O pool usa
+    spawn: o processo principal já tem as threads do despachante (fork seria
+    inseguro).
+    """
+    
+    def __init__(self, base_output_dir: str, output_path: Optional[str] = None,
+                 max_workers: int = 1, read_chunksize: Optional[int] = None,
+                 backend: str = 'csv', max_pending: Optional[int] = None,
+                 screening: Optional[str] = None):
+        """
+        Args:
+            base_output_dir: Diretório base dos outputs
+            output_path: CSV de saída escrito incrementalmente (opcional)
+            max_workers: Processos de extração (1 = uma thread no processo atual)
+            read_chunksize: Linhas por bloco na leitura em streaming (None = arquivo inteiro)
+            backend: Fonte dos outputs ('csv', 'sql' ou 'eso')
+            max_pending: Simulações aguardando extração além das em andamento
+                (padrão: 2 por worker)
+            screening: Modo de triagem das simulações (None = ano completo)
+        """
+        self.base_output_dir = str(base_output_dir)
+        self.read_chunksize = read_chunksize
+        self.backend = backend
+        self.screening = screening
+        max_workers = max(1, max_workers)
+        
+        self._slots = threading.BoundedSemaphore(max_workers + (max_pending or 2 * max_workers))
+        self._writer = _ResultWriter(output_path)
+        self._lock = threading.Lock()
+        if max_workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='extraction')
+    
+    def submit(self, sim_id: int, success: bool):
+        """Envia uma simulação concluída para extração (falhas geram linha com NaN)."""
+        sim_id = int(sim_id)
+        if not success:
+            self._emit([_failed_result(sim_id)])
+            return
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_extract_chunk, self.base_output_dir, [sim_id],
+                                           self.read_chunksize, self.backend, self.screening)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._done(sim_id, f))
+    
+    def _done(self, sim_id: int, future: Future):
+        try:
+            rows = future.result()
+        except Exception as e:
+            print(f"✗ Erro ao extrair resultados de sim_{sim_id}: {e}")
+            rows = [_failed_result(sim_id)]
+        try:
+            self._emit(rows)
+        finally:
+            self._slots.release()
+    
+    def _emit(self, rows: List[Dict]):
+        with self._lock:
+            self._writer.emit(rows)
+    
+    def close(self) -> pd.DataFrame:
+        """
+        Aguarda a extração das simulações pendentes.
+        
+        Returns:
+            DataFrame com variáveis dependentes de cada simulação (ordenado por sim_id)
+        """
+        self._executor.shutdown(wait=True)
+        self._writer.close()
+        
+        results_df = self._writer.results()
+        n_valid = results_df['success'].sum()
+        print(f"\n✓ Resultados extraídos: {n_valid}/{len(results_df)} simulações válidas")
+        return results_df
+
+
 def merge_inputs_outputs(samples_df: pd.DataFrame, results_df: pd.DataFrame) -> pd.DataFrame:
     """
     Combina inputs (amostras LHS) e outputs (resultados).
@@ -0,0 +1,148 @@
+"""
+Modo de triagem (screening): simulações com período reduzido.
+
+Uma primeira rodada do LHS com semanas ou meses representativos (ou apenas
+os dias de projeto) custa uma fração da simulação anual. As métricas
+extensivas de DEPENDENT_VARIABLES (sum, count_above_threshold) são
+extrapoladas para o ano; médias e máximos são mantidos. Os dias de projeto
+(condições extremas) servem apenas para ranquear as amostras e não são
+extrapolados. Em seguida, um
+subconjunto escolhido (extremos ou amostra de validação) é simulado com o
+ano completo para conferir a extrapolação.
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from .aggregation import output_names
+from .config import (BASE_IDF_PATH, DEPENDENT_VARIABLES, SCREENING_PERIODS, SCREENING_KPI,
+                     RANDOM_SEED, TIMESTEPS_PER_HOUR)
+from .idf_index import IDFIndex
+
+
+# Ano de referência do RunPeriod do IDF base (1º de janeiro numa terça-feira)
+REFERENCE_YEAR = 2019
+EXTENSIVE_AGGREGATIONS = ('sum', 'count_above_threshold')
+
+
+def _period(mode: str) -> Dict:
+    if mode not in SCREENING_PERIODS:
+        raise ValueError(f"Modo de triagem não suportado: {mode}")
+    return SCREENING_PERIODS[mode]
+
+
+def run_periods(mode: str) -> List[Dict]:
+    """
+    RunPeriods do modo de triagem (vazio para dias de projeto).
+
+    Returns:
+        Lista de {name, begin_month, begin_day, end_month, end_day, start_weekday}
+    """
+    periods = []
+    for i, (bm, bd, em, ed) in enumerate(_period(mode).get('periods', []), start=1):
+        periods.append({
+            'name': f"Triagem_{mode}_{i}",
+            'begin_month': bm, 'begin_day': bd,
+            'end_month': em, 'end_day': ed,
+            'start_weekday': date(REFERENCE_YEAR, bm, bd).strftime('%A'),
+        })
+    return periods
+
+
+@lru_cache(maxsize=None)
+def design_days(idf_path: str) -> int:
+    """Número de SizingPeriod:DesignDay do IDF (o IDFModifier não os altera)."""
+    return len(IDFIndex.load(idf_path).idfobjects['SIZINGPERIOD:DESIGNDAY'])
+
+
+def simulated_days(mode: str, idf_path: str = BASE_IDF_PATH) -> int:
+    """Número de dias simulados no modo de triagem (dias de projeto contados em idf_path)."""
+    spec = _period(mode)
+    if spec.get('design_days'):
+        return design_days(str(idf_path))
+    return sum((date(REFERENCE_YEAR, em, ed) - date(REFERENCE_YEAR, bm, bd)).days + 1
+               for bm, bd, em, ed in spec['periods'])
+
+
+def expected_rows(mode: str) -> int:
+    """Registros por timestep esperados nos outputs de uma simulação de triagem."""
+    return simulated_days(mode) * 24 * TIMESTEPS_PER_HOUR
+
+
+def extrapolation_factor(mode: str) -> float:
+    """Fator de extrapolação das métricas extensivas para o ano."""
+    return 365.0 / simulated_days(mode)
+
+
+def extrapolate(metrics: Dict[str, float], mode: Optional[str]) -> Dict[str, float]:
+    """
+    Extrapola para o ano as métricas extensivas de uma simulação de triagem.
+
+    Com dias de projeto (apenas ranqueamento), as métricas ficam como estão.
+    """
+    if mode is None or _period(mode).get('design_days'):
+        return metrics
+    factor = extrapolation_factor(mode)
+    return {name: (value * factor
+                   if DEPENDENT_VARIABLES.get(name, {}).get('aggregation')
+                   in EXTENSIVE_AGGREGATIONS else value)
+            for name, value in metrics.items()}
+
+
+def select_full_year(results_df: pd.DataFrame, n: int, method: str = 'extremes',
+                     kpi: str = SCREENING_KPI) -> List[int]:
+    """
+    Escolhe as simulações que serão refeitas com o ano completo.
+
+    Args:
+        results_df: Resultados da triagem (sim_id, métricas, success)
+        n: Número de simulações
+        method: 'extremes' (n/2 menores e n/2 maiores valores de kpi) ou
+            'random' (amostra aleatória de validação)
+        kpi: Métrica usada para os extremos
+
+    Returns:
+        Lista de sim_ids, ordenada
+    """
+    valid = results_df[results_df['success'].astype(bool)]
+    if method == 'extremes':
+        ranked = valid.dropna(subset=[kpi]).sort_values(kpi)['sim_id'].astype(int).tolist()
+        low, high = n // 2, n - n // 2
+        chosen = ranked[:low] + ranked[max(low, len(ranked) - high):]
+    elif method == 'random':
+        ids = valid['sim_id'].astype(int).to_numpy()
+        rng = np.random.default_rng(RANDOM_SEED)
+        chosen = rng.choice(ids, size=min(n, len(ids)), replace=False).tolist()
+    else:
+        raise ValueError(f"Seleção não suportada: {method}")
+    return sorted(set(int(i) for i in chosen))
+
+
+def compare_with_full_year(screening_df: pd.DataFrame, full_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compara métricas extrapoladas da triagem com as do ano completo.
+
+    Returns:
+        DataFrame por métrica com erro relativo médio e máximo e correlação
+        de postos (Spearman) entre triagem e ano completo
+    """
+    merged = pd.merge(screening_df, full_df, on='sim_id', suffixes=('_triagem', '_anual'))
+    merged = merged[merged['success_triagem'].astype(bool) & merged['success_anual'].astype(bool)]
+
+    rows = []
+    for name in output_names():
+        if name not in screening_df or name not in full_df:
+            continue
+        screen, full = merged[f"{name}_triagem"], merged[f"{name}_anual"]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rel = ((screen - full).abs() / full.abs()).replace(np.inf, np.nan)
+        rows.append({
+            'variavel': name,
+            'n': int(full.notna().sum()),
+            'erro_relativo_medio': rel.mean(),
+            'erro_relativo_max': rel.max(),
+            'spearman': screen.corr(full, method='spearman') if len(merged) > 2 else np.nan,
+        })
+    return pd.DataFrame(rows)
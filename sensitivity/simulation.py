@@ -4,25 +4,199 @@ Executor de simulações EnergyPlus em lote para análise de sensibilidade.
 Gerencia múltiplas simulações com controle de erros e progresso.
 """
 
+import gzip
+import multiprocessing
+import os
+import signal
+import sys
 import subprocess
 import shutil
+import tempfile
+import queue
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Union
 import pandas as pd
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import (Future, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+                                FIRST_COMPLETED)
 from tqdm import tqdm
+from .ledger import RunLedger
+from .result_cache import ResultCache
+from .stragglers import RuntimeStats
+from .resources import AdaptiveConcurrency, CorePinner, process_rss
+from .manifest import METRICS_NAME, read_metrics, write_metrics
+from .output_cache import CSV_NAME
+from .sqlite_backend import SQL_NAME
+from .eso_backend import ESO_NAME
+from .results import ResultsExtractor
+from .screening import expected_rows
+from .api_backend import ApiWorkerPool, api_available
+from .synthetic import SYNTHETIC_ENERGYPLUS
+
+
+# Arquivos mantidos por padrão ao simular em diretório temporário (scratch).
+# Nomes terminados em '.gz' são comprimidos a partir do arquivo sem '.gz';
+# padrões glob são aceitos.
+DEFAULT_KEEP = ('eplusout.err', METRICS_NAME, CSV_NAME + '.gz')
+
+
+def _popen_group_kwargs() -> Dict:
+    """Argumentos do Popen para iniciar o EnergyPlus em um grupo de processos próprio."""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def _kill_process_group(proc: subprocess.Popen):
+    """Encerra o EnergyPlus e todos os processos filhos (ex.: ExpandObjects)."""
+    try:
+        if os.name == 'nt':
+            if proc.poll() is None:
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)],
+                               capture_output=True)
+        else:
+            # O grupo pode sobreviver ao processo principal (filhos órfãos)
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, OSError):
+        pass
 
 
 class SimulationRunner:
-    """Executa simulações EnergyPlus em paralelo."""
+    """
+    Executa simulações EnergyPlus em paralelo.
+    
+    Cada simulação é um subprocesso do EnergyPlus acompanhado por uma thread
+    leve (sem um interpretador Python por worker). O número de simulações
+    simultâneas pode ser alterado durante o lote com set_concurrency() ou,
+    no modo adaptativo, ajustado automaticamente pela carga da máquina.
     
-    def __init__(self, energyplus_path: Optional[str] = None, weather_file: str = None):
+    Em run_batch, o timeout passa a ser derivado dos tempos observados (ver
+    stragglers.py); simulações lentas são sinalizadas e, no modo
+    especulativo, duplicadas em um worker ocioso.
+    
+    Com engine='api', o EnergyPlus roda dentro de processos Python de longa
+    duração via pyenergyplus (ver api_backend.py) e as métricas são
+    calculadas em memória; o executável (engine='cli') continua como
+    alternativa quando a API não está disponível.
+    """
+    
+    # Intervalo (s) em que o despachante reavalia o limite de concorrência
+    DISPATCH_INTERVAL = 0.5
+    # Teto do limite de concorrência (threads do pool são criadas sob demanda)
+    MAX_CONCURRENCY = 256
+    # Intervalo (s) entre ajustes do modo adaptativo
+    ADAPT_INTERVAL = 2.0
+    
+    def __init__(self, energyplus_path: Optional[str] = None, weather_file: str = None,
+                 timeout: float = 300, adaptive: bool = False, pin_cpus: bool = False,
+                 scratch_dir: Optional[str] = None, keep: Sequence[str] = DEFAULT_KEEP,
+                 cache: Optional[ResultCache] = None, speculative: bool = False,
+                 engine: str = 'cli', screening: Optional[str] = None):
+        """
+        Args:
+            energyplus_path: Executável do EnergyPlus (None = procura nos locais
+                comuns; 'synthetic' = EnergyPlus sintético, ver synthetic.py)
+            weather_file: Arquivo climático EPW
+            timeout: Tempo máximo (s) por simulação (teto do timeout derivado
+                dos tempos observados em run_batch)
+            adaptive: Ajusta a concorrência por núcleos ociosos, memória livre
+                e RSS observada por simulação (max_workers vira o teto)
+            pin_cpus: Fixa cada EnergyPlus em um núcleo (os.sched_setaffinity;
+                ignorado onde não há suporte)
+            scratch_dir: Se informado (ex.: /dev/shm), cada simulação roda em um
+                diretório temporário dentro dele e apenas os arquivos de keep
+                são gravados no diretório de saída
+            keep: Arquivos mantidos ao usar scratch_dir (ver DEFAULT_KEEP)
+            cache: Cache de resultados (ver result_cache.py); acertos dispensam
+                o EnergyPlus e restauram apenas os arquivos guardados no cache
+            speculative: Em run_batch, duplica stragglers em workers ociosos e
+                fica com a cópia que terminar primeiro
+            engine: 'cli' (executável em subprocesso) ou 'api' (pyenergyplus
+                em processos worker; sem cópias especulativas nem timeout
+                derivado, apenas o teto timeout)
+            screening: Modo de triagem dos IDFs (ver screening.py); o número de
+                registros é conferido antes de gravar o metrics.json
+        """
         self.energyplus_path = self._find_energyplus(energyplus_path)
         self.weather_file = weather_file
+        self.timeout = timeout
+        self.adaptive = adaptive
+        self.scratch_dir = Path(scratch_dir) if scratch_dir else None
+        self.keep = tuple(keep)
+        self.cache = cache
+        self.speculative = speculative
+        self.screening = screening
+        self._version = None
+        if engine not in ('cli', 'api'):
+            raise ValueError(f"Engine não suportado: {engine}")
+        if engine == 'api' and not api_available(self.energyplus_path):
+            print("⚠ pyenergyplus não encontrado na instalação do EnergyPlus; "
+                  "usando o executável (engine='cli')")
+            engine = 'cli'
+        if engine == 'api' and speculative:
+            print("⚠ Cópias especulativas não são suportadas com engine='api'; desativadas")
+            self.speculative = False
+        self.engine = engine
+        self._api_pool: Optional[ApiWorkerPool] = None
+        if self.scratch_dir is not None and not self.scratch_dir.is_dir():
+            raise FileNotFoundError(f"Diretório temporário não encontrado: {scratch_dir}")
+        self._pinner = CorePinner() if pin_cpus and CorePinner.supported() else None
+        
+        self._concurrency = 1
+        self._processes: Dict[int, subprocess.Popen] = {}
+        self._runs: Dict[str, subprocess.Popen] = {}
+        self._aborted: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+    
+    @property
+    def concurrency(self) -> int:
+        """Número máximo atual de simulações simultâneas."""
+        return self._concurrency
+    
+    def set_concurrency(self, n: int):
+        """
+        Altera o número de simulações simultâneas (pode ser chamado durante o lote).
+        
+        Reduzir o limite não interrompe simulações em andamento; novas
+        simulações só são iniciadas quando houver vaga.
+        """
+        self._concurrency = max(1, min(int(n), self.MAX_CONCURRENCY))
+    
+    def cancel(self):
+        """Cancela o lote: não inicia novas simulações e encerra as em andamento."""
+        self._cancelled.set()
+        with self._lock:
+            processes = list(self._processes.values())
+            api_pool = self._api_pool
+        for proc in processes:
+            _kill_process_group(proc)
+        if api_pool is not None:
+            api_pool.cancel()
+    
+    def close(self):
+        """Encerra os processos worker da API (engine='api')."""
+        with self._lock:
+            api_pool, self._api_pool = self._api_pool, None
+        if api_pool is not None:
+            api_pool.shutdown()
+    
+    def _abort(self, output_dir: str, reason: str):
+        """Encerra uma simulação específica; ela retorna falha com reason como erro."""
+        with self._lock:
+            self._aborted[output_dir] = reason
+            proc = self._runs.get(output_dir)
+        if proc is not None:
+            _kill_process_group(proc)
     
     def _find_energyplus(self, custom_path: Optional[str]) -> str:
         """Localiza executável do EnergyPlus."""
+        if custom_path == SYNTHETIC_ENERGYPLUS:
+            return custom_path
+        
         if custom_path and Path(custom_path).exists():
             return custom_path
         
@@ -42,11 +216,36 @@ class SimulationRunner:
             "EnergyPlus não encontrado. Especifique o caminho manualmente."
         )
     
+    def _command(self) -> List[str]:
+        """Início da linha de comando do EnergyPlus (executável ou script sintético)."""
+        if self.energyplus_path == SYNTHETIC_ENERGYPLUS:
+            return [sys.executable, str(Path(__file__).with_name('synthetic.py'))]
+        return [str(self.energyplus_path)]
+    
+    def energyplus_version(self) -> str:
+        """Versão do EnergyPlus (saída de --version; executada uma vez)."""
+        if self._version is None:
+            try:
+                out = subprocess.run(self._command() + ['--version'],
+                                     capture_output=True, text=True, timeout=30)
+                version = out.stdout.strip()
+            except (OSError, subprocess.SubprocessError):
+                version = ''
+            if not version:
+                # Sem --version: identifica o executável por caminho, tamanho e mtime
+                stat = Path(self.energyplus_path).stat()
+                version = f"{Path(self.energyplus_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+            self._version = version
+        return self._version
+    
     def run_simulation(self, idf_path: str, output_dir: str, 
                       weather_file: Optional[str] = None) -> Dict:
         """
         Executa uma simulação EnergyPlus.
         
+        Com cache, um IDF já simulado (mesmo conteúdo, EPW e versão do
+        EnergyPlus) é servido do cache sem executar o EnergyPlus.
+        
         Args:
             idf_path: Caminho do arquivo IDF
             output_dir: Diretório de saída
@@ -82,41 +281,178 @@ class SimulationRunner:
                 'error': f'Arquivo climático não encontrado: {weather}'
             }
         
+        if self._cancelled.is_set():
+            return {
+                'success': False,
+                'output_dir': str(output_dir),
+                'error': 'Cancelada'
+            }
+        
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(idf_path, weather, self.energyplus_version())
+            if self.cache.fetch(key, output_dir):
+                return {
+                    'success': True,
+                    'output_dir': str(output_dir),
+                    'err_file': str(output_dir / "eplusout.err"),
+                    'returncode': 0,
+                    'stdout': '',
+                    'stderr': '',
+                    'cached': True,
+                }
+        
+        if self.engine == 'api':
+            result = self._run_api(idf_path, output_dir, weather)
+        else:
+            result = self._run_energyplus(idf_path, output_dir, weather)
+        if key is not None and result['success']:
+            try:
+                # Só métricas completas vão para o cache: um acerto nunca é re-extraído
+                metrics = read_metrics(output_dir, screening=self.screening)
+                if metrics is None:
+                    metrics = self._extract_metrics(output_dir)
+                    write_metrics(output_dir, metrics, screening=self.screening)
+                missing = [name for name, value in metrics.items() if value != value]
+                if missing:
+                    raise ValueError(f"métricas sem valor: {', '.join(missing)}")
+                self.cache.store(key, output_dir)
+            except Exception as e:
+                print(f"⚠ Aviso ao gravar {output_dir.name} no cache: {e}")
+        return result
+    
+    def _run_energyplus(self, idf_path: Path, output_dir: Path, weather: str) -> Dict:
+        """Executa o EnergyPlus (cancelável, com timeout) e verifica o .err."""
+        # Com scratch_dir, o EnergyPlus escreve em um diretório temporário
+        # (ex.: tmpfs) e só o allow-list vai para o diretório de saída
+        run_dir = output_dir
+        if self.scratch_dir is not None:
+            run_dir = Path(tempfile.mkdtemp(prefix=f"{output_dir.name}_", dir=self.scratch_dir))
+        
         # Comando EnergyPlus
-        cmd = [
-            str(self.energyplus_path),
+        cmd = self._command() + [
             "-w", str(weather),
-            "-d", str(output_dir),
+            "-d", str(run_dir),
             str(idf_path)
         ]
         
-        # Executa simulação
+        # Executa simulação em um grupo de processos próprio: timeout e
+        # cancelamento encerram o EnergyPlus e seus subprocessos
+        success = False
         try:
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=300  # 5 minutos timeout
+                **_popen_group_kwargs()
             )
+            with self._lock:
+                self._processes[proc.pid] = proc
+                self._runs[str(output_dir)] = proc
+                aborted = str(output_dir) in self._aborted
+            if aborted:
+                _kill_process_group(proc)  # _abort() chamado antes do Popen
+            core = self._pinner.pin(proc.pid) if self._pinner is not None else None
+            
+            try:
+                stdout, stderr = proc.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                _kill_process_group(proc)
+                proc.communicate()
+                return {
+                    'success': False,
+                    'output_dir': str(output_dir),
+                    'error': f'Timeout - simulação excedeu {self.timeout / 60:g} minutos'
+                }
+            finally:
+                with self._lock:
+                    self._processes.pop(proc.pid, None)
+                    self._runs.pop(str(output_dir), None)
+                if self._pinner is not None:
+                    self._pinner.release(core)
+            
+            if self._cancelled.is_set():
+                return {
+                    'success': False,
+                    'output_dir': str(output_dir),
+                    'error': 'Cancelada'
+                }
+            
+            with self._lock:
+                reason = self._aborted.get(str(output_dir))
+            if reason is not None:
+                return {
+                    'success': False,
+                    'output_dir': str(output_dir),
+                    'error': reason
+                }
             
             # Verifica se simulação foi bem-sucedida
+            success = self._check_simulation_success(run_dir / "eplusout.err")
             err_file = output_dir / "eplusout.err"
-            success = self._check_simulation_success(err_file)
             
             return {
                 'success': success,
                 'output_dir': str(output_dir),
                 'err_file': str(err_file),
-                'returncode': result.returncode,
-                'stdout': result.stdout[:1000] if not success else '',  # Limita log
-                'stderr': result.stderr[:1000] if not success else '',
+                'returncode': proc.returncode,
+                'stdout': stdout[:1000] if not success else '',  # Limita log
+                'stderr': stderr[:1000] if not success else '',
             }
         
-        except subprocess.TimeoutExpired:
+        except Exception as e:
             return {
                 'success': False,
                 'output_dir': str(output_dir),
-                'error': 'Timeout - simulação excedeu 5 minutos'
+                'error': str(e)
+            }
+        
+        finally:
+            if run_dir != output_dir:
+                self.retain_outputs(run_dir, output_dir, success)
+                shutil.rmtree(run_dir, ignore_errors=True)
+    
+    def _run_api(self, idf_path: Path, output_dir: Path, weather: str) -> Dict:
+        """Executa o EnergyPlus em um worker da API e grava o metrics.json calculado em memória."""
+        run_dir = output_dir
+        if self.scratch_dir is not None:
+            run_dir = Path(tempfile.mkdtemp(prefix=f"{output_dir.name}_", dir=self.scratch_dir))
+        
+        success = False
+        try:
+            with self._lock:
+                if self._api_pool is None:
+                    self._api_pool = ApiWorkerPool(self.energyplus_path, self.MAX_CONCURRENCY)
+                api_pool = self._api_pool
+            run = api_pool.run(idf_path, weather, run_dir, self.timeout)
+            
+            if self._cancelled.is_set() or run['error'] is not None:
+                return {
+                    'success': False,
+                    'output_dir': str(output_dir),
+                    'error': 'Cancelada' if self._cancelled.is_set() else run['error']
+                }
+            
+            success = run['returncode'] == 0 and \
+                self._check_simulation_success(run_dir / "eplusout.err")
+            rows = expected_rows(self.screening) if self.screening else None
+            if success and run['metrics'] is not None:
+                if rows is not None and run['rows'] != rows:
+                    # Sem metrics.json: a extração dos outputs acusa o erro
+                    print(f"⚠ {output_dir.name}: {run['rows']} registros por timestep; "
+                          f"esperados {rows} (modo de triagem '{self.screening}')")
+                else:
+                    # Métricas do período simulado, como as extraídas do CSV
+                    write_metrics(run_dir, run['metrics'], screening=self.screening)
+            
+            return {
+                'success': success,
+                'output_dir': str(output_dir),
+                'err_file': str(output_dir / "eplusout.err"),
+                'returncode': run['returncode'],
+                'stdout': '',
+                'stderr': '',
             }
         
         except Exception as e:
@@ -125,6 +461,66 @@ class SimulationRunner:
                 'output_dir': str(output_dir),
                 'error': str(e)
             }
+        
+        finally:
+            if run_dir != output_dir:
+                self.retain_outputs(run_dir, output_dir, success)
+                shutil.rmtree(run_dir, ignore_errors=True)
+    
+    def retain_outputs(self, run_dir: Path, output_dir: Path, success: bool):
+        """
+        Copia o allow-list (self.keep) do diretório temporário para o de saída.
+        
+        metrics.json é gerado extraindo as variáveis dependentes ainda no
+        diretório temporário (apenas para simulações bem-sucedidas); se o
+        run_dir já tem um metrics.json válido (engine='api', calculado em
+        memória), ele é copiado sem reler os outputs. Usado também pelos
+        workers da fila (job_queue.py) para montar o resultado devolvido.
+        """
+        try:
+            for pattern in self.keep:
+                if pattern == METRICS_NAME:
+                    if success:
+                        try:
+                            if read_metrics(run_dir, screening=self.screening) is not None:
+                                shutil.copyfile(run_dir / METRICS_NAME, output_dir / METRICS_NAME)
+                            else:
+                                write_metrics(output_dir, self._extract_metrics(run_dir),
+                                              source_dir=run_dir, screening=self.screening)
+                        except Exception as e:
+                            # Sem metrics.json; os demais arquivos ainda são copiados
+                            print(f"⚠ Métricas de {output_dir.name} não extraídas: {e}")
+                    continue
+                
+                if pattern.endswith('.gz'):
+                    for src in run_dir.glob(pattern[:-3]):
+                        with open(src, 'rb') as f_in, \
+                                gzip.open(output_dir / (src.name + '.gz'), 'wb',
+                                          compresslevel=6) as f_out:
+                            shutil.copyfileobj(f_in, f_out, 1 << 20)
+                else:
+                    for src in run_dir.glob(pattern):
+                        shutil.copyfile(src, output_dir / src.name)
+        
+        except Exception as e:
+            print(f"⚠ Aviso ao copiar outputs de {output_dir.name}: {e}")
+    
+    def _extract_metrics(self, run_dir: Path) -> Dict[str, float]:
+        """
+        Extrai as variáveis dependentes do primeiro output disponível (CSV, SQL ou ESO).
+        
+        Valores do período simulado (sem extrapolação), com o número de
+        registros conferido para o modo de triagem do runner.
+        
+        Raises:
+            Exception: se os outputs faltam ou a extração falha (nada de NaN
+                no metrics.json de uma simulação bem-sucedida)
+        """
+        for backend, name in (('csv', CSV_NAME), ('sql', SQL_NAME), ('eso', ESO_NAME)):
+            if (run_dir / name).exists():
+                return ResultsExtractor(run_dir, backend=backend,
+                                        screening=self.screening).extract_period(strict=True)
+        return ResultsExtractor(run_dir, screening=self.screening).extract_period(strict=True)
     
     def _check_simulation_success(self, err_file: Path) -> bool:
         """Verifica se simulação foi bem-sucedida analisando arquivo .err."""
@@ -150,68 +546,412 @@ class SimulationRunner:
         
         return False
     
-    def run_batch(self, simulations: List[Dict], max_workers: int = 4) -> pd.DataFrame:
+    def run_batch(self, simulations: Union[List[Dict], queue.Queue], max_workers: int = 4,
+                  ledger: Optional[RunLedger] = None, total: Optional[int] = None,
+                  on_result: Optional[Callable[[Dict], None]] = None,
+                  runtime_stats: Optional[RuntimeStats] = None) -> pd.DataFrame:
         """
         Executa múltiplas simulações em paralelo.
         
+        O despachante (thread principal) inicia uma nova simulação sempre que
+        há vaga sob o limite atual de concorrência (ver set_concurrency()).
+        Ctrl+C cancela o lote de forma limpa: nenhuma simulação nova é
+        iniciada e os EnergyPlus em andamento são encerrados.
+        
+        A duração de cada simulação bem-sucedida alimenta runtime_stats. Com
+        amostras suficientes, simulações acima do limite de straggler são
+        sinalizadas e as acima do timeout derivado são encerradas (o timeout
+        do construtor continua valendo como teto). Com speculative=True, um
+        straggler ganha uma cópia em um worker ocioso (diretório
+        sim_XXXX.spec) e vale a cópia que terminar primeiro com sucesso.
+        
         Args:
-            simulations: Lista de dicts com {sim_id, idf_path, output_dir}
-            max_workers: Número de processos paralelos
+            simulations: Lista de dicts com {sim_id, idf_path, output_dir}, ou
+                fila alimentada por outra etapa (None na fila indica o fim)
+            max_workers: Número inicial de simulações simultâneas (no modo
+                adaptativo, o máximo)
+            ledger: Ledger persistente atualizado a cada simulação concluída (opcional)
+            total: Número esperado de simulações (barra de progresso, quando
+                simulations é uma fila)
+            on_result: Chamado com o resultado de cada simulação concluída
+                (ex.: enviar para a etapa de extração)
+            runtime_stats: Distribuição de tempos (padrão: RuntimeStats() nova)
         
         Returns:
             DataFrame com resultados de todas as simulações
         """
+        if isinstance(simulations, queue.Queue):
+            pending = simulations
+        else:
+            total = len(simulations)
+            pending = queue.Queue()
+            for sim in simulations:
+                pending.put(sim)
+            pending.put(None)
+        
+        stats = runtime_stats if runtime_stats is not None else RuntimeStats()
         results = []
+        running = {}    # future -> (sim_id, diretório de saída da tentativa)
+        attempts = {}   # sim_id -> tentativas em andamento (original e cópia especulativa)
+        exhausted = False
         
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            # Submete todas as simulações
-            futures = {
-                executor.submit(
-                    self.run_simulation,
-                    sim['idf_path'],
-                    sim['output_dir'],
-                    self.weather_file
-                ): sim['sim_id']
-                for sim in simulations
-            }
+        self._cancelled.clear()
+        if self._api_pool is not None:
+            self._api_pool.reset()
+        controller = None
+        if self.adaptive:
+            controller = AdaptiveConcurrency(max_workers)
+            self.set_concurrency(controller.min_workers)
+            last_adjust = time.monotonic()
+        else:
+            self.set_concurrency(max_workers)
+        
+        # Threads são criadas sob demanda; o limite efetivo é self.concurrency
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENCY) as executor, \
+                tqdm(total=total, desc="Simulações") as pbar:
+            
+            def start(sim_id: int, sim: Dict, output_dir: str):
+                future = executor.submit(self.run_simulation, sim['idf_path'],
+                                         output_dir, self.weather_file)
+                running[future] = (sim_id, output_dir)
+                attempts[sim_id]['started'][future] = time.monotonic()
+            
+            def check_stragglers():
+                now = time.monotonic()
+                bound = stats.straggler_bound()
+                limit = stats.timeout(self.timeout)
+                for sim_id, group in attempts.items():
+                    elapsed = now - group['first_start']
+                    if group['timed_out']:
+                        continue
+                    if limit < self.timeout and elapsed > limit:
+                        # O EnergyPlus aplica o teto (self.timeout) por conta própria
+                        group['timed_out'] = True
+                        reason = (f'Timeout - simulação excedeu {limit:.0f} s (derivado '
+                                  f'de {stats.count} simulações)')
+                        for future in group['started']:
+                            self._abort(running[future][1], reason)
+                        continue
+                    if bound is None or elapsed <= bound:
+                        continue
+                    if not group['flagged']:
+                        group['flagged'] = True
+                        pbar.write(f"⚠ sim_{sim_id:04d} lenta: {elapsed:.0f} s "
+                                   f"(limite {bound:.0f} s)")
+                    if self.speculative and group['spec_dir'] is None \
+                            and len(running) < self.concurrency \
+                            and (exhausted or pending.empty()):
+                        group['spec_dir'] = group['sim']['output_dir'] + '.spec'
+                        start(sim_id, group['sim'], group['spec_dir'])
             
-            # Processa resultados conforme completam
-            with tqdm(total=len(simulations), desc="Simulações") as pbar:
-                for future in as_completed(futures):
-                    sim_id = futures[future]
-                    try:
-                        result = future.result()
+            def resolve(sim_id: int, future, result: Dict) -> bool:
+                """Decide o resultado da simulação; False se outra tentativa ainda pode vencer."""
+                group = attempts[sim_id]
+                others = [f for f in group['started'] if f is not future]
+                if not result.get('success') and others:
+                    del group['started'][future]
+                    return False
+                
+                # Descarta as demais tentativas antes de mexer nos diretórios
+                for other in others:
+                    self._abort(running[other][1], 'Cópia descartada (outra tentativa venceu)')
+                wait(others)
+                for other in others:
+                    running.pop(other)
+                
+                if result.get('success') and not result.get('cached'):
+                    stats.observe(time.monotonic() - group['started'][future])
+                
+                output_dir = group['sim']['output_dir']
+                spec_dir = group['spec_dir']
+                if spec_dir is not None:
+                    if result.get('output_dir') == spec_dir:
+                        if result.get('success'):
+                            for src in Path(spec_dir).iterdir():
+                                if src.is_file():
+                                    shutil.copyfile(src, Path(output_dir) / src.name)
+                            result['err_file'] = str(Path(output_dir) / "eplusout.err")
+                            result['speculative'] = True
+                        result['output_dir'] = output_dir
+                    shutil.rmtree(spec_dir, ignore_errors=True)
+                
+                with self._lock:
+                    self._aborted.pop(output_dir, None)
+                    if spec_dir is not None:
+                        self._aborted.pop(spec_dir, None)
+                del attempts[sim_id]
+                return True
+            
+            try:
+                while not exhausted or running:
+                    if self._cancelled.is_set():
+                        exhausted = True  # cancel() chamado por outra thread
+                    
+                    if controller is not None and \
+                            time.monotonic() - last_adjust >= self.ADAPT_INTERVAL:
+                        with self._lock:
+                            pids = list(self._processes)
+                        for pid in pids:
+                            controller.observe_rss(process_rss(pid))
+                        self.set_concurrency(controller.target(len(running), self.concurrency))
+                        pbar.set_postfix(workers=self.concurrency)
+                        last_adjust = time.monotonic()
+                    
+                    check_stragglers()
+                    
+                    while not exhausted and len(running) < self.concurrency:
+                        # Sem simulações em andamento, aguarda a próxima da fila
+                        try:
+                            sim = pending.get(timeout=self.DISPATCH_INTERVAL) \
+                                if not running else pending.get_nowait()
+                        except queue.Empty:
+                            break
+                        if sim is None:
+                            exhausted = True
+                            break
+                        sim_id = sim['sim_id']
+                        attempts[sim_id] = {'sim': sim, 'started': {},
+                                            'first_start': time.monotonic(),
+                                            'flagged': False, 'timed_out': False,
+                                            'spec_dir': None}
+                        start(sim_id, sim, sim['output_dir'])
+                    
+                    if not running:
+                        continue
+                    done, _ = wait(running, timeout=self.DISPATCH_INTERVAL,
+                                   return_when=FIRST_COMPLETED)
+                    
+                    # Processa resultados conforme completam
+                    for future in done:
+                        if future not in running:
+                            continue  # Tentativa descartada ao resolver outra
+                        sim_id = running.pop(future)[0]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {'success': False, 'error': str(e)}
+                        if not resolve(sim_id, future, result):
+                            continue
                         result['sim_id'] = sim_id
                         results.append(result)
-                    except Exception as e:
-                        results.append({
-                            'sim_id': sim_id,
-                            'success': False,
-                            'error': str(e)
-                        })
-                    pbar.update(1)
+                        # Simulações canceladas não entram no ledger (serão refeitas no --resume)
+                        if ledger is not None and results[-1].get('error') != 'Cancelada':
+                            ledger.record(results[-1])
+                        if on_result is not None:
+                            on_result(results[-1])
+                        pbar.update(1)
+            
+            except KeyboardInterrupt:
+                print("\n⚠ Interrompido: cancelando simulações em andamento...")
+                self.cancel()
+                wait(running)
+                raise
         
         return pd.DataFrame(results)
 
 
+def _idf_executor(idf_workers: int) -> ProcessPoolExecutor:
+    """
+    Pool de processos para criar IDFs.
+    
+    spawn: o processo principal já tem as threads do despachante (fork seria
+    inseguro). Cada worker interpreta o IDD (do cache em pickle) e o IDF base
+    uma vez e os reaproveita em todas as amostras (ver idf_modifier.py).
+    """
+    return ProcessPoolExecutor(max_workers=idf_workers,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def _produce_simulations(samples_df: pd.DataFrame, base_idf: str, output_base_dir: str,
+                         backend: str, resume: bool, done_ids: set,
+                         pending: queue.Queue, stop: threading.Event, stats: Dict,
+                         screening: Optional[str] = None, idf_workers: int = 1,
+                         prebuilt: Optional[Dict[int, str]] = None):
+    """
+    Etapa de geração de IDFs do pipeline (executada em uma thread).
+    
+    Cria o IDF de cada amostra e o coloca na fila limitada lida por
+    SimulationRunner.run_batch; None na fila indica o fim. IDs cujo IDF não
+    foi criado são acumulados em stats['failed_idf_creation'].
+    
+    Com idf_workers > 1, os IDFs são criados em um pool de processos, com até
+    2 por worker em andamento; a ordem de entrega das amostras é mantida.
+    Com prebuilt ({sim_id: caminho}), os IDFs já existem (IDF paramétrico
+    expandido) e só são entregues.
+    """
+    from .idf_modifier import create_simulation_idf
+    
+    def put(item) -> bool:
+        # Fila cheia: espera vaga, desistindo se o lote for cancelado
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=SimulationRunner.DISPATCH_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def create(sim_id: int, params: Dict[str, float]):
+        """Caminho do IDF, Future (pool) ou a exceção da criação."""
+        existing_idf = Path(output_base_dir) / f"sim_{sim_id:04d}" / "model.idf"
+        if resume and existing_idf.exists():
+            stats['reused_idfs'] += 1
+            return str(existing_idf)
+        if prebuilt is not None:
+            if sim_id in prebuilt:
+                return prebuilt[sim_id]
+            return RuntimeError("run ausente na expansão do IDF paramétrico")
+        if executor is not None:
+            return executor.submit(create_simulation_idf, sim_id, params, base_idf,
+                                   output_base_dir, backend=backend, screening=screening)
+        try:
+            return create_simulation_idf(sim_id, params, base_idf, output_base_dir,
+                                         backend=backend, screening=screening)
+        except Exception as e:
+            return e
+    
+    def deliver(sim_id: int, idf_path) -> bool:
+        if isinstance(idf_path, Future):
+            try:
+                idf_path = idf_path.result()
+            except Exception as e:
+                idf_path = e
+        if isinstance(idf_path, Exception):
+            stats['failed_idf_creation'].append(sim_id)
+            print(f"✗ Erro ao criar IDF {sim_id}: {idf_path}")
+            return True
+        if not Path(idf_path).exists():
+            stats['failed_idf_creation'].append(sim_id)
+            print(f"✗ IDF {sim_id} não foi criado")
+            return True
+        
+        if not put({'sim_id': sim_id, 'idf_path': idf_path,
+                    'output_dir': str(Path(output_base_dir) / f"sim_{sim_id:04d}")}):
+            return False
+        stats['created'] += 1
+        return True
+    
+    # Parâmetros de todas as amostras de uma vez (sem iterrows)
+    param_names = [c for c in samples_df.columns if c != 'sim_id']
+    sim_ids = samples_df['sim_id'].astype(int).tolist()
+    values = samples_df[param_names].to_numpy().tolist()
+    
+    executor = _idf_executor(idf_workers) if idf_workers > 1 else None
+    window = 2 * idf_workers if executor is not None else 1
+    in_flight = deque()
+    try:
+        for sim_id, row in zip(sim_ids, values):
+            if sim_id in done_ids:
+                continue
+            in_flight.append((sim_id, create(sim_id, dict(zip(param_names, row)))))
+            while len(in_flight) >= window:
+                if not deliver(*in_flight.popleft()):
+                    return
+        while in_flight:
+            if not deliver(*in_flight.popleft()):
+                return
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        put(None)
+
+
+def _expand_parametric(samples_df: pd.DataFrame, base_idf: str, output_base_dir: str,
+                       backend: str, screening: Optional[str], resume: bool,
+                       done_ids: set, energyplus_path: str) -> Dict[int, str]:
+    """
+    Cria o IDF paramétrico das amostras pendentes e o expande (ver parametric.py).
+    
+    Returns:
+        {sim_id: caminho do model.idf}; vazio se a geração falhar
+    """
+    from .parametric import (PARAMETRIC_NAME, create_parametric_idf, expand_parametric_idf,
+                             find_parametric_preprocessor)
+    
+    # Amostras sem IDF: nem concluídas nem, ao retomar, com model.idf existente
+    todo = samples_df[[
+        i not in done_ids
+        and not (resume and (Path(output_base_dir) / f"sim_{i:04d}" / "model.idf").exists())
+        for i in samples_df['sim_id'].astype(int)]]
+    if todo.empty:
+        return {}
+    
+    parametric_idf = Path(output_base_dir) / PARAMETRIC_NAME
+    try:
+        create_parametric_idf(todo, base_idf, str(parametric_idf), backend=backend,
+                              screening=screening)
+        idfs = expand_parametric_idf(str(parametric_idf), output_base_dir,
+                                     find_parametric_preprocessor(energyplus_path),
+                                     expected_runs=len(todo))
+    except Exception as e:
+        print(f"✗ Erro ao gerar o IDF paramétrico: {e}")
+        return {}
+    print(f"✓ IDF paramétrico: {parametric_idf} ({len(idfs)} runs)")
+    return idfs
+
+
 def run_sensitivity_simulations(samples_df: pd.DataFrame, base_idf: str, 
                                 output_base_dir: str, weather_file: str,
-                                max_workers: int = 4) -> pd.DataFrame:
+                                max_workers: int = 4, backend: str = 'csv',
+                                ledger_path: Optional[str] = None,
+                                resume: bool = False, adaptive: bool = False,
+                                pin_cpus: bool = False, scratch_dir: Optional[str] = None,
+                                keep: Sequence[str] = DEFAULT_KEEP,
+                                cache: Optional[ResultCache] = None,
+                                timeout: float = 300, speculative: bool = False,
+                                screening: Optional[str] = None,
+                                on_result: Optional[Callable[[Dict], None]] = None,
+                                lookahead: Optional[int] = None,
+                                engine: str = 'cli',
+                                energyplus_path: Optional[str] = None,
+                                idf_workers: int = 1,
+                                parametric: bool = False) -> pd.DataFrame:
     """
     Executa todas as simulações da análise de sensibilidade.
     
+    A criação dos IDFs e as simulações formam um pipeline: uma thread gera
+    os IDFs à frente das simulações e os entrega por uma fila limitada
+    (lookahead), de modo que o EnergyPlus começa assim que o primeiro IDF
+    fica pronto. Com on_result, cada simulação concluída é repassada à
+    etapa seguinte (ex.: results.ExtractionStage) sem esperar o lote.
+    
+    Com ledger_path, cada simulação concluída é registrada imediatamente no
+    ledger (ver ledger.py). Com resume=True, simulações já concluídas com
+    sucesso no ledger são puladas e IDFs já existentes são reaproveitados.
+    
     Args:
         samples_df: DataFrame com amostras LHS
         base_idf: Caminho do IDF base
         output_base_dir: Diretório base para outputs
         weather_file: Arquivo climático
-        max_workers: Processos paralelos
+        max_workers: Processos paralelos (no modo adaptativo, o máximo)
+        backend: Fonte dos resultados ('csv', 'sql' ou 'eso'); fora de 'csv',
+            as simulações não geram eplusout.csv
+        ledger_path: Caminho do ledger JSONL (opcional)
+        resume: Retoma uma execução interrompida a partir do ledger
+        adaptive: Ajusta a concorrência pela carga da máquina (ver resources.py)
+        pin_cpus: Fixa cada EnergyPlus em um núcleo dedicado
+        scratch_dir: Diretório temporário rápido (ex.: /dev/shm) para as simulações
+        keep: Arquivos mantidos em sim_XXXX/ ao usar scratch_dir
+        cache: Cache de resultados endereçado por conteúdo (opcional)
+        timeout: Teto (s) do timeout por simulação; abaixo dele, o timeout é
+            derivado dos tempos observados (ver stragglers.py)
+        speculative: Duplica simulações lentas em workers ociosos
+        screening: Modo de triagem: IDFs com período reduzido (ver screening.py)
+        on_result: Chamado com o resultado de cada simulação concluída
+            (inclusive, ao retomar, as já concluídas no ledger)
+        lookahead: IDFs prontos aguardando simulação (padrão: 2 por worker)
+        engine: 'cli' (executável) ou 'api' (pyenergyplus em processo, ver
+            api_backend.py)
+        energyplus_path: Executável do EnergyPlus (None = locais comuns;
+            'synthetic' = EnergyPlus sintético para benchmarks)
+        idf_workers: Processos que criam os IDFs (1 = na própria thread produtora)
+        parametric: Gera um único IDF com objetos Parametric:* e o expande com
+            o ParametricPreprocessor (ver parametric.py) em vez de um IDF por amostra
     
     Returns:
         DataFrame com status das simulações
     """
-    from .idf_modifier import create_simulation_idf
-    
     print(f"\n{'='*60}")
     print(f"Iniciando {len(samples_df)} simulações - {datetime.now():%Y-%m-%d %H:%M:%S}")
     print(f"{'='*60}\n")
@@ -226,45 +966,75 @@ def run_sensitivity_simulations(samples_df: pd.DataFrame, base_idf: str,
     print(f"✓ IDF base: {base_idf}")
     print(f"✓ Arquivo climático: {weather_file}")
     
-    # Prepara lista de simulações
-    simulations = []
-    failed_idf_creation = []
+    ledger = RunLedger(ledger_path) if ledger_path else None
+    done_ids = set()
+    previous = []
+    if resume:
+        if ledger is None:
+            raise ValueError("resume=True requer ledger_path")
+        done_ids = ledger.successful_ids() & set(int(i) for i in samples_df['sim_id'])
+        previous = [rec for rec in ledger.successful_records() if rec['sim_id'] in done_ids]
+        print(f"✓ Retomando execução: {len(done_ids)} simulações já concluídas no ledger")
+        if on_result is not None:
+            for rec in previous:
+                on_result(rec)
     
-    print("\nCriando arquivos IDF modificados...")
-    for idx, row in tqdm(samples_df.iterrows(), total=len(samples_df), desc="IDF"):
-        sim_id = int(row['sim_id'])  # Converte para int
-        params = row.drop('sim_id').to_dict()
-        
-        output_dir = Path(output_base_dir) / f"sim_{sim_id:04d}"
-        
+    n_pending = len(samples_df) - len(done_ids)
+    stats = {'created': 0, 'reused_idfs': 0, 'failed_idf_creation': []}
+    
+    # Executa simulações à medida que os IDFs ficam prontos
+    if adaptive:
+        print(f"\nCriando IDFs e executando simulações (paralelo adaptativo: "
+              f"até {max_workers} workers)...")
+    else:
+        print(f"\nCriando IDFs e executando simulações (paralelo: {max_workers} workers)...")
+    if n_pending > 0:
+        runner = SimulationRunner(energyplus_path=energyplus_path,
+                                  weather_file=weather_file, adaptive=adaptive,
+                                  pin_cpus=pin_cpus, scratch_dir=scratch_dir, keep=keep,
+                                  cache=cache, timeout=timeout, speculative=speculative,
+                                  engine=engine, screening=screening)
+        prebuilt = None
+        if parametric:
+            prebuilt = _expand_parametric(samples_df, base_idf, output_base_dir, backend,
+                                          screening, resume, done_ids, runner.energyplus_path)
+        pending = queue.Queue(maxsize=lookahead or 2 * max_workers)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=_produce_simulations,
+            args=(samples_df, base_idf, output_base_dir, backend, resume, done_ids,
+                  pending, stop, stats, screening, idf_workers, prebuilt),
+            name="idf-producer", daemon=True)
+        producer.start()
         try:
-            idf_path = create_simulation_idf(sim_id, params, base_idf, output_base_dir)
-            if Path(idf_path).exists():
-                simulations.append({
-                    'sim_id': sim_id,
-                    'idf_path': idf_path,
-                    'output_dir': str(output_dir)
-                })
-            else:
-                failed_idf_creation.append(sim_id)
-                print(f"✗ IDF {sim_id} não foi criado")
-        except Exception as e:
-            failed_idf_creation.append(sim_id)
-            print(f"✗ Erro ao criar IDF {sim_id}: {e}")
+            results_df = runner.run_batch(pending, max_workers=max_workers, ledger=ledger,
+                                          total=n_pending, on_result=on_result)
+        finally:
+            stop.set()
+            producer.join()
+            runner.close()
+    else:
+        results_df = pd.DataFrame(columns=['sim_id', 'success'])
     
+    failed_idf_creation = stats['failed_idf_creation']
     if failed_idf_creation:
         print(f"\n⚠ Atenção: {len(failed_idf_creation)} IDFs não foram criados")
         print(f"  IDs: {failed_idf_creation[:10]}{'...' if len(failed_idf_creation) > 10 else ''}")
     
-    if not simulations:
+    if not stats['created'] and not done_ids:
         raise RuntimeError("Nenhum IDF foi criado com sucesso. Verifique o arquivo base e os parâmetros.")
     
-    print(f"\n✓ {len(simulations)} IDFs criados com sucesso")
+    print(f"\n✓ {stats['created']} IDFs criados com sucesso")
+    if stats['reused_idfs']:
+        print(f"  ({stats['reused_idfs']} reaproveitados da execução anterior)")
+    
+    if results_df.empty:
+        results_df = pd.DataFrame(columns=['sim_id', 'success'])
     
-    # Executa simulações
-    print(f"\nExecutando simulações (paralelo: {max_workers} workers)...")
-    runner = SimulationRunner(weather_file=weather_file)
-    results_df = runner.run_batch(simulations, max_workers=max_workers)
+    if done_ids:
+        # Inclui as simulações concluídas antes da interrupção
+        results_df = pd.concat([pd.DataFrame(previous), results_df], ignore_index=True)
+        results_df = results_df.sort_values('sim_id').reset_index(drop=True)
     
     # Resumo
     n_success = results_df['success'].sum()
@@ -274,6 +1044,8 @@ def run_sensitivity_simulations(samples_df: pd.DataFrame, base_idf: str,
     print(f"Simulações concluídas:")
     print(f"  ✓ Sucesso: {n_success}/{len(results_df)}")
     print(f"  ✗ Falhas: {n_failed}/{len(results_df)}")
+    if cache is not None and 'cached' in results_df:
+        print(f"  ⚡ Do cache: {int((results_df['cached'] == True).sum())}")
     print(f"{'='*60}\n")
     
     return results_df
@@ -0,0 +1,105 @@
+"""
+Backend de extração a partir do eplusout.sql (Output:SQLite).
+
+Os nomes de colunas no estilo do eplusout.csv são reconstruídos a partir de
+ReportDataDictionary, de modo que o mesmo plano de agregação (aggregation.py)
+resolve as variáveis. Somas, máximos, contagens e contagens acima dos limites
+são calculados pelo próprio SQLite com consultas agregadas sobre ReportData,
+sem carregar as séries temporais em Python.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .aggregation import ColumnStats, compile_plan
+
+
+SQL_NAME = 'eplusout.sql'
+
+# Frequências do SQLite -> sufixo usado pelo eplusout.csv
+_FREQUENCY_SUFFIX = {
+    'Zone Timestep': 'TimeStep',
+    'HVAC System Timestep': 'TimeStep',
+    'Timestep': 'TimeStep',
+}
+
+
+def _column_name(key: str, name: str, units: str, frequency: str) -> str:
+    """Nome de coluna equivalente ao do eplusout.csv."""
+    frequency = _FREQUENCY_SUFFIX.get(frequency, frequency)
+    label = f"{key}:{name}" if key else name
+    return f"{label} [{units}]({frequency})"
+
+
+def read_dictionary(conn: sqlite3.Connection) -> Tuple[List[str], List[int]]:
+    """
+    Lê o dicionário de variáveis reportadas.
+
+    Returns:
+        (nomes de colunas no estilo CSV, ReportDataDictionaryIndex correspondentes)
+    """
+    rows = conn.execute(
+        "SELECT ReportDataDictionaryIndex, KeyValue, Name, Units, ReportingFrequency "
+        "FROM ReportDataDictionary ORDER BY ReportDataDictionaryIndex"
+    ).fetchall()
+
+    header = [_column_name(key or '', name, units or '', freq or '')
+              for _, key, name, units, freq in rows]
+    indexes = [row[0] for row in rows]
+    return header, indexes
+
+
+def extract_from_sql(sql_file: str, variables: Optional[Sequence[str]] = None,
+                     expected_rows: Optional[int] = None) -> Dict[str, float]:
+    """
+    Calcula as variáveis dependentes diretamente do eplusout.sql.
+
+    Args:
+        sql_file: Caminho do eplusout.sql
+        variables: Subconjunto de variáveis (None = todas)
+        expected_rows: Registros por timestep esperados (ver AggregationPlan.finalize)
+
+    Returns:
+        Dicionário {variável: valor}, igual ao do backend CSV
+    """
+    uri = Path(sql_file).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True)
+
+    try:
+        header, indexes = read_dictionary(conn)
+        plan = compile_plan(tuple(header), variables)
+        dict_indexes = [indexes[i] for i in plan.columns]
+        thresholds = plan.thresholds
+
+        n = len(dict_indexes)
+        stats = ColumnStats(
+            sum=np.zeros(n),
+            count=np.zeros(n, dtype=np.int64),
+            max=np.full(n, np.nan),
+            above={thr: np.zeros(n, dtype=np.int64) for thr in thresholds},
+        )
+
+        if n:
+            above_sql = ''.join(', SUM(Value > ?)' for _ in thresholds)
+            placeholders = ','.join('?' for _ in dict_indexes)
+            query = (
+                f"SELECT ReportDataDictionaryIndex, TOTAL(Value), COUNT(Value), MAX(Value)"
+                f"{above_sql} FROM ReportData "
+                f"WHERE ReportDataDictionaryIndex IN ({placeholders}) "
+                f"GROUP BY ReportDataDictionaryIndex"
+            )
+            position = {idx: pos for pos, idx in enumerate(dict_indexes)}
+
+            for row in conn.execute(query, [*thresholds, *dict_indexes]):
+                pos = position[row[0]]
+                stats.sum[pos] = row[1]
+                stats.count[pos] = row[2]
+                stats.max[pos] = row[3] if row[3] is not None else np.nan
+                for thr, value in zip(thresholds, row[4:]):
+                    stats.above[thr][pos] = value or 0
+
+        return plan.finalize(stats, expected_rows)
+
+    finally:
+        conn.close()
@@ -0,0 +1,59 @@
+"""
+Detecção de simulações lentas (stragglers) a partir dos tempos observados.
+
+O despachante de SimulationRunner.run_batch registra a duração de cada
+simulação bem-sucedida. A partir de min_samples simulações, a distribuição
+observada define:
+- o limite de straggler: simulações acima de straggler_factor × quantil são
+  sinalizadas (e, no modo especulativo, ganham uma cópia em um worker ocioso);
+- o timeout: timeout_factor × quantil, entre min_timeout e o timeout fixo
+  do runner (que continua valendo como teto e antes de haver amostras).
+"""
+
+from typing import List, Optional
+import numpy as np
+
+
+class RuntimeStats:
+    """Distribuição dos tempos de simulação observados no lote."""
+
+    def __init__(self, min_samples: int = 10, quantile: float = 0.95,
+                 straggler_factor: float = 1.5, timeout_factor: float = 4.0,
+                 min_timeout: float = 60.0):
+        """
+        Args:
+            min_samples: Simulações concluídas antes de derivar limites
+            quantile: Quantil de referência dos tempos observados
+            straggler_factor: Múltiplo do quantil que marca um straggler
+            timeout_factor: Múltiplo do quantil usado como timeout
+            min_timeout: Timeout mínimo (s), qualquer que seja a distribuição
+        """
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.straggler_factor = straggler_factor
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self._durations: List[float] = []
+        self._reference: Optional[float] = None
+
+    def observe(self, seconds: float):
+        """Registra a duração de uma simulação bem-sucedida."""
+        self._durations.append(seconds)
+        if len(self._durations) >= self.min_samples:
+            self._reference = float(np.quantile(self._durations, self.quantile))
+
+    @property
+    def count(self) -> int:
+        return len(self._durations)
+
+    def straggler_bound(self) -> Optional[float]:
+        """Duração (s) acima da qual uma simulação é straggler (None = poucas amostras)."""
+        if self._reference is None:
+            return None
+        return self.straggler_factor * self._reference
+
+    def timeout(self, ceiling: float) -> float:
+        """Timeout (s) derivado da distribuição, limitado a ceiling."""
+        if self._reference is None:
+            return ceiling
+        return min(ceiling, max(self.min_timeout, self.timeout_factor * self._reference))
@@ -0,0 +1,707 @@
+"""
+EnergyPlus sintético para medir o desempenho do pipeline.
+
+Substitui o executável do EnergyPlus (SimulationRunner(energyplus_path='synthetic')
+ou --energyplus synthetic) para medir vazão, memória e escalabilidade de tudo o
+que é Python no fluxo: geração de IDFs, despacho, extração, análise e relatórios.
+Aceita os mesmos argumentos (-w EPW -d DIR IDF), espera por um tempo sorteado de
+uma distribuição configurável e grava um eplusout.err e um eplusout.csv
+realistas:
+
+- colunas: Output:Variable e Output:Meter do próprio IDF, com '*' expandido para
+  os objetos do modelo (zonas, superfícies, janelas, nós do AirflowNetwork) e o
+  mesmo formato de cabeçalho do EnergyPlus ('CHAVE:Variável [unidade](TimeStep)');
+- linhas: um registro por timestep dos RunPeriods do IDF (52.560 para o ano do
+  laboratorio_6zonas.idf) ou dos dias de projeto, se só eles forem simulados;
+- valores: modelo de nó único (condução com temperatura sol-ar, ganho solar
+  pelas janelas, infiltração e ganhos internos com os schedules do IDF) sobre
+  o clima do EPW. Dependem, portanto, dos parâmetros gravados pelo IDFModifier
+  (absortância, SHGC, infiltração, equipamentos, ocupação, setpoint,
+  condutividade). Ruído determinístico por conteúdo do IDF: o mesmo IDF gera
+  sempre o mesmo CSV.
+
+Não é um modelo físico validado; serve apenas para carga e formato. Gera só o
+eplusout.csv (use --backend csv).
+
+Configuração por variáveis de ambiente (herdadas pelos subprocessos):
+    SYNTHETIC_ENERGYPLUS_RUNTIME    'fixed:S', 'uniform:MIN,MAX' ou
+                                    'lognormal:MEDIANA,SIGMA' (s, ano completo;
+                                    escala com os dias simulados)
+    SYNTHETIC_ENERGYPLUS_FAIL_RATE  Fração de simulações com erro fatal (0 a 1)
+
+Este módulo não depende do pacote (apenas NumPy) e roda como script:
+    python sensitivity/synthetic.py -w clima.epw -d saida modelo.idf
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+# Valor de energyplus_path que seleciona o EnergyPlus sintético
+SYNTHETIC_ENERGYPLUS = 'synthetic'
+VERSION = 'EnergyPlus, Version 25.1.0-synthetic'
+
+DEFAULT_RUNTIME = 'lognormal:5,0.25'
+RUNTIME_ENV = 'SYNTHETIC_ENERGYPLUS_RUNTIME'
+FAIL_RATE_ENV = 'SYNTHETIC_ENERGYPLUS_FAIL_RATE'
+
+# Ano sem bissexto (padrão do EnergyPlus quando o RunPeriod não informa o ano)
+YEAR = 2019
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Multiplicadores padrão da amplitude diária dos dias de projeto (ASHRAE), por hora
+DESIGN_DAY_RANGE = [0.88, 0.92, 0.95, 0.98, 1.00, 0.98, 0.91, 0.74, 0.55, 0.38, 0.23, 0.13,
+                    0.05, 0.00, 0.00, 0.06, 0.14, 0.24, 0.39, 0.50, 0.59, 0.68, 0.75, 0.82]
+
+# Coeficientes superficiais (W/m²K) e propriedades do ar
+H_OUT, H_IN = 17.0, 8.0
+RHO_CP_AIR = 1.2 * 1005.0
+
+# Unidade de cada variável conhecida; variáveis fora da tabela são ignoradas
+UNITS = {
+    'site outdoor air drybulb temperature': 'C',
+    'site outdoor air wetbulb temperature': 'C',
+    'site outdoor air relative humidity': '%',
+    'site direct solar radiation rate per area': 'W/m2',
+    'site diffuse solar radiation rate per area': 'W/m2',
+    'zone mean air temperature': 'C',
+    'zone air temperature': 'C',
+    'zone operative temperature': 'C',
+    'zone air relative humidity': '%',
+    'zone thermostat cooling setpoint temperature': 'C',
+    'zone mean radiant temperature': 'C',
+    'zone air heat balance surface convection rate': 'W',
+    'zone ideal loads zone total cooling energy': 'J',
+    'zone ideal loads zone total heating energy': 'J',
+    'zone ideal loads supply air total cooling energy': 'J',
+    'zone ideal loads supply air total heating energy': 'J',
+    'surface inside face temperature': 'C',
+    'surface outside face temperature': 'C',
+    'surface inside face convection heat transfer coefficient': 'W/m2-K',
+    'surface window transmitted solar radiation rate': 'W',
+    'surface window heat gain rate': 'W',
+    'surface window heat loss rate': 'W',
+    'afn zone infiltration volume': 'm3',
+    'afn zone infiltration air change rate': 'ach',
+    'afn surface venting window or door opening factor': '',
+}
+METERS = {'districtcooling:facility', 'districtheating:facility', 'electricity:facility'}
+
+
+# ---------------------------------------------------------------------------
+# Leitura do IDF
+# ---------------------------------------------------------------------------
+
+def parse_idf(text: str) -> Dict[str, List[List[str]]]:
+    """Objetos do IDF agrupados por classe (maiúsculas): {classe: [campos, ...]}."""
+    text = re.sub(r'!.*', '', text)
+    objects: Dict[str, List[List[str]]] = {}
+    for raw in text.split(';'):
+        fields = [f.strip() for f in raw.split(',')]
+        if fields[0]:
+            objects.setdefault(fields[0].upper(), []).append(fields[1:])
+    return objects
+
+
+def _field(obj: List[str], i: int, default: str = '') -> str:
+    return obj[i] if i < len(obj) and obj[i] != '' else default
+
+
+def _float(obj: List[str], i: int, default: float = 0.0) -> float:
+    try:
+        return float(_field(obj, i))
+    except ValueError:
+        return default
+
+
+def _by_name(objects, cls: str) -> Dict[str, List[str]]:
+    return {obj[0].upper(): obj for obj in objects.get(cls, []) if obj}
+
+
+def _polygon_area(coords: Sequence[float]) -> float:
+    """Área de um polígono 3D plano a partir de (x, y, z, x, y, z, ...)."""
+    pts = np.asarray(coords, dtype=float).reshape(-1, 3)
+    if len(pts) < 3:
+        return 0.0
+    cross = np.zeros(3)
+    for i in range(len(pts)):
+        cross += np.cross(pts[i], pts[(i + 1) % len(pts)])
+    return float(np.linalg.norm(cross) / 2.0)
+
+
+def _vertices(obj: List[str], start: int) -> List[float]:
+    coords = []
+    for value in obj[start:]:
+        try:
+            coords.append(float(value))
+        except ValueError:
+            break
+    return coords[:len(coords) - len(coords) % 3]
+
+
+# ---------------------------------------------------------------------------
+# Períodos, schedules e clima
+# ---------------------------------------------------------------------------
+
+class Environment:
+    """Um período simulado: datas, tipo de dia e clima por hora."""
+
+    def __init__(self, days: List[date], day_types: List[str], hourly: Dict[str, np.ndarray]):
+        self.days = days
+        self.day_types = day_types   # 'monday'..'sunday' ou 'summerdesignday' etc.
+        self.hourly = hourly         # Séries horárias (len(days) * 24)
+
+
+def _run_periods(objects) -> List[Tuple[date, date, str]]:
+    periods = []
+    for obj in objects.get('RUNPERIOD', []):
+        begin = date(YEAR, int(_float(obj, 1, 1)), int(_float(obj, 2, 1)))
+        end = date(YEAR, int(_float(obj, 4, 12)), int(_float(obj, 5, 31)))
+        periods.append((begin, end, _field(obj, 7, 'Sunday').lower()))
+    return periods
+
+
+def read_weather(epw_path: str) -> Dict[str, np.ndarray]:
+    """Séries horárias do EPW (8760 valores): tbs, tpo, ur, glob, dir, dif."""
+    cols = {'tbs': 6, 'tpo': 7, 'ur': 8, 'glob': 13, 'dir': 14, 'dif': 15}
+    data = {name: [] for name in cols}
+    with open(epw_path, 'r', encoding='latin-1') as f:
+        for i, line in enumerate(f):
+            if i < 8:
+                continue
+            fields = line.split(',')
+            if len(fields) < 16:
+                continue
+            for name, col in cols.items():
+                data[name].append(float(fields[col]))
+    return {name: np.asarray(values[:8760]) for name, values in data.items()}
+
+
+def environments(objects, weather: Dict[str, np.ndarray]) -> List[Environment]:
+    """Períodos reportados no CSV: RunPeriods ou, sem eles, os dias de projeto."""
+    control = objects.get('SIMULATIONCONTROL', [[]])[0]
+    run_weather = _field(control, 4, 'Yes').lower() == 'yes'
+    envs = []
+    if run_weather:
+        for begin, end, weekday in _run_periods(objects):
+            days = [begin + timedelta(d) for d in range((end - begin).days + 1)]
+            start = WEEKDAYS.index(weekday) if weekday in WEEKDAYS else begin.weekday()
+            day_types = [WEEKDAYS[(start + i) % 7] for i in range(len(days))]
+            idx = np.concatenate([np.arange(24) + (d.timetuple().tm_yday - 1) * 24 for d in days])
+            envs.append(Environment(days, day_types, {k: v[idx] for k, v in weather.items()}))
+    if envs:
+        return envs
+
+    for obj in objects.get('SIZINGPERIOD:DESIGNDAY', []):
+        day = date(YEAR, int(_float(obj, 1, 1)), int(_float(obj, 2, 1)))
+        tmax, trange = _float(obj, 4, 30.0), _float(obj, 5, 0.0)
+        hours = np.arange(24)
+        sun = np.clip(np.sin(np.pi * (hours + 0.5 - 6) / 12), 0, None)
+        tbs = tmax - trange * np.asarray(DESIGN_DAY_RANGE)
+        hourly = {'tbs': tbs, 'tpo': np.full(24, _float(obj, 9, tmax - 3)),
+                  'ur': np.clip(100 - 4 * (tbs - tbs.min()), 30, 100),
+                  'glob': 950 * sun, 'dir': 700 * sun, 'dif': 150 * sun}
+        envs.append(Environment([day], [_field(obj, 3, 'SummerDesignDay').lower()], hourly))
+    return envs
+
+
+def _schedule_profiles(obj: List[str]) -> List[Tuple[date, List[Tuple[set, List[Tuple[int, float]]]]]]:
+    """Schedule:Compact -> [(até a data, [(tipos de dia, [(até o minuto, valor)])])]."""
+    blocks, current, rules = [], None, None
+    fields = obj[2:]
+    i = 0
+    while i < len(fields):
+        field = fields[i]
+        low = field.lower()
+        if low.startswith('through:'):
+            month, day = (int(x) for x in low.split(':', 1)[1].strip().split('/'))
+            current = (date(YEAR, month, day), [])
+            blocks.append(current)
+        elif low.startswith('for:') and current is not None:
+            rules = (set(low.split(':', 1)[1].split()), [])
+            current[1].append(rules)
+        elif low.startswith('until:') and rules is not None:
+            hh, mm = low.split(':', 1)[1].strip().split(':')
+            value = float(fields[i + 1]) if i + 1 < len(fields) else 0.0
+            rules[1].append((int(hh) * 60 + int(mm), value))
+            i += 1
+        i += 1
+    return blocks
+
+
+def _day_matches(kinds: set, day_type: str, seen: set) -> bool:
+    if 'alldays' in kinds or day_type in kinds:
+        return True
+    if 'weekdays' in kinds and day_type in WEEKDAYS[:5]:
+        return True
+    if 'weekends' in kinds and day_type in WEEKDAYS[5:]:
+        return True
+    if 'alldesigndays' in kinds and day_type.endswith('designday'):
+        return True
+    return 'allotherdays' in kinds and day_type not in seen
+
+
+def schedule_values(objects, name: str, env: Environment, steps_per_hour: int,
+                    default: float = 1.0) -> np.ndarray:
+    """Valores de um Schedule:Compact em cada timestep do período."""
+    n = steps_per_hour * 24
+    sched = _by_name(objects, 'SCHEDULE:COMPACT').get(name.upper())
+    if sched is None:
+        return np.full(len(env.days) * n, default)
+    blocks = _schedule_profiles(sched)
+    minutes = (np.arange(n) + 1) * (60 // steps_per_hour)  # Fim de cada timestep
+    out = np.empty(len(env.days) * n)
+    cache: Dict[Tuple[date, str], np.ndarray] = {}
+    for d, (day, day_type) in enumerate(zip(env.days, env.day_types)):
+        block = next((b for b in blocks if day <= b[0]), blocks[-1] if blocks else None)
+        key = (block[0] if block else None, day_type)
+        profile = cache.get(key)
+        if profile is None:
+            profile = np.full(n, default)
+            seen: set = set()
+            for kinds, untils in (block[1] if block else []):
+                if _day_matches(kinds, day_type, seen) and untils:
+                    limits = np.asarray([u for u, _ in untils])
+                    values = np.asarray([v for _, v in untils])
+                    profile = values[np.minimum(np.searchsorted(limits, minutes), len(values) - 1)]
+                    break
+                seen |= kinds
+            cache[key] = profile
+        out[d * n:(d + 1) * n] = profile
+    return out
+
+
+def _interpolate(hourly: np.ndarray, steps_per_hour: int) -> np.ndarray:
+    """Interpola séries horárias (valor no fim da hora) para cada timestep."""
+    previous = np.concatenate([hourly[:1], hourly[:-1]])
+    frac = (np.arange(steps_per_hour) + 1) / steps_per_hour
+    return (previous[:, None] + (hourly - previous)[:, None] * frac[None, :]).ravel()
+
+
+def _damped(values: np.ndarray, steps_per_day: int, mass: float = 0.6) -> np.ndarray:
+    """Amortece a oscilação diária (inércia térmica): mistura com a média de cada dia."""
+    daily = values.reshape(-1, steps_per_day).mean(axis=1, keepdims=True)
+    return ((1 - mass) * values.reshape(-1, steps_per_day) + mass * daily).ravel()
+
+
+# ---------------------------------------------------------------------------
+# Modelo térmico de nó único
+# ---------------------------------------------------------------------------
+
+class SyntheticModel:
+    """Geometria e parâmetros do IDF usados pelo modelo simplificado."""
+
+    def __init__(self, objects):
+        self.objects = objects
+        timestep = objects.get('TIMESTEP', [['6']])[0]
+        self.steps_per_hour = max(1, int(_float(timestep, 0, 6)))
+
+        materials = _by_name(objects, 'MATERIAL')
+        glazing = objects.get('WINDOWMATERIAL:SIMPLEGLAZINGSYSTEM', [])
+        self.u_window = _float(glazing[0], 1, 5.7) if glazing else 5.7
+        self.shgc = _float(glazing[0], 2, 0.8) if glazing else 0.8
+
+        constructions = {}
+        for obj in objects.get('CONSTRUCTION', []):
+            layers = [materials[l.upper()] for l in obj[1:] if l.upper() in materials]
+            resistance = 1 / H_IN + 1 / H_OUT + sum(
+                _float(m, 2, 0.1) / max(_float(m, 3, 1.0), 1e-6) for m in layers)
+            absorptance = _float(layers[0], 7, 0.7) if layers else 0.7
+            constructions[obj[0].upper()] = (1 / resistance, absorptance)
+
+        # Superfícies opacas externas: (nome, área líquida, U, absortância, horizontal)
+        windows = objects.get('FENESTRATIONSURFACE:DETAILED', [])
+        window_area_by_host: Dict[str, float] = {}
+        self.windows = []   # (nome, área)
+        self.doors = []
+        for obj in windows:
+            area = _polygon_area(_vertices(obj, 9)) * _float(obj, 7, 1.0)
+            host = _field(obj, 3).upper()
+            window_area_by_host[host] = window_area_by_host.get(host, 0.0) + area
+            if _field(obj, 1).lower() in ('window', 'glassdoor'):
+                self.windows.append((obj[0], area))
+            else:
+                self.doors.append((obj[0], area))
+
+        self.surfaces = []
+        self.floor_area = 0.0
+        self.zone_height = 0.0
+        for obj in objects.get('BUILDINGSURFACE:DETAILED', []):
+            coords = _vertices(obj, 11)
+            area = _polygon_area(coords) - window_area_by_host.get(obj[0].upper(), 0.0)
+            u, absorptance = constructions.get(_field(obj, 2).upper(), (2.0, 0.7))
+            kind = _field(obj, 1).lower()
+            outdoors = _field(obj, 5).lower() == 'outdoors'
+            if kind == 'floor':
+                self.floor_area += area
+            if coords:
+                self.zone_height = max(self.zone_height, max(coords[2::3]))
+            self.surfaces.append({'name': obj[0], 'area': max(area, 0.0), 'u': u,
+                                  'absorptance': absorptance, 'kind': kind,
+                                  'outdoors': outdoors})
+
+        zones = objects.get('ZONE', [])
+        volume = _float(zones[0], 8, 0.0) if zones else 0.0
+        self.volume = volume or max(self.floor_area * (self.zone_height or 3.0), 1.0)
+
+        self.people = []
+        for obj in objects.get('PEOPLE', []):
+            self.people.append((_field(obj, 2), _float(obj, 4, 0.0)))
+        self.lights = [(_field(obj, 2), _float(obj, 4, 0.0))
+                       for obj in objects.get('LIGHTS', [])]
+        self.equipment = []
+        for obj in objects.get('ELECTRICEQUIPMENT', []):
+            method = _field(obj, 3).lower()
+            if method == 'watts/person':
+                level = _float(obj, 6) * sum(n for _, n in self.people)
+            elif method == 'watts/area':
+                level = _float(obj, 5) * self.floor_area
+            else:
+                level = _float(obj, 4)
+            self.equipment.append((_field(obj, 2), level))
+
+        self.infiltration = []   # (schedule, vazão m³/s)
+        for obj in objects.get('ZONEINFILTRATION:DESIGNFLOWRATE', []):
+            ach = _float(obj, 7, 0.0)
+            flow = ach * self.volume / 3600 if ach > 0 else _float(obj, 4, 0.0)
+            self.infiltration.append((_field(obj, 2), flow))
+
+        self.cooling_schedule, self.heating_schedule = '', ''
+        for obj in objects.get('THERMOSTATSETPOINT:DUALSETPOINT', []):
+            self.heating_schedule, self.cooling_schedule = _field(obj, 1), _field(obj, 2)
+
+    def simulate(self, env: Environment, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """Séries por timestep das grandezas usadas nas colunas do CSV."""
+        sph = self.steps_per_hour
+        dt = 3600.0 / sph
+        sched = lambda name, default=1.0: schedule_values(self.objects, name, env, sph, default)
+        w = {k: _interpolate(v, sph) for k, v in env.hourly.items()}
+        n = len(w['tbs'])
+
+        t_out = w['tbs']
+        vertical = 0.3 * w['dir'] + 0.5 * w['dif']
+        t_cool = sched(self.cooling_schedule, 24.0)
+        t_heat = sched(self.heating_schedule, 18.0)
+
+        occupancy = sum((sched(s, 0.0) * count for s, count in self.people), np.zeros(n))
+        lights = sum((sched(s) * level for s, level in self.lights), np.zeros(n))
+        equipment = sum((sched(s) * level for s, level in self.equipment), np.zeros(n))
+        flow = sum((sched(s) * f for s, f in self.infiltration), np.zeros(n))
+        internal = 120.0 * occupancy + lights + equipment
+
+        sol_air, ua_total, q_env = {}, RHO_CP_AIR * flow, RHO_CP_AIR * flow * (t_out - t_cool)
+        for s in self.surfaces:
+            if not s['outdoors']:
+                continue
+            irradiance = w['glob'] if s['kind'] == 'roof' else vertical
+            sol_air[s['name']] = _damped(t_out + s['absorptance'] * irradiance / H_OUT,
+                                         24 * sph)
+            ua_total = ua_total + s['u'] * s['area']
+            q_env = q_env + s['u'] * s['area'] * (sol_air[s['name']] - t_cool)
+        window_area = sum(a for _, a in self.windows)
+        ua_total = ua_total + self.u_window * window_area
+        q_env = q_env + self.u_window * window_area * (t_out - t_cool)
+        transmitted = self.shgc * 0.9 * vertical
+
+        load = q_env + self.shgc * window_area * vertical + internal
+        load = load * (1 + rng.normal(0, 0.02, n))
+        cooling = np.clip(load, 0, None)
+        t_free = t_cool + np.minimum(load, 0) / np.maximum(ua_total, 1e-6)
+        heating = np.clip(t_heat - t_free, 0, None) * ua_total
+        t_zone = np.maximum(t_free, t_heat) + rng.normal(0, 0.05, n)
+
+        series = {
+            'tbs': t_out, 'tpo': w['tpo'], 'ur': w['ur'], 'dir': w['dir'], 'dif': w['dif'],
+            't_zone': t_zone, 't_cool': t_cool,
+            'ur_zone': np.clip(w['ur'] - 2.0 * (t_zone - w['tpo']) + 8 * (occupancy > 0), 20, 100),
+            'cooling': cooling * dt, 'heating': heating * dt,
+            'electricity': (lights + equipment) * dt,
+            'flow': flow, 'dt': np.full(n, dt), 'volume': np.full(n, self.volume),
+        }
+
+        inside, radiant, convection = {}, np.zeros(n), np.zeros(n)
+        total_area = 0.0
+        for s in self.surfaces:
+            outer = sol_air.get(s['name'], t_zone)
+            t_in = t_zone + (outer - t_zone) * s['u'] / H_IN
+            inside[s['name']] = (t_in, outer - (outer - t_zone) * s['u'] / H_OUT)
+            h = 2.5 + 0.3 * np.cbrt(np.abs(t_in - t_zone))
+            convection += h * s['area'] * (t_in - t_zone)
+            radiant += t_in * s['area']
+            total_area += s['area']
+            series[f"h:{s['name'].upper()}"] = h
+        for name, area in self.windows:
+            gain = transmitted * area + self.u_window * area * (t_out - t_zone)
+            t_in = t_zone + (t_out - t_zone) * self.u_window / H_IN + 0.01 * transmitted
+            inside[name] = (t_in, t_out + 0.02 * vertical)
+            series[f"tsol:{name.upper()}"] = transmitted * area
+            series[f"gain:{name.upper()}"] = np.clip(gain, 0, None)
+            series[f"loss:{name.upper()}"] = np.clip(-gain, 0, None)
+        for name, _ in self.doors:
+            inside[name] = (t_zone + 0.1 * (t_out - t_zone), t_out)
+        for name, (t_in, t_ext) in inside.items():
+            series[f"tin:{name.upper()}"] = t_in
+            series[f"tout:{name.upper()}"] = t_ext
+        series['t_radiant'] = radiant / max(total_area, 1e-6)
+        series['convection'] = convection
+        return series
+
+
+# ---------------------------------------------------------------------------
+# Colunas do CSV
+# ---------------------------------------------------------------------------
+
+def _keys(objects, variable: str) -> List[str]:
+    """Chaves ('*') de uma variável: objetos do modelo a que ela se aplica."""
+    names = lambda cls: [obj[0].upper() for obj in objects.get(cls, []) if obj]
+    var = variable.lower()
+    if var.startswith('site '):
+        return ['Environment']
+    if var.startswith('zone ideal loads'):
+        return names('ZONEHVAC:IDEALLOADSAIRSYSTEM')
+    if var.startswith('zone '):
+        return names('ZONE')
+    if var.startswith('surface window'):
+        return [obj[0].upper() for obj in objects.get('FENESTRATIONSURFACE:DETAILED', [])
+                if _field(obj, 1).lower() in ('window', 'glassdoor')]
+    if var.startswith('surface '):
+        return names('BUILDINGSURFACE:DETAILED') + names('FENESTRATIONSURFACE:DETAILED')
+    if var.startswith('afn zone'):
+        return names('AIRFLOWNETWORK:MULTIZONE:ZONE')
+    if var.startswith('afn surface'):
+        return names('AIRFLOWNETWORK:MULTIZONE:SURFACE')
+    return []
+
+
+def _variable_values(var: str, key: str, s: Dict[str, np.ndarray], model: SyntheticModel,
+                     objects, env: Environment) -> np.ndarray:
+    simple = {
+        'site outdoor air drybulb temperature': 'tbs',
+        'site outdoor air relative humidity': 'ur',
+        'site direct solar radiation rate per area': 'dir',
+        'site diffuse solar radiation rate per area': 'dif',
+        'zone mean air temperature': 't_zone',
+        'zone air temperature': 't_zone',
+        'zone air relative humidity': 'ur_zone',
+        'zone thermostat cooling setpoint temperature': 't_cool',
+        'zone mean radiant temperature': 't_radiant',
+        'zone air heat balance surface convection rate': 'convection',
+        'zone ideal loads zone total cooling energy': 'cooling',
+        'zone ideal loads zone total heating energy': 'heating',
+    }
+    if var in simple:
+        return s[simple[var]]
+    if var == 'site outdoor air wetbulb temperature':
+        t, rh = s['tbs'], s['ur']
+        return (t * np.arctan(0.151977 * np.sqrt(rh + 8.313659)) + np.arctan(t + rh)
+                - np.arctan(rh - 1.676331) + 0.00391838 * rh ** 1.5 * np.arctan(0.023101 * rh)
+                - 4.686035)
+    if var == 'zone operative temperature':
+        return (s['t_zone'] + s['t_radiant']) / 2
+    if var == 'zone ideal loads supply air total cooling energy':
+        return s['cooling'] * 1.08
+    if var == 'zone ideal loads supply air total heating energy':
+        return s['heating']
+    if var == 'surface inside face temperature':
+        return s[f'tin:{key}']
+    if var == 'surface outside face temperature':
+        return s[f'tout:{key}']
+    if var == 'surface inside face convection heat transfer coefficient':
+        return s.get(f'h:{key}', np.full(len(s['dt']), 3.0))
+    if var == 'surface window transmitted solar radiation rate':
+        return s[f'tsol:{key}']
+    if var == 'surface window heat gain rate':
+        return s[f'gain:{key}']
+    if var == 'surface window heat loss rate':
+        return s[f'loss:{key}']
+    if var == 'afn zone infiltration volume':
+        return s['flow'] * s['dt']
+    if var == 'afn zone infiltration air change rate':
+        return s['flow'] * 3600 / s['volume']
+    if var == 'afn surface venting window or door opening factor':
+        surface = _by_name(objects, 'AIRFLOWNETWORK:MULTIZONE:SURFACE').get(key, [])
+        venting = _field(surface, 5)
+        if not venting:
+            return np.zeros(len(s['dt']))
+        return schedule_values(objects, venting, env, model.steps_per_hour, 0.0) \
+            * _float(surface, 3, 1.0)
+    raise KeyError(var)
+
+
+def columns(objects) -> List[Tuple[str, str, str, bool]]:
+    """(cabeçalho, variável, chave, horária) de cada coluna do CSV, na ordem do IDF."""
+    cols, seen = [], set()
+    for obj in objects.get('OUTPUT:VARIABLE', []):
+        key, var, freq = _field(obj, 0, '*'), _field(obj, 1), _field(obj, 2, 'Hourly')
+        unit = UNITS.get(var.lower())
+        if unit is None or freq.lower() not in ('timestep', 'detailed', 'hourly'):
+            continue
+        keys = _keys(objects, var)
+        if key != '*':
+            keys = [k for k in keys if k.upper() == key.upper()]
+        hourly = freq.lower() == 'hourly'
+        for k in keys:
+            header = f"{k}:{var} [{unit}]({'Hourly' if hourly else 'TimeStep'})"
+            if header not in seen:
+                seen.add(header)
+                cols.append((header, var.lower(), k.upper() if k != 'Environment' else k, hourly))
+    for obj in objects.get('OUTPUT:METER', []):
+        name, freq = _field(obj, 0), _field(obj, 1, 'Hourly')
+        if name.lower() in METERS:
+            hourly = freq.lower() == 'hourly'
+            cols.append((f"{name} [J]({'Hourly' if hourly else 'TimeStep'})",
+                         name.lower(), '', hourly))
+    return cols
+
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+def sample_runtime(spec: str, rng: np.random.Generator) -> float:
+    """Sorteia a duração (s) de uma simulação anual a partir de 'tipo:parâmetros'."""
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',') if v.strip()]
+    kind = kind.strip().lower()
+    if kind == 'fixed':
+        return values[0]
+    if kind == 'uniform':
+        return float(rng.uniform(values[0], values[1]))
+    if kind == 'lognormal':
+        return float(values[0] * math.exp(rng.normal(0, values[1])))
+    raise ValueError(f"Distribuição de tempo não suportada: {spec}")
+
+
+def _elapsed(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}hr {int(minutes):02d}min {secs:5.2f}sec"
+
+
+def write_err(path: Path, started: float, fatal: Optional[str] = None):
+    """eplusout.err no formato do EnergyPlus."""
+    stamp = datetime.now().strftime('%Y.%m.%d %H:%M')
+    lines = [
+        f"Program Version,{VERSION}, YMD={stamp},",
+        "   ** Warning ** Weather file location will be used rather than entered (IDF) Location object.",
+        "   **   ~~~   ** ..Location object=FORTALEZA_CE_BRA",
+        "   ************* Testing Individual Branch Integrity",
+        "   ************* All Branches passed integrity testing",
+        "   ************* Testing Individual Supply Air Path Integrity",
+        "   ************* All Supply Air Paths passed integrity testing",
+        "   ************* Beginning Simulation",
+    ]
+    elapsed = _elapsed(time.monotonic() - started)
+    if fatal:
+        lines += [f"   **  Fatal  ** {fatal}",
+                  "   ...Summary of Errors that led to program termination:",
+                  "   ************* EnergyPlus Terminated--Fatal Error Detected. 1 Warning; "
+                  f"1 Severe Errors; Elapsed Time={elapsed}"]
+    else:
+        lines += ["   ************* Simulation Error Summary *************",
+                  "   ************* EnergyPlus Warmup Error Summary. During Warmup: 0 Warning; "
+                  "0 Severe Errors.",
+                  "   ************* EnergyPlus Sizing Error Summary. During Sizing: 0 Warning; "
+                  "0 Severe Errors.",
+                  "   ************* EnergyPlus Completed Successfully-- 1 Warning; 0 Severe "
+                  f"Errors; Elapsed Time={elapsed}"]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def write_csv(path: Path, objects, model: SyntheticModel, envs: List[Environment],
+              weather_rng: np.random.Generator):
+    """eplusout.csv: uma linha por timestep; colunas horárias só no fim de cada hora."""
+    cols = columns(objects)
+    sph = model.steps_per_hour
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(['Date/Time'] + [c[0] for c in cols]) + '\n')
+        for env in envs:
+            s = model.simulate(env, weather_rng)
+            meters = {'districtcooling:facility': s['cooling'] * 1.08,
+                      'districtheating:facility': s['heating'],
+                      'electricity:facility': s['electricity']}
+            values = np.column_stack([
+                meters[var] if var in METERS else
+                _variable_values(var, key, s, model, objects, env)
+                for _, var, key, _ in cols
+            ]) if cols else np.empty((len(s['dt']), 0))
+            hourly = np.asarray([c[3] for c in cols], dtype=bool)
+            fmt_full = ','.join(['%s'] + ['%.6f'] * len(cols)) + '\n'
+            fmt_partial = ','.join(['%s'] + ['' if h else '%.6f' for h in hourly]) + '\n'
+            full, partial = values.tolist(), values[:, ~hourly].tolist()
+            step_minutes = 60 // sph
+            lines = []
+            for d, day in enumerate(env.days):
+                for step in range(24 * sph):
+                    i = d * 24 * sph + step
+                    minutes = (step + 1) * step_minutes
+                    stamp = f" {day.month:02d}/{day.day:02d}  {minutes // 60:02d}:{minutes % 60:02d}:00"
+                    if minutes % 60 == 0:
+                        lines.append(fmt_full % (stamp, *full[i]))
+                    else:
+                        lines.append(fmt_partial % (stamp, *partial[i]))
+            f.writelines(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='energyplus (sintético)')
+    parser.add_argument('-w', '--weather')
+    parser.add_argument('-d', '--output-directory', default='.')
+    parser.add_argument('-v', '--version', action='store_true')
+    parser.add_argument('-r', '--readvars', action='store_true')
+    parser.add_argument('-x', '--expandobjects', action='store_true')
+    parser.add_argument('-i', '--idd')
+    parser.add_argument('-p', '--output-prefix')
+    parser.add_argument('-s', '--output-suffix')
+    parser.add_argument('idf', nargs='?', default='in.idf')
+    args = parser.parse_args(argv)
+    if args.version:
+        print(VERSION)
+        return 0
+
+    started = time.monotonic()
+    out_dir = Path(args.output_directory)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    err_path = out_dir / 'eplusout.err'
+    run_rng = np.random.default_rng()
+
+    try:
+        idf_bytes = Path(args.idf).read_bytes()
+        objects = parse_idf(idf_bytes.decode('latin-1'))
+        weather = read_weather(args.weather)
+        envs = environments(objects, weather)
+        model = SyntheticModel(objects)
+    except Exception as e:
+        write_err(err_path, started, fatal=f"Erro ao ler entradas: {e}")
+        return 1
+
+    # Ruído determinístico por conteúdo: o mesmo IDF gera sempre o mesmo CSV
+    seed = int.from_bytes(hashlib.sha256(idf_bytes).digest()[:8], 'little')
+    days = sum(len(env.days) for env in envs)
+    runtime = sample_runtime(os.environ.get(RUNTIME_ENV, DEFAULT_RUNTIME), run_rng) * days / 365
+
+    if run_rng.random() < float(os.environ.get(FAIL_RATE_ENV, '0') or 0):
+        time.sleep(max(0.0, runtime * run_rng.random()))
+        write_err(err_path, started, fatal="Falha sintética (SYNTHETIC_ENERGYPLUS_FAIL_RATE)")
+        return 1
+
+    files = objects.get('OUTPUTCONTROL:FILES', [[]])[0]
+    if _field(files, 0, 'Yes').lower() == 'yes':
+        write_csv(out_dir / 'eplusout.csv', objects, model, envs, np.random.default_rng(seed))
+
+    time.sleep(max(0.0, runtime - (time.monotonic() - started)))
+    write_err(err_path, started)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,13 @@ Atualiza complete_data.csv com as novas variáveis dependentes:
 - ganho_calor_janelas
 
 SEM re-executar as 200 simulações do EnergyPlus (apenas re-extrai dados dos CSVs existentes).
+
+A re-extração é incremental (extraction_manifest.json no diretório de resultados):
+só recalcula métricas cuja definição mudou, em simulações cujos outputs mudaram.
+
+Uso:
+    python update_existing_results.py          # incremental
+    python update_existing_results.py --full   # recalcula tudo
 """
 import sys
 import pandas as pd
@@ -14,6 +21,7 @@ from tqdm import tqdm
 
 sys.path.insert(0, str(Path(__file__).parent))
 from sensitivity.results import ResultsExtractor
+from sensitivity.manifest import ExtractionManifest, metric_versions, output_fingerprint
 
 print("="*80)
 print("ATUALIZAÇÃO: ADICIONANDO NOVAS VARIÁVEIS DEPENDENTES")
@@ -35,24 +43,38 @@ if not complete_csv.exists():
     print(f"❌ Arquivo não encontrado: {complete_csv}")
     sys.exit(1)
 
-# Carrega dados existentes
+# Carrega dados existentes (round_trip preserva exatamente as colunas não afetadas)
 print(f"\n📂 Carregando: {complete_csv}")
-df = pd.read_csv(complete_csv)
+df = pd.read_csv(complete_csv, float_precision='round_trip')
 print(f"  ✓ {len(df)} simulações carregadas")
 
-# Extrai novas variáveis de cada simulação
-print(f"\n🔄 Extraindo novas variáveis das simulações...")
-
-new_vars = {
-    'consumo_anual_aquecimento': [],
-    'consumo_eletricidade_total': [],
-    'ganho_solar_transmitido': [],
-    'ganho_calor_janelas': [],
-    'temperatura_media_anual': []
-}
+new_vars = [
+    'consumo_anual_aquecimento',
+    'consumo_eletricidade_total',
+    'ganho_solar_transmitido',
+    'ganho_calor_janelas',
+    'temperatura_media_anual',
+]
 
 # Também atualiza temperaturas regionais (recalculadas)
-regional_vars = {f'temp_regiao_{i}': [] for i in range(1, 7)}
+regional_vars = [f'temp_regiao_{i}' for i in range(1, 7)]
+target_vars = new_vars + regional_vars
+
+# Manifesto: impressão digital dos outputs + versão da definição de cada métrica.
+# Só são recalculadas as métricas cuja definição mudou e as simulações cujos
+# outputs mudaram. Use --full para ignorar o manifesto.
+manifest = ExtractionManifest(results_dir / 'extraction_manifest.json')
+if '--full' in sys.argv[1:]:
+    manifest.entries.clear()
+versions = metric_versions()
+missing_columns = [v for v in target_vars if v not in df.columns]
+for var_name in missing_columns:
+    df[var_name] = float('nan')
+
+print(f"\n🔄 Extraindo variáveis desatualizadas das simulações...")
+
+affected_columns = set()
+n_updated = 0
 
 sims_dir = results_dir / 'simulations'
 for idx, row in tqdm(df.iterrows(), total=len(df), desc="Processando"):
@@ -69,41 +91,53 @@ for idx, row in tqdm(df.iterrows(), total=len(df), desc="Processando"):
     sim_path = sims_dir / sim_id
     
     if sim_path.exists():
+        fingerprint = output_fingerprint(sim_path)
+        stale = manifest.stale_metrics(sim_id, fingerprint, versions, target_vars)
+        stale = [v for v in target_vars if v in stale or v in missing_columns]
+        if not stale:
+            continue
+        
         extractor = ResultsExtractor(sim_path)
-        results_sim = extractor.extract_all_variables()
+        try:
+            results_sim = extractor.extract_all_variables(variables=stale, strict=True)
+        except Exception as e:
+            # Fora do manifesto: a próxima execução incremental tenta de novo
+            print(f"  ⚠️  {sim_id}: erro na extração ({e})")
+            results_sim = {}
         
-        # Novas variáveis
-        for var_name in new_vars.keys():
-            new_vars[var_name].append(results_sim.get(var_name, float('nan')))
+        for var_name in stale:
+            df.at[idx, var_name] = results_sim.get(var_name, float('nan'))
+        affected_columns.update(stale)
+        n_updated += 1
         
-        # Temperaturas regionais (recalculadas)
-        for var_name in regional_vars.keys():
-            regional_vars[var_name].append(results_sim.get(var_name, float('nan')))
+        # Só as métricas extraídas com valor ficam registradas como atuais
+        extracted = [v for v in stale if pd.notna(results_sim.get(v))]
+        if fingerprint is not None and extracted:
+            manifest.update(sim_id, fingerprint, versions, extracted)
     else:
         print(f"  ⚠️  {sim_id}: diretório não encontrado")
-        for var_name in new_vars.keys():
-            new_vars[var_name].append(float('nan'))
-        for var_name in regional_vars.keys():
-            regional_vars[var_name].append(float('nan'))
-
-# Adiciona/atualiza colunas no DataFrame
-for var_name, values in new_vars.items():
-    df[var_name] = values
-
-for var_name, values in regional_vars.items():
-    df[var_name] = values  # Sobrescreve valores antigos
-
-# Salva arquivo atualizado
-print(f"\n💾 Salvando arquivo atualizado...")
-df.to_csv(complete_csv, index=False)
-print(f"  ✓ {complete_csv}")
+        for var_name in target_vars:
+            df.at[idx, var_name] = float('nan')
+        affected_columns.update(target_vars)
+
+print(f"  ✓ {n_updated} simulações re-extraídas")
+print(f"  ✓ Colunas afetadas: {sorted(affected_columns) if affected_columns else 'nenhuma'}")
+
+# Salva arquivo atualizado (apenas as colunas afetadas mudam de valor)
+if affected_columns:
+    print(f"\n💾 Salvando arquivo atualizado...")
+    df.to_csv(complete_csv, index=False)
+    print(f"  ✓ {complete_csv}")
+else:
+    print(f"\n✓ Nada a atualizar: {complete_csv} já está em dia")
+manifest.save()
 
 # Estatísticas das novas variáveis
 print(f"\n📊 ESTATÍSTICAS DAS NOVAS VARIÁVEIS:")
 print(f"{'='*80}")
 
-for var_name, values in new_vars.items():
-    serie = pd.Series(values).dropna()
+for var_name in new_vars:
+    serie = df[var_name].dropna()
     if len(serie) > 0:
         print(f"\n{var_name}:")
         print(f"  Média:    {serie.mean():>12,.1f}")
@@ -116,7 +150,7 @@ print(f"\n🔗 CORRELAÇÕES:")
 print(f"{'='*80}")
 consumo_resfr = df['consumo_anual_resfriamento']
 
-for var_name in new_vars.keys():
+for var_name in new_vars:
     if var_name in df.columns:
         corr = df[var_name].corr(consumo_resfr)
         print(f"  {var_name:35s} × Consumo Resfr.: {corr:>6.3f}")